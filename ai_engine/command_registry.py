@@ -0,0 +1,135 @@
+# ai_engine/command_registry.py
+"""
+Chat command dispatch, compiled once instead of a chain of `in` / startswith checks.
+
+Triggers come from chatbot_intents.json (per command: exact / prefix / contains)
+plus anything passed to @commands.handler(...). Matching a message:
+
+1. exact     - dict lookup
+2. prefix    - one walk down a character trie, longest registered prefix wins
+3. contains  - one scan with a compiled alternation (longest keyword first);
+               if several keywords occur, the command registered first wins
+
+So "create group kyc-savers" is a create group, not a KYC submission, and the
+cost is O(len(message)) whatever the number of commands.
+"""
+import os
+import re
+import json
+import time
+import threading
+
+from middleware.monitor import metrics
+
+INTENTS_FILE = os.path.join(os.path.dirname(__file__), "chatbot_intents.json")
+_END = "\0"                 # trie terminal key
+
+metrics.describe("chat_commands_total", "Chat messages by matched command")
+metrics.describe("chat_command_seconds", "Chat command handler latency")
+
+
+class CommandRegistry:
+    def __init__(self, intents_path: str | None = None):
+        self.intents_path = intents_path
+        self._handlers = {}             # name -> fn, in registration order
+        self._extra = {}                # name -> triggers given at registration
+        self._read_only = set()         # handlers that never write (safe to run side by side)
+        self._lock = threading.Lock()
+        self._compiled = None
+
+    def handler(self, name: str, *, exact=(), prefix=(), contains=(), read_only: bool = False):
+        """Decorator: fn(**ctx) -> Flask response, or None to fall through to 'unknown command'."""
+        def deco(fn):
+            self._handlers[name] = fn
+            if read_only:
+                self._read_only.add(name)
+            self._extra[name] = {"exact": list(exact), "prefix": list(prefix), "contains": list(contains)}
+            self._compiled = None
+            return fn
+        return deco
+
+    def _load_intents(self) -> dict:
+        if not self.intents_path or not os.path.exists(self.intents_path):
+            return {}
+        with open(self.intents_path, "r", encoding="utf-8") as f:
+            text = f.read().strip()
+        return json.loads(text).get("commands", {}) if text else {}
+
+    def compile(self):
+        intents = self._load_intents()
+        unknown = set(intents) - set(self._handlers)
+        if unknown:
+            print(f"⚠️ chatbot_intents.json has commands without a handler: {sorted(unknown)}")
+
+        exact, trie, keywords = {}, {}, {}
+        for order, name in enumerate(self._handlers):
+            spec, extra = intents.get(name, {}), self._extra[name]
+            for t in spec.get("exact", []) + extra["exact"]:
+                exact.setdefault(t.lower(), name)
+            for t in spec.get("prefix", []) + extra["prefix"]:
+                node = trie
+                for ch in t.lower():
+                    node = node.setdefault(ch, {})
+                node.setdefault(_END, name)
+            for t in spec.get("contains", []) + extra["contains"]:
+                keywords.setdefault(t.lower(), (order, name))
+
+        pattern = None
+        if keywords:
+            alts = sorted(keywords, key=len, reverse=True)
+            pattern = re.compile("|".join(re.escape(k) for k in alts))
+        self._compiled = (exact, trie, pattern, keywords)
+        return self
+
+    def match(self, message: str) -> str | None:
+        """Command name for an already lower-cased, stripped message."""
+        compiled = self._compiled
+        if compiled is None:
+            with self._lock:
+                if self._compiled is None:
+                    self.compile()
+            compiled = self._compiled
+        exact, trie, pattern, keywords = compiled
+
+        if message in exact:
+            return exact[message]
+
+        node, found = trie, None
+        for ch in message:
+            node = node.get(ch)
+            if node is None:
+                break
+            found = node.get(_END, found)
+        if found:
+            return found
+
+        if pattern is not None:
+            hits = [keywords[m.group(0)] for m in pattern.finditer(message)]
+            if hits:
+                return min(hits)[1]
+        return None
+
+    def run(self, name: str | None, **ctx):
+        """Run a handler picked by match(); None for no match."""
+        metrics.inc("chat_commands_total", command=name or "unknown")
+        if name is None:
+            return None
+        t0 = time.perf_counter()
+        try:
+            return self._handlers[name](**ctx)
+        finally:
+            metrics.observe("chat_command_seconds", time.perf_counter() - t0, command=name)
+
+    def dispatch(self, message: str, **ctx):
+        """Run the matching handler. Returns (command name | None, handler result | None)."""
+        name = self.match(message)
+        return name, self.run(name, **ctx)
+
+    def is_read_only(self, name: str | None) -> bool:
+        return name is None or name in self._read_only
+
+    def names(self) -> list[str]:
+        return list(self._handlers)
+
+
+commands = CommandRegistry(INTENTS_FILE)
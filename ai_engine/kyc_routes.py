@@ -4,7 +4,6 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 import traceback
 import os
-import hashlib
 from users.models import User, KYCRequest, db, get_config, set_config
 from ai_engine.kyc_verifier import verify_document
 
@@ -30,14 +29,6 @@ def _is_allowed_filename(filename: str) -> bool:
     return ext in ALLOWED_EXT
 
 
-def _sha256_of_file(path: str) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-
 @kyc_bp.route('/submit', methods=['POST'])
 @jwt_required()
 def submit_kyc():
@@ -114,7 +105,7 @@ def submit_kyc():
                     old={},
                     new=payload
                 )
-                consensus_publish(payload)
+                consensus_publish(payload, source="kyc")
                 return jsonify({
                     "message": "KYC auto-approved",
                     "status": "approved",
@@ -135,7 +126,7 @@ def submit_kyc():
                     old={},
                     new=data
                 )
-                consensus_publish(payload)
+                consensus_publish(payload, source="kyc")
         except Exception:
             traceback.print_exc()
 
@@ -274,7 +265,7 @@ def approve_kyc(req_id):
                         }
                         log_audit_action(user_id=admin_id_local, action="KYC_APPROVE", table_name="KYCRequest",
                                          record_id=req_id_local, old={}, new=payload)
-                        consensus_publish(payload)
+                        consensus_publish(payload, source="kyc")
                     except Exception:
                         current_app.logger.exception(f"Background audit/consensus publish failed for req {req_id_local}")
                 except Exception:
@@ -325,7 +316,7 @@ def reject_kyc(req_id):
                                "status": "rejected"}
                     log_audit_action(user_id=admin_id_local, action="KYC_REJECT", table_name="KYCRequest",
                                      record_id=req_id_local, old={}, new=payload)
-                    consensus_publish(payload)
+                    consensus_publish(payload, source="kyc")
                 except Exception:
                     current_app.logger.exception(
                         f"Background audit/consensus publish failed for reject req {req_id_local}")
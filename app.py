@@ -1,12 +1,12 @@
 import os
 import sys
-import threading           # CHANGED: imported for background Hedera init
-import importlib          # CHANGED: dynamic import to avoid import-time blocking
-from flask import Flask, jsonify, render_template
+import time
+import threading           # CHANGED: imported for background Hedera warm-up
+from flask import Flask, jsonify, render_template, request, Response
 from flask_cors import CORS
 from config import Config
 from extensions import db, migrate, jwt
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
 
 # Blueprints
 from users.models import User
@@ -25,6 +25,7 @@ from company.routes import company_bp
 from cooperative import models as cooperative_models
 from cooperative.routes import coop_bp
 from payments.routes import payments_bp
+from audit.routes import audit_bp
 
 
 
@@ -40,6 +41,23 @@ def create_app():
     migrate.init_app(app, db)
     jwt.init_app(app)
 
+    # ✅ Background receipt confirmation for submit-only Hedera txs
+    try:
+        from hedera_sdk.receipts import receipt_tracker
+        receipt_tracker.init_app(app)
+    except Exception as e:
+        print("⚠️ Receipt tracker not available:", e)
+
+    # ✅ Audit/alert HCS events go out in Merkle-rooted batches
+    from utils.hcs_batcher import hcs_batcher
+    hcs_batcher.init_app(app)
+
+    # ✅ Durable HCS publish queue (request threads only enqueue)
+    from utils.publish_queue import publish_queue
+    publish_queue.init_app(app)
+    from utils.account_pool import account_pool
+    account_pool.init_app(app)
+
     # ✅ Register Blueprints
     app.register_blueprint(users_bp, url_prefix="/api/users")
     app.register_blueprint(kyc_bp, url_prefix="/api/kyc")
@@ -55,38 +73,29 @@ def create_app():
     app.register_blueprint(ngo_bp, url_prefix="/api/ngo")
     app.register_blueprint(coop_bp)
     app.register_blueprint(payments_bp)
+    app.register_blueprint(audit_bp, url_prefix="/api/audit")
 
-    from apscheduler.schedulers.background import BackgroundScheduler
-    from middleware.offline_sync import process_outbox
-
-        # ✅ Background scheduler (safe, app context)
-    def _process_outbox_with_app():
-        with app.app_context():
-            try:
-                process_outbox()
-            except Exception:
-                import traceback
-                traceback.print_exc()
+    from jobs.registry import build_scheduler, enabled_jobs
 
+    # ✅ Background jobs. Production: SCHEDULER_MODE=worker and `python worker.py`
+    # (jobs/registry.py has the job table); `flask run` still runs them in-process.
     def start_scheduler():
         
         # ⚠️ Prevent running during CLI commands (db migrate, shell, etc.)
         if os.environ.get("WERKZEUG_RUN_MAIN") != "true":
             return
+        if not app.config["BACKGROUND_JOBS"]:
+            print("ℹ️ SCHEDULER_MODE=worker: background jobs run in worker.py")
+            return
 
-        scheduler = BackgroundScheduler()
-        scheduler.add_job(
-            _process_outbox_with_app,
-            'interval',
-            minutes=1,
-            id='outbox_retry',
-            max_instances=1,
-            coalesce=True,
-            replace_existing=True,
-            misfire_grace_time=60
-        )
+        scheduler = build_scheduler(app)
         scheduler.start()
-        print("✅ Outbox background scheduler started (runs every 1 min)")
+        print("✅ Background scheduler started:", ", ".join(enabled_jobs()))
+
+        # leftover queue rows from the previous run
+        publish_queue.start()
+        # pre-created Hedera accounts for onboarding (ACCOUNT_POOL_ENABLED)
+        account_pool.start()
 
     start_scheduler()
 
@@ -202,29 +211,67 @@ def create_app():
     def internal_error(error):
         return jsonify({"error": "Internal server error"}), 500
 
-    # ✅ Background Hedera init (non-blocking, safe for Render)
-    def _init_hedera_in_background():
-        try:
-            hedera_cfg = importlib.import_module("hedera.config")
-            if hasattr(hedera_cfg, "init_hedera_client"):
-                hedera_cfg.init_hedera_client(Config)
-                print("✅ Hedera client initialized in background")
-            else:
-                print("⚠️ hedera.config has no init_hedera_client()")
-        except Exception as e:
-            print("⚠️ Hedera background init failed:", e)
-
-    # ✅ Only start Hedera if ENABLE_HEDERA=true (default true)
-    if os.environ.get("ENABLE_HEDERA", "true").lower() in ("1", "true", "yes"):
-        threading.Thread(target=_init_hedera_in_background, daemon=True).start()
-    else:
-        print("ℹ️ Hedera init skipped (ENABLE_HEDERA not enabled)")
+    # ✅ Optional Hedera warm-up (JVM, pooled client, CoopTrust ABI) in the background.
+    # Everything Hedera is lazy now; this just moves the first-use cost off the first
+    # request. Runs after HEDERA_WARMUP_DELAY_S so /healthz is already answering.
+    def _warm_up_hedera():
+        time.sleep(float(os.environ.get("HEDERA_WARMUP_DELAY_S", "2")))
+        from hedera_sdk import jvm, contracts
+        steps = [("jvm", jvm.start)]
+        if os.environ.get("HEDERA_OPERATOR_ID") and os.environ.get("HEDERA_OPERATOR_KEY"):
+            from hedera_sdk.client_pool import get_client
+            steps.append(("client", get_client))
+        steps.append(("contracts", contracts.warm_up))
+        for name, fn in steps:
+            t0 = time.perf_counter()
+            try:
+                fn()
+                print(f"🔥 Hedera warm-up: {name} ready in {time.perf_counter() - t0:.2f}s")
+            except Exception as e:
+                print(f"⚠️ Hedera warm-up step '{name}' failed: {e}")
+
+    # ✅ Only if ENABLE_HEDERA + HEDERA_WARMUP, and never for CLI commands (flask db ...)
+    cli_command = os.environ.get("FLASK_RUN_FROM_CLI") == "true" and os.environ.get("WERKZEUG_RUN_MAIN") != "true"
+    if os.environ.get("ENABLE_HEDERA", "true").lower() not in ("1", "true", "yes"):
+        print("ℹ️ Hedera warm-up skipped (ENABLE_HEDERA not enabled)")
+    elif os.environ.get("HEDERA_WARMUP", "false").lower() in ("1", "true", "yes") and not cli_command:
+        threading.Thread(target=_warm_up_hedera, name="hedera-warmup", daemon=True).start()
 
     # ✅ Health check for Render (always responds instantly)
     @app.route("/healthz")
     def healthz():
         return "ok", 200
 
+    # ✅ Prometheus-style metrics (queue depth, publish latency, ...)
+    # scraper: "Authorization: Bearer $METRICS_TOKEN"; else a super-admin JWT. Never open.
+    def _metrics_allowed() -> bool:
+        token = os.environ.get("METRICS_TOKEN")
+        if token and request.headers.get("Authorization") == f"Bearer {token}":
+            return True
+        try:
+            verify_jwt_in_request()
+            user = User.query.get(int(get_jwt_identity()))
+        except Exception:
+            return False
+        return bool(user and user.role == "super-admin")
+
+    @app.route("/metrics")
+    def metrics_endpoint():
+        from middleware.monitor import metrics
+        if not _metrics_allowed():
+            return jsonify({"error": "Unauthorized"}), 401
+        try:
+            for status, n in publish_queue.depth().items():
+                metrics.set_gauge("hcs_queue_depth", n, status=status)
+        except Exception:
+            pass
+        if account_pool.enabled:
+            try:
+                account_pool._update_depth()
+            except Exception:
+                pass
+        return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
     # ✅ Quick root test route
     @app.route("/ping")
     def ping():
@@ -0,0 +1 @@
+# archive/__init__.py
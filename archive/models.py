@@ -0,0 +1,49 @@
+# archive/models.py
+from datetime import datetime
+from extensions import db
+from sqlalchemy import Numeric
+
+
+class ArchiveCheckpoint(db.Model):
+    """
+    Summary left behind for every (table, month, group, kind) slice that was moved
+    out of the hot DB into a cold archive file.
+    """
+    __tablename__ = "archive_checkpoints"
+
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(64), nullable=False)      # transaction_ledger | hcs_message_logs | ...
+    period = db.Column(db.String(7), nullable=False)           # "YYYY-MM"
+    group_id = db.Column(db.Integer, nullable=True, index=True)
+    kind = db.Column(db.String(80), nullable=True)             # ref_type / msg_type / event_name / table_name
+
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    amount_sum = db.Column(Numeric(18, 2), nullable=True)      # only for tables with an amount column
+    min_id = db.Column(db.Integer, nullable=True)
+    max_id = db.Column(db.Integer, nullable=True)
+    first_at = db.Column(db.DateTime, nullable=True)
+    last_at = db.Column(db.DateTime, nullable=True)
+
+    file_path = db.Column(db.String(255), nullable=False)      # relative to ARCHIVE_DIR
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_archive_cp_table_group_period", "table_name", "group_id", "period"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "table_name": self.table_name,
+            "period": self.period,
+            "group_id": self.group_id,
+            "kind": self.kind,
+            "row_count": self.row_count,
+            "amount_sum": float(self.amount_sum) if self.amount_sum is not None else None,
+            "min_id": self.min_id,
+            "max_id": self.max_id,
+            "first_at": self.first_at.strftime("%Y-%m-%d %H:%M:%S") if self.first_at else None,
+            "last_at": self.last_at.strftime("%Y-%m-%d %H:%M:%S") if self.last_at else None,
+            "file_path": self.file_path,
+        }
@@ -0,0 +1,275 @@
+# archive/store.py
+"""
+Cold-storage archival for the append-only log tables.
+
+Rows older than ARCHIVE_HORIZON_DAYS are written to gzip-compressed NDJSON files,
+one file per table per month (ARCHIVE_DIR/<table>/<YYYY-MM>.ndjson.gz), and then
+deleted from the hot SQLite DB. For every (table, month, group, kind) slice an
+ArchiveCheckpoint row keeps counts / sums, so aggregates (e.g. vault reconcile)
+stay correct without opening any file, and the read path only opens the months
+that actually hold rows for the requested group.
+"""
+import os
+import json
+import gzip
+from collections import defaultdict
+from datetime import datetime, timedelta, date
+from decimal import Decimal
+from types import SimpleNamespace
+
+from sqlalchemy import DateTime, Numeric
+
+from extensions import db
+from archive.models import ArchiveCheckpoint
+from audit.models import AuditLog
+from cooperative.models import TransactionLedger, HCSMessageLog, ContractEventLog
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join("instance", "archive"))
+ARCHIVE_HORIZON_DAYS = int(os.getenv("ARCHIVE_HORIZON_DAYS", "180"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "2000"))
+
+# table -> (model, timestamp attr, group attr, kind attr, amount attr)
+ARCHIVED_TABLES = {
+    "transaction_ledger": (TransactionLedger, "created_at", "group_id", "ref_type", "amount"),
+    "hcs_message_logs": (HCSMessageLog, "created_at", "group_id", "msg_type", None),
+    "contract_event_logs": (ContractEventLog, "created_at", "group_id", "event_name", None),
+    "audit_logs": (AuditLog, "timestamp", None, "table_name", None),
+}
+
+
+class ArchivedRow(SimpleNamespace):
+    """Attribute-style row read back from an archive file (duck-types the ORM row)."""
+    archived = True
+
+
+# ---------------- (de)serialization ----------------
+def _column_types(model):
+    out = {}
+    for attr in model.__mapper__.column_attrs:
+        out[attr.key] = attr.columns[0].type
+    return out
+
+
+def _encode(val):
+    if isinstance(val, (datetime, date)):
+        return val.isoformat()
+    if isinstance(val, Decimal):
+        return str(val)
+    return val
+
+
+def _row_to_dict(model, row) -> dict:
+    return {key: _encode(getattr(row, key)) for key in _column_types(model)}
+
+
+def _dict_to_row(model, data: dict) -> ArchivedRow:
+    types = _column_types(model)
+    out = {}
+    for key, col_type in types.items():
+        val = data.get(key)
+        if val is not None and isinstance(col_type, DateTime):
+            try:
+                val = datetime.fromisoformat(val)
+            except Exception:
+                pass
+        elif val is not None and isinstance(col_type, Numeric):
+            try:
+                val = float(val)
+            except Exception:
+                pass
+        out[key] = val
+    return ArchivedRow(**out)
+
+
+def _file_path(table_name: str, period: str) -> str:
+    return os.path.join(table_name, f"{period}.ndjson.gz")
+
+
+def _append_to_file(rel_path: str, records: list[dict]) -> None:
+    """Append one gzip member to the month file and fsync before the DB delete commits."""
+    path = os.path.join(ARCHIVE_DIR, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for rec in records:
+                gz.write((json.dumps(rec, default=str, ensure_ascii=False) + "\n").encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def _read_file(rel_path: str):
+    path = os.path.join(ARCHIVE_DIR, rel_path)
+    if not os.path.exists(path):
+        return
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+# ---------------- write path ----------------
+def _update_checkpoints(table_name: str, period: str, rel_path: str, rows: list):
+    model, ts_attr, group_attr, kind_attr, amount_attr = ARCHIVED_TABLES[table_name]
+
+    slices = defaultdict(list)
+    for r in rows:
+        gid = getattr(r, group_attr) if group_attr else None
+        kind = getattr(r, kind_attr) if kind_attr else None
+        slices[(gid, kind)].append(r)
+
+    for (gid, kind), chunk in slices.items():
+        cp = ArchiveCheckpoint.query.filter_by(
+            table_name=table_name, period=period, group_id=gid, kind=kind
+        ).first()
+        if not cp:
+            cp = ArchiveCheckpoint(table_name=table_name, period=period, group_id=gid, kind=kind,
+                                   row_count=0, file_path=rel_path)
+            db.session.add(cp)
+
+        ids = [r.id for r in chunk]
+        stamps = [getattr(r, ts_attr) for r in chunk if getattr(r, ts_attr)]
+
+        cp.row_count = (cp.row_count or 0) + len(chunk)
+        if amount_attr:
+            total = sum(float(getattr(r, amount_attr) or 0) for r in chunk)
+            cp.amount_sum = round(float(cp.amount_sum or 0) + total, 2)
+        cp.min_id = min([i for i in [cp.min_id] + ids if i is not None])
+        cp.max_id = max([i for i in [cp.max_id] + ids if i is not None])
+        if stamps:
+            cp.first_at = min([t for t in [cp.first_at] + stamps if t])
+            cp.last_at = max([t for t in [cp.last_at] + stamps if t])
+
+
+def archive_table(table_name: str, cutoff: datetime) -> int:
+    """Move rows of one table older than `cutoff` into the archive. Returns rows moved."""
+    model, ts_attr, _, _, _ = ARCHIVED_TABLES[table_name]
+    ts_col = getattr(model, ts_attr)
+    moved = 0
+
+    while True:
+        rows = (model.query
+                .filter(ts_col < cutoff)
+                .order_by(model.id.asc())
+                .limit(ARCHIVE_BATCH_SIZE)
+                .all())
+        if not rows:
+            break
+
+        by_period = defaultdict(list)
+        for r in rows:
+            by_period[getattr(r, ts_attr).strftime("%Y-%m")].append(r)
+
+        try:
+            for period, chunk in sorted(by_period.items()):
+                rel_path = _file_path(table_name, period)
+                _append_to_file(rel_path, [_row_to_dict(model, r) for r in chunk])
+                _update_checkpoints(table_name, period, rel_path, chunk)
+
+            ids = [r.id for r in rows]
+            model.query.filter(model.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            # file may hold rows that are still hot; read path dedupes by id
+            db.session.rollback()
+            raise
+
+        moved += len(rows)
+
+    return moved
+
+
+def run_archival(horizon_days: int | None = None, tables: list[str] | None = None) -> dict:
+    """
+    Archive every configured table up to the start of the month that contains
+    now - horizon_days (so each month file is written in one go).
+    """
+    days = ARCHIVE_HORIZON_DAYS if horizon_days is None else int(horizon_days)
+    horizon = datetime.utcnow() - timedelta(days=days)
+    cutoff = datetime(horizon.year, horizon.month, 1)
+
+    result = {"cutoff": cutoff.isoformat(), "tables": {}}
+    for name in (tables or ARCHIVED_TABLES.keys()):
+        if name not in ARCHIVED_TABLES:
+            result["tables"][name] = {"error": "not archivable"}
+            continue
+        try:
+            result["tables"][name] = {"moved": archive_table(name, cutoff)}
+        except Exception as e:
+            print(f"⚠️ Archival failed for {name}: {e}")
+            result["tables"][name] = {"error": str(e)}
+    return result
+
+
+# ---------------- read path ----------------
+def _checkpoint_query(table_name: str, group_id=None, kinds=None):
+    _, _, group_attr, _, _ = ARCHIVED_TABLES[table_name]
+    q = ArchiveCheckpoint.query.filter_by(table_name=table_name)
+    if group_attr and group_id is not None:
+        q = q.filter(ArchiveCheckpoint.group_id == group_id)
+    if kinds:
+        q = q.filter(ArchiveCheckpoint.kind.in_(list(kinds)))
+    return q
+
+
+def archived_rows(table_name: str, since: datetime | None = None, until: datetime | None = None,
+                  **filters) -> list[ArchivedRow]:
+    """
+    Return archived rows matching equality `filters` (model attribute names) and the
+    optional [since, until) window. Only month files referenced by a checkpoint for
+    the requested group/kind are opened.
+    """
+    model, ts_attr, group_attr, kind_attr, _ = ARCHIVED_TABLES[table_name]
+
+    kinds = [filters[kind_attr]] if kind_attr and filters.get(kind_attr) is not None else None
+    cps = _checkpoint_query(table_name, filters.get(group_attr) if group_attr else None, kinds).all()
+    if not cps:
+        return []
+
+    lo = since.strftime("%Y-%m") if since else None
+    hi = until.strftime("%Y-%m") if until else None
+    paths = sorted({cp.file_path for cp in cps
+                    if (lo is None or cp.period >= lo) and (hi is None or cp.period <= hi)})
+
+    out, seen = [], set()
+    for rel_path in paths:
+        for data in _read_file(rel_path):
+            if data.get("id") in seen:
+                continue
+            if any(data.get(k) != v for k, v in filters.items()):
+                continue
+            row = _dict_to_row(model, data)
+            ts = getattr(row, ts_attr, None)
+            if since and (ts is None or ts < since):
+                continue
+            if until and ts is not None and ts >= until:
+                continue
+            seen.add(data.get("id"))
+            out.append(row)
+    return out
+
+
+def with_archive(table_name: str, hot_rows: list, since: datetime | None = None,
+                 until: datetime | None = None, newest_first: bool = True, **filters) -> list:
+    """
+    Merge hot ORM rows with archived rows for the same filters, ordered by timestamp.
+    Hot rows win if an id shows up in both (crash between file write and delete).
+    """
+    _, ts_attr, _, _, _ = ARCHIVED_TABLES[table_name]
+    cold = archived_rows(table_name, since=since, until=until, **filters)
+    if not cold:
+        return hot_rows
+
+    hot_ids = {r.id for r in hot_rows}
+    merged = list(hot_rows) + [r for r in cold if r.id not in hot_ids]
+    merged.sort(key=lambda r: getattr(r, ts_attr) or datetime.min, reverse=newest_first)
+    return merged
+
+
+def archived_totals(table_name: str, group_id=None, kinds=None) -> dict:
+    """Sum of checkpoint counts / amounts for archived rows (no file IO)."""
+    cps = _checkpoint_query(table_name, group_id, kinds).all()
+    return {
+        "row_count": sum(cp.row_count or 0 for cp in cps),
+        "amount_sum": round(sum(float(cp.amount_sum or 0) for cp in cps), 2),
+    }
@@ -1,26 +1,18 @@
 from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from audit.models import AuditLog
-from utils.audit_logger import log_audit_action
+from archive.store import with_archive
+from users.models import User
 
 audit_bp = Blueprint('audit', __name__, url_prefix='/api/audit')
 
 @audit_bp.route('/logs', methods=['GET'])
+@jwt_required()
 def get_all_logs():
-    logs = AuditLog.query.order_by(AuditLog.timestamp.desc()).all()
-    return jsonify([log.to_dict() for log in logs]), 200
-
-
+    user = User.query.get(int(get_jwt_identity()))
+    if not user or user.role not in ("super-admin", "bank-admin"):
+        return jsonify({"error": "Forbidden"}), 403
 
-# Loan status
-old_status = loan.status
-loan.status = 'approved'
-db.session.commit()
-
-log_audit_action(
-    user_id=user_id,
-    action='Loan status update',
-    table_name='Loan',
-    record_id=loan.id,
-    old={"status": old_status},
-    new={"status": loan.status}
-)
+    logs = AuditLog.query.order_by(AuditLog.timestamp.desc()).all()
+    logs = with_archive("audit_logs", logs)     # + rows moved to cold storage
+    return jsonify([AuditLog.to_dict(log) for log in logs]), 200
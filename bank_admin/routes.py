@@ -4,7 +4,11 @@ from users.models import User, KYCRequest
 from finance.models import Loan, DepositRequest, TransactionHistory, Wallet
 from hedera_sdk.kyc_service import set_kyc_status 
 # Hedera imports
-from hedera import Client, AccountId, PrivateKey, AccountBalanceQuery, Hbar, HbarUnit, TokenId
+from hedera_sdk import jvm
+from hedera_sdk.client_pool import get_client
+
+AccountId, PrivateKey, AccountBalanceQuery, HbarUnit = jvm.lazy_import(
+    "hedera", "AccountId", "PrivateKey", "AccountBalanceQuery", "HbarUnit")
 import os, traceback
 
 bank_admin_bp = Blueprint('bank_admin', __name__, url_prefix='/api/bank-admin')
@@ -158,12 +162,11 @@ def get_bank_balance():
         # ✅ build objects (Java-binding SDK style)
         try:
             operator_id = AccountId.fromString(operator_id_str)
-            operator_key = PrivateKey.fromString(operator_key_str)
+            PrivateKey.fromString(operator_key_str)         # validate only
         except Exception:
             return jsonify({"error": "Invalid HEDERA_OPERATOR_ID or HEDERA_OPERATOR_KEY in .env"}), 500
 
-        client = Client.forTestnet()
-        client.setOperator(operator_id, operator_key)
+        client = get_client(operator_id=operator_id_str, operator_key=operator_key_str)
 
         # ✅ query balance
         balance = AccountBalanceQuery().setAccountId(operator_id).execute(client)
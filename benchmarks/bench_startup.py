@@ -0,0 +1,82 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start cost of `import app` (what gunicorn boot and every `flask db ...` pay),
+and what the deferred Hedera pieces cost on first use / warm-up.
+
+    python benchmarks/bench_startup.py --runs 5                # real SDK if installed
+    python benchmarks/bench_startup.py --runs 5 --simulator    # no JVM, just the Python side
+
+Each run is a fresh interpreter. "import app" is the lazy startup; "import + warm"
+is roughly what startup cost before, when the JVM, client and web3/ABI were all
+loaded at import time.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = r"""
+import sys, time, json
+t0 = time.perf_counter()
+import app
+t_import = time.perf_counter() - t0
+loaded = [m for m in ("hedera", "jnius", "web3") if m in sys.modules]
+warm = {}
+from hedera_sdk import jvm, contracts
+from hedera_sdk.client_pool import get_client
+for name, fn in (("jvm", jvm.start), ("client", get_client), ("contracts", contracts.warm_up)):
+    t1 = time.perf_counter()
+    try:
+        fn()
+        warm[name] = time.perf_counter() - t1
+    except Exception as e:
+        warm[name] = None
+        print(f"warm-up {name} unavailable: {e}", file=sys.stderr)
+print(json.dumps({"import": t_import, "loaded_at_import": loaded, "warm": warm}))
+"""
+
+
+def _run(env) -> dict:
+    out = subprocess.run([sys.executable, "-c", _CHILD], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=600)
+    if out.returncode != 0:
+        sys.exit(f"child failed:\n{out.stderr[-2000:]}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--simulator", action="store_true", help="HEDERA_BACKEND=simulator (no JVM)")
+    args = ap.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("HEDERA_OPERATOR_ID", "0.0.2")
+    env.setdefault("HEDERA_OPERATOR_KEY", "302e020100300506032b657004220420" + "11" * 32)
+    env["HEDERA_WARMUP"] = "false"
+    if args.simulator:
+        env["HEDERA_BACKEND"] = "simulator"
+
+    runs = [_run(env) for _ in range(args.runs)]
+    med = lambda xs: statistics.median(xs) if xs else float("nan")   # noqa: E731
+
+    t_import = med([r["import"] for r in runs])
+    print(f"🚀 backend={'simulator' if args.simulator else 'java'} runs={args.runs}")
+    print(f"  import app (lazy)          {t_import:8.3f}s   heavy modules loaded: {runs[-1]['loaded_at_import'] or 'none'}")
+    deferred = 0.0
+    for step in ("jvm", "client", "contracts"):
+        vals = [r["warm"][step] for r in runs if r["warm"].get(step) is not None]
+        if vals:
+            deferred += med(vals)
+            print(f"  first use: {step:<14} {med(vals):8.3f}s")
+        else:
+            print(f"  first use: {step:<14}      n/a   (not installed / not configured)")
+    print(f"  import + warm (old eager)  {t_import + deferred:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
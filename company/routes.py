@@ -4,7 +4,7 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from users.models import User, db
 from finance.models import Wallet, TransactionHistory
-from hedera_sdk.transfer import transfer_hbar
+from hedera_sdk.token_service import transfer_hbar_batch
 
 company_bp = Blueprint("company", __name__, url_prefix="/api/company")
 
@@ -79,6 +79,7 @@ def pay_salaries():
         return jsonify({"error": "No Hedera payer configured (account/key missing)."}), 400
 
     results = []
+    payable = []
     for emp in employees:
         emp_wallet = Wallet.query.filter_by(user_id=emp.id).first()
         if not emp_wallet:
@@ -90,14 +91,26 @@ def pay_salaries():
         if not emp.hedera_account_id:
             results.append({"employee": emp.username, "skipped": "No Hedera account linked"})
             continue
-
-        # --- REAL Hedera transfer ---
-        res = transfer_hbar(
-            sender_account=payer_account,
-            sender_key=payer_key,
-            recipient_account=emp.hedera_account_id,
-            amount_hbar=salary_amount,
-        )
+        payable.append((emp, emp_wallet))
+
+    # --- REAL Hedera transfer (multi-party, chunked per network limit) ---
+    batch = transfer_hbar_batch(
+        from_account=payer_account,
+        from_privkey=payer_key,
+        transfers=[{"to": emp.hedera_account_id, "amount": salary_amount} for emp, _ in payable],
+        memo="salary",
+    ) if payable else {"results": []}
+
+    for (emp, emp_wallet), res in zip(payable, batch["results"]):
+        path = [payer_account, emp.hedera_account_id]
+        if res["status"] != "SUCCESS":
+            results.append({
+                "employee": emp.username,
+                "amount": salary_amount,
+                "status": res["status"],
+                "error": res.get("error"),
+            })
+            continue
 
         # Local ledger update
         company_wallet.balance -= salary_amount
@@ -110,16 +123,16 @@ def pay_salaries():
             type="salary",
             amount=salary_amount,
             description=f"Salary paid to {emp.username}",
-            hedera_tx_id=res["transaction_id"],
-            hedera_path=" → ".join(res["path"]),
+            hedera_tx_id=res["tx_id"],
+            hedera_path=" → ".join(path),
         )
         db.session.add(tx)
 
         results.append({
             "employee": emp.username,
             "amount": salary_amount,
-            "hedera_tx_id": res["transaction_id"],
-            "path": res["path"],
+            "hedera_tx_id": res["tx_id"],
+            "path": path,
             "status": res["status"],
         })
 
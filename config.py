@@ -10,6 +10,10 @@ class Config:
     SQLALCHEMY_DATABASE_URI = 'sqlite:///safichain.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # --- Background work ---
+    # "worker": web processes run no schedulers / queue drains, worker.py owns them
+    BACKGROUND_JOBS = os.getenv("SCHEDULER_MODE", "web").lower() != "worker"
+
     # --- Hedera Operator ---
     HEDERA_OPERATOR_ID = os.getenv('HEDERA_OPERATOR_ID')
     HEDERA_OPERATOR_KEY = os.getenv('HEDERA_OPERATOR_KEY')
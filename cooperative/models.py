@@ -240,12 +240,19 @@ class HCSMessageLog(db.Model):
 # ===== CONTRACT EVENT LOG (HTS/SC events) =====
 class ContractEventLog(db.Model):
     __tablename__ = "contract_event_logs"
+    __table_args__ = (
+        db.UniqueConstraint("contract_id", "tx_hash", "log_index", name="uq_contract_event_log"),
+        db.Index("ix_contract_event_logs_user_event", "user_id", "event_name"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     group_id = db.Column(db.Integer, db.ForeignKey("cooperative_groups.id"), nullable=True, index=True)
     contract_id = db.Column(db.String(64), nullable=True, index=True)
     event_name = db.Column(db.String(80), nullable=False)
     tx_hash = db.Column(db.String(128), nullable=True, index=True)
+    block_number = db.Column(db.BigInteger, nullable=True, index=True)   # EVM logs (contract indexer)
+    log_index = db.Column(db.Integer, nullable=True)
+    user_id = db.Column(db.Integer, nullable=True)   # from the event args (TrustScoreUpdated)
     payload = db.Column(db.Text, nullable=True)  # decoded args JSON
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
 # ===== POLICY RULES / LIMITS =====
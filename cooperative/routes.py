@@ -17,7 +17,8 @@ from cooperative.models import (
     TransactionLedger, VotingSession, VoteDetail
 )
 from users.models import User
-from hedera_sdk.wallet import create_hedera_account, ensure_token_ready_for_account, fetch_wallet_balance
+from hedera_sdk.wallet import ensure_token_ready_for_account, fetch_wallet_balance
+from utils.account_pool import account_pool
 from hedera_sdk.smart_contracts import create_loan_onchain, repay_loan_onchain
 from notifications.routes import create_notification
 from cooperative.models import MemberBalance
@@ -35,6 +36,7 @@ from cooperative.models import GroupProfitPool
 from utils.audit_logger import log_audit_action
 from utils.consensus_helper import publish_to_consensus as consensus_publish
 from datetime import date
+from archive.store import with_archive, archived_totals, archived_rows
 
 
 coop_bp = Blueprint("cooperative", __name__, url_prefix="/api/coops")
@@ -76,6 +78,28 @@ def _close_voting_if_quorum(session_obj):
     return {"closed": False, "approved": None, "yes": yes, "no": no}
 
 
+def _loan_for_approved_request(lr):
+    """Approved LoanRequest -> Loan (status "approved"), idempotent. Caller commits."""
+    existing_loan = Loan.query.filter_by(loan_request_id=lr.id).first()
+    if existing_loan:
+        return existing_loan
+    interest_rate = float(CooperativeGroup.query.get(lr.group_id).interest_rate or 0.10)
+    if interest_rate > 1:
+        interest_rate = interest_rate / 100.0
+    loan = Loan(
+        loan_request_id=lr.id,
+        group_id=lr.group_id,
+        user_id=lr.user_id,
+        principal=float(lr.amount),
+        interest_rate_apy=interest_rate * 100.0,
+        tenure_months=12,
+        status="approved",
+        created_at=datetime.utcnow()
+    )
+    db.session.add(loan)
+    return loan
+
+
 @coop_bp.route("/<slug>/join", methods=["POST"])
 @jwt_required()
 def join_group(slug):
@@ -261,6 +285,10 @@ def admin_reconcile_vault(slug):
                    .filter(TransactionLedger.group_id == grp.id,
                            TransactionLedger.ref_type.in_(OUT_TYPES)).scalar() or 0.0
 
+    # archived (cold) ledger rows are only present as checkpoint sums
+    inflows = float(inflows) + archived_totals("transaction_ledger", grp.id, IN_TYPES)["amount_sum"]
+    outflows = float(outflows) + archived_totals("transaction_ledger", grp.id, OUT_TYPES)["amount_sum"]
+
     expected_vault = float(inflows) - float(outflows)
 
     # 3) Delta & epsilon
@@ -871,26 +899,7 @@ def vote_on_loan(loan_request_id):
             # If approved -> create a Loan record (status = "approved") idempotently
             created_loan = None
             if result["approved"]:
-                existing_loan = Loan.query.filter_by(loan_request_id=lr.id).first()
-                if not existing_loan:
-                    interest_rate = float(CooperativeGroup.query.get(lr.group_id).interest_rate or 0.10)
-                    if interest_rate > 1:
-                        interest_rate = interest_rate / 100.0
-                    monthly_interest = float(lr.amount) * interest_rate / 12.0
-                    loan = Loan(
-                        loan_request_id=lr.id,
-                        group_id=lr.group_id,
-                        user_id=lr.user_id,
-                        principal=float(lr.amount),
-                        interest_rate_apy=interest_rate * 100.0,
-                        tenure_months=12,
-                        status="approved",
-                        created_at=datetime.utcnow()
-                    )
-                    db.session.add(loan)
-                    created_loan = loan
-                else:
-                    created_loan = existing_loan
+                created_loan = _loan_for_approved_request(lr)
 
             db.session.commit()
 
@@ -1259,6 +1268,13 @@ def list_repayments(slug):
         txq = txq.filter_by(user_id=uid)
 
     txrows = txq.order_by(TransactionLedger.created_at.desc()).all()
+    archive_filters = {"group_id": grp.id, "ref_type": "repayment"}
+    if membership.role == "admin":
+        if target_user_id:
+            archive_filters["user_id"] = target_user_id
+    else:
+        archive_filters["user_id"] = int(uid)
+    txrows = with_archive("transaction_ledger", txrows, **archive_filters)
     fallback = [{
         "loan_id": None,
         "payer_id": t.user_id,
@@ -1289,6 +1305,10 @@ def list_ledger(slug):
         q = q.filter_by(user_id=uid)  # 🔒 members see only their own entries
 
     txs = q.order_by(TransactionLedger.created_at.desc()).all()
+    archive_filters = {"group_id": grp.id}
+    if membership.role != "admin":
+        archive_filters["user_id"] = int(uid)
+    txs = with_archive("transaction_ledger", txs, **archive_filters)
     out = [{
         "ref_type": t.ref_type,
         "user_id": t.user_id,
@@ -2283,23 +2303,18 @@ def auto_settle_and_distribute_profits():
 
 
 # ----- WEBHOOK/CRON: credit_ledger_interest_accrual_job -----
-@coop_bp.route("/internal/cron/credit-interest", methods=["POST"])
-def credit_ledger_interest_accrual_job():
+def accrue_credit_interest() -> int:
     """
-    SYSTEM JOB (cron/webhook) — accrue interest on CreditLedger balances.
+    SYSTEM JOB (worker.py / cron webhook) — accrue interest on CreditLedger balances.
     - Iterates over all credit ledger rows.
     - If last_interest_calc is old, compute accrued interest since then.
     - Updates interest_earned + last_interest_calc.
     - Creates TransactionLedger entry.
-    No user/admin notifications triggered (system silent job).
+    No user/admin notifications triggered (system silent job). Returns rows updated;
+    raises if the commit fails.
     """
     from cooperative.models import CreditLedger, TransactionLedger
 
-    # optional: auth check via secret header
-    secret = request.headers.get("X-CRON-SECRET")
-    if secret != os.getenv("CRON_SECRET_KEY", "supersecret"):
-        return jsonify({"error": "Unauthorized"}), 403
-
     now = datetime.utcnow()
     rows = CreditLedger.query.all()
     updated = 0
@@ -2337,8 +2352,22 @@ def credit_ledger_interest_accrual_job():
 
     try:
         db.session.commit()
-    except Exception as e:
+    except Exception:
         db.session.rollback()
+        raise
+    return updated
+
+
+@coop_bp.route("/internal/cron/credit-interest", methods=["POST"])
+def credit_ledger_interest_accrual_job():
+    # optional: auth check via secret header
+    secret = request.headers.get("X-CRON-SECRET")
+    if secret != os.getenv("CRON_SECRET_KEY", "supersecret"):
+        return jsonify({"error": "Unauthorized"}), 403
+
+    try:
+        updated = accrue_credit_interest()
+    except Exception as e:
         return jsonify({"error": "DB commit failed", "detail": str(e)}), 500
 
     return jsonify({"message": f"Accrual done", "updated": updated}), 200
@@ -2366,7 +2395,7 @@ def create_group():
         return jsonify({"error": "Name too short (min 3 chars)"}), 400
 
     # 1) Create Hedera account for the group (vault)
-    acct = create_hedera_account(user_id=None, metadata={"type": "cooperative"})
+    acct = account_pool.acquire_account(user_id=None, metadata={"type": "cooperative"})
     if not acct or not acct.get("account_id"):
         return jsonify({"error": "Failed to create group Hedera account"}), 500
     coop_acct = acct["account_id"]
@@ -2511,6 +2540,10 @@ def get_withdrawals(slug):
         q = q.filter_by(user_id=uid)
 
     rows = q.order_by(TransactionLedger.created_at.desc()).all()
+    archive_filters = {"group_id": grp.id, "ref_type": "withdraw"}
+    if membership.role != "admin":
+        archive_filters["user_id"] = int(uid)
+    rows = with_archive("transaction_ledger", rows, **archive_filters)
     out = []
     for t in rows:
         # note: total_paid = principal + interest (already recorded in ledger.amount)
@@ -2709,7 +2742,8 @@ def hedera_activity(slug, user_id):
     kyc_event = HCSMessageLog.query.filter_by(
         group_id=group_id, msg_type="KYC_FILE"
     ).order_by(HCSMessageLog.created_at.desc()).first()
-    kyc_stored = bool(kyc_event)
+    kyc_stored = bool(kyc_event) or archived_totals(
+        "hcs_message_logs", group_id, ["KYC_FILE"])["row_count"] > 0
 
     # --- check trust score updates from TrustScoreHistory
     trust_event = TrustScoreHistory.query.filter_by(
@@ -2717,16 +2751,29 @@ def hedera_activity(slug, user_id):
     ).order_by(TrustScoreHistory.created_at.desc()).first()
     trust_updates = bool(trust_event)
 
+    # --- on-chain TrustScoreUpdated events (filled by hedera_sdk.contract_indexer)
+    ev = (ContractEventLog.query
+          .filter_by(group_id=group_id, user_id=user_id, event_name="TrustScoreUpdated")
+          .order_by(ContractEventLog.block_number.desc()).first())
+    if ev is None:
+        cold = archived_rows("contract_event_logs", group_id=group_id, user_id=user_id,
+                             event_name="TrustScoreUpdated")
+        ev = max(cold, key=lambda r: r.block_number or 0) if cold else None
+    trust_onchain = {"tx_hash": ev.tx_hash, "block_number": ev.block_number,
+                     "at": ev.created_at.strftime("%Y-%m-%d %H:%M:%S")} if ev else None
+
     # --- check HTS token txns in contract events
     hts_event = ContractEventLog.query.filter_by(
         group_id=group_id, event_name="HTS_TRANSFER"
     ).order_by(ContractEventLog.created_at.desc()).first()
-    hts_txns = bool(hts_event)
+    hts_txns = bool(hts_event) or archived_totals(
+        "contract_event_logs", group_id, ["HTS_TRANSFER"])["row_count"] > 0
 
     return jsonify({
         "wallet_linked": wallet_linked,
         "kyc_stored": kyc_stored,
-        "trust_updates": trust_updates,
+        "trust_updates": trust_updates or trust_onchain is not None,
+        "trust_onchain": trust_onchain,
         "hts_txns": hts_txns,
     })
 
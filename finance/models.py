@@ -55,7 +55,7 @@ class TransactionHistory(db.Model):
     to_account = db.Column(db.String(50))    # '0.0.y' of recipient
 
     # Hedera network details
-    hedera_tx_id = db.Column(db.String(255))   # transaction id/hash
+    hedera_tx_id = db.Column(db.String(255), index=True)   # transaction id/hash (outbox dedupe lookup)
     hedera_path = db.Column(db.Text)           # JSON string: ["0.0.sender","0.0.receiver"]
 
     # Extra context (JSON string)
@@ -187,15 +187,22 @@ class OutboxTransfer(db.Model):
     asset_type = db.Column(db.String(16), nullable=False, default="HBAR")         # 'HBAR' | 'BHC'
     token_id = db.Column(db.String(64), nullable=True)                            # HTS token id if BHC
     purpose = db.Column(db.String(255), nullable=True)
-    status = db.Column(db.String(32), nullable=False, default="pending")          # pending, sending, sent, failed
+    status = db.Column(db.String(32), nullable=False, default="pending")          # pending, sending, sent, done, failed, dead, cancelled
     attempts = db.Column(db.Integer, default=0)                                   # number of send attempts
     last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, nullable=True)                       # NULL = due now; backoff after a failure
+    lease_expires_at = db.Column(db.DateTime, nullable=True)                      # set while a worker holds the row ('sending')
+    claimed_by = db.Column(db.String(64), nullable=True)                          # claim token of that worker
     hedera_tx_id = db.Column(db.String(255), nullable=True)                       # last successful tx id
     hedera_path = db.Column(db.Text, nullable=True)                               # optional path/trace JSON
     meta = db.Column(db.Text, nullable=True)                                      # raw payload / context
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        db.Index("ix_outbox_transfers_status_next", "status", "next_attempt_at"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -208,6 +215,7 @@ class OutboxTransfer(db.Model):
             "status": self.status,
             "attempts": self.attempts,
             "last_error": self.last_error,
+            "next_attempt_at": self.next_attempt_at.strftime("%Y-%m-%d %H:%M:%S") if self.next_attempt_at else None,
             "hedera_tx_id": self.hedera_tx_id,
             "hedera_path": self.hedera_path,
             "meta": self.meta,
@@ -220,7 +228,7 @@ class OutboxAttempt(db.Model):
     __tablename__ = "outbox_attempts"
 
     id = db.Column(db.Integer, primary_key=True)
-    outbox_id = db.Column(db.Integer, db.ForeignKey("outbox_transfers.id"), nullable=False)
+    outbox_id = db.Column(db.Integer, db.ForeignKey("outbox_transfers.id"), nullable=False, index=True)
     attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     success = db.Column(db.Boolean, nullable=False, default=False)
     hedera_tx_id = db.Column(db.String(255), nullable=True)
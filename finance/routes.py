@@ -11,11 +11,10 @@ from finance.models import FraudLog
 from users.models import User
 from hedera_sdk.transfer import transfer_hbar
 from hedera_sdk.token_service import transfer_asset
-from hedera import PrecheckStatusException, ReceiptStatusException
+from hedera_sdk import jvm  # 💤 SDK/JVM loads on first use, not at import
 import traceback
 import json
 from ai_engine.smart_contracts import process_repayment as sc_process_repayment
-from jnius import JavaException  # 👈 catch Hedera Java SDK errors cleanly
 from finance.models import OutboxTransfer
 
 finance_bp = Blueprint('finance', __name__, url_prefix='/api/finance')
@@ -131,7 +130,7 @@ def transfer_money():
         }), 200
 
 
-    except JavaException as je:
+    except jvm.JavaException as je:  # 👈 catch Hedera Java SDK errors cleanly
         db.session.rollback()
         traceback.print_exc()
         return jsonify({"error": "Hedera Java error", "details": str(je)}), 502
@@ -235,6 +234,7 @@ def bhc_setup_user():
         }), 400
 
     from hedera_sdk.wallet import ensure_token_ready_for_account
+    from hedera_sdk import token_status
     from jnius import JavaException
 
     out = {
@@ -243,6 +243,13 @@ def bhc_setup_user():
         "token_id": token_id
     }
 
+    # ✅ already associated + KYC'd (local cache / mirror) -> no tx needed
+    if token_status.is_ready(user.hedera_account_id, token_id):
+        if user.kyc_status != "verified":
+            user.kyc_status = "verified"
+            db.session.commit()
+        return jsonify({"message": "BHC already ready for this user", "cached": True, **out}), 200
+
     tries = 3
     for attempt in range(1, tries + 1):
         try:
@@ -275,6 +282,8 @@ def bhc_setup_user():
             already_assoc = "TOKEN_ALREADY_ASSOCIATED_TO_ACCOUNT" in msg
             already_kyc = "ACCOUNT_KYC_ALREADY_GRANTED_FOR_TOKEN" in msg
             if already_assoc or already_kyc:
+                token_status.mark(user.hedera_account_id, token_id, associated=True,
+                                  kyc_granted=True if already_kyc else None)
                 user.kyc_status = "verified"
                 db.session.commit()
                 out["note"] = "Already associated/KYC-granted"
@@ -295,6 +304,7 @@ def bhc_setup_user():
 def bhc_setup_all_verified():
     """
     Associates + grants KYC for ALL users with kyc_status == 'verified'.
+    Accounts already ready per token_status cache are skipped (no network call).
     """
     token_id = os.getenv("BHC_TOKEN_ID")
     op_key = os.getenv("HEDERA_OPERATOR_KEY")
@@ -304,22 +314,32 @@ def bhc_setup_all_verified():
         return jsonify({"error": "Missing HEDERA_OPERATOR_KEY in env"}), 500
 
     from hedera_sdk.token_service import associate_token_with_account, grant_kyc
+    from hedera_sdk import token_status
 
     users = User.query.filter(User.kyc_status == "verified").all()
-    done, errors = [], []
+    ready = token_status.ready_accounts(token_id, [u.hedera_account_id for u in users if u.hedera_account_id])
+    done, errors, skipped = [], [], []
 
     for u in users:
         if not u.hedera_account_id:
             errors.append({"user_id": u.id, "error": "no hedera_account_id"})
             continue
+        if u.hedera_account_id in ready or token_status.is_ready(u.hedera_account_id, token_id):
+            skipped.append({"user_id": u.id, "account": u.hedera_account_id})
+            continue
         try:
-            a = associate_token_with_account(token_id, u.hedera_account_id, op_key)
+            cached = token_status.get_status(u.hedera_account_id, token_id)
+            a = "already" if cached is not None and cached.associated else \
+                associate_token_with_account(token_id, u.hedera_account_id, op_key)
+            token_status.mark(u.hedera_account_id, token_id, associated=True)
             k = grant_kyc(token_id, u.hedera_account_id, op_key)
+            token_status.mark(u.hedera_account_id, token_id, kyc_granted=True)
             done.append({"user_id": u.id, "account": u.hedera_account_id, "associate": a, "kyc": k})
         except Exception as e:
             errors.append({"user_id": u.id, "account": u.hedera_account_id, "error": str(e)})
 
-    return jsonify({"processed": len(users), "success": done, "errors": errors}), 200
+    return jsonify({"processed": len(users), "skipped_ready": len(skipped),
+                    "success": done, "skipped": skipped, "errors": errors}), 200
 
 
 # -------------------------------------------------------------------
@@ -353,6 +373,7 @@ def bhc_associate_with_privkey():
 
     # Import inside to avoid circulars
     from hedera_sdk.token_service import associate_token_with_account, grant_kyc
+    from hedera_sdk import token_status
     from jnius import JavaException
 
     out = {"account_id": account_id, "token_id": token_id}
@@ -367,6 +388,7 @@ def bhc_associate_with_privkey():
         out["associate_error"] = msg
         if "TOKEN_ALREADY_ASSOCIATED_TO_ACCOUNT" not in msg:
             return jsonify({"error": "Associate failed", "details": msg}), 502
+    token_status.mark(account_id, token_id, associated=True)
 
     # 2) KYC grant (signed by operator/treasury key, because you set KycKey to treasury pub)
     if do_grant:
@@ -378,6 +400,7 @@ def bhc_associate_with_privkey():
             out["kyc_error"] = msg
             if "ACCOUNT_KYC_ALREADY_GRANTED_FOR_TOKEN" not in msg:
                 return jsonify({"error": "KYC grant failed", "details": msg}), 502
+        token_status.mark(account_id, token_id, kyc_granted=True)
 
     return jsonify({"message": "Association/KYC processed", **out}), 200
 
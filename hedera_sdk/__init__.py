@@ -1,25 +1,38 @@
 # hedera_sdk/__init__.py
-from .config import get_config, record_file_on_hedera
-from .wallet import create_hedera_account, fetch_wallet_balance
-from .consensus_service import publish_to_consensus
-from .token_service import create_token_for_group, transfer_hts_token
-from .schedule_service import schedule_reminder_job
-from .mirror_node import mirror_node_fetch_transactions
-from .smart_contracts import create_loan_onchain, repay_loan_onchain, get_loan_onchain
-from .kyc_service import set_kyc_status, is_kyc_approved
+import os as _os
+import importlib as _importlib
 
-__all__ = [
-    "get_config",
-    "record_file_on_hedera",
-    "create_hedera_account",
-    "fetch_wallet_balance",
-    "publish_to_consensus",
-    "create_token_for_group",
-    "transfer_hts_token",
-    "schedule_reminder_job",
-    "mirror_node_fetch_transactions",
-    "sc_disburse_loan",
-    "sc_process_repayment",
-    "set_kyc_status",
-    "is_kyc_approved",
-]
+# 🧪 HEDERA_BACKEND=simulator -> in-memory network instead of the Java SDK (must run before any `hedera` import)
+if _os.getenv("HEDERA_BACKEND", "java").strip().lower() == "simulator":
+    from . import simulator as _simulator
+    _simulator.install()
+
+# 💤 Re-exports load their submodule on first access, so `import hedera_sdk` stays cheap
+_EXPORTS = {
+    "get_config": ".config",
+    "record_file_on_hedera": ".config",
+    "create_hedera_account": ".wallet",
+    "fetch_wallet_balance": ".wallet",
+    "publish_to_consensus": ".consensus_service",
+    "create_token_for_group": ".token_service",
+    "transfer_hts_token": ".token_service",
+    "transfer_hts_batch": ".token_service",
+    "schedule_reminder_job": ".schedule_service",
+    "create_schedules": ".schedule_service",
+    "mirror_node_fetch_transactions": ".mirror_node",
+    "create_loan_onchain": ".smart_contracts",
+    "repay_loan_onchain": ".smart_contracts",
+    "get_loan_onchain": ".smart_contracts",
+    "set_kyc_status": ".kyc_service",
+    "is_kyc_approved": ".kyc_service",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(_importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
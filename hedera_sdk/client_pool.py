@@ -0,0 +1,205 @@
+# hedera_sdk/client_pool.py
+"""
+Process-wide registry of long-lived Hedera clients.
+
+A Java SDK `Client` is thread-safe and owns one gRPC channel per network node, so
+building a fresh one per call (old transfer.get_client / nft.get_client /
+kyc_service / bank_admin) re-created every channel each time. The registry keeps a
+small pool of clients per (network, operator) and hands them out round-robin;
+pool size is therefore the number of channels we keep open to each node.
+"""
+import os
+import time
+import hashlib
+import logging
+import threading
+
+from . import jvm
+
+Client, AccountId, PrivateKey = jvm.lazy_import("hedera", "Client", "AccountId", "PrivateKey")
+
+log = logging.getLogger("hedera.client_pool")
+
+HEDERA_CLIENT_POOL_SIZE = int(os.getenv("HEDERA_CLIENT_POOL_SIZE", "2"))           # clients (channels/node) per operator
+HEDERA_REQUEST_TIMEOUT_S = int(os.getenv("HEDERA_REQUEST_TIMEOUT_S", "20"))
+HEDERA_MAX_ATTEMPTS = int(os.getenv("HEDERA_MAX_ATTEMPTS", "10"))
+HEDERA_MAX_NODES_PER_TX = int(os.getenv("HEDERA_MAX_NODES_PER_TX", "0"))           # 0 = SDK default
+HEDERA_HEALTHCHECK_INTERVAL_S = int(os.getenv("HEDERA_HEALTHCHECK_INTERVAL_S", "300"))
+# a rebuilt slot's old client may still be mid-call in other threads (checkout has no
+# borrower count): it is closed only after the longest a call can take on it
+HEDERA_CLIENT_RETIRE_GRACE_S = int(os.getenv("HEDERA_CLIENT_RETIRE_GRACE_S",
+                                             str(max(60, HEDERA_REQUEST_TIMEOUT_S * 3))))
+
+
+def default_network() -> str:
+    """HEDERA_NETWORK wins; otherwise PRODUCTION=true means mainnet (legacy transfer/nft behaviour)."""
+    net = (os.getenv("HEDERA_NETWORK") or "").strip().lower()
+    if net:
+        return "mainnet" if net in {"mainnet", "prod", "production"} else net
+    return "mainnet" if os.getenv("PRODUCTION", "false").strip().lower() == "true" else "testnet"
+
+
+def _fingerprint(secret: str) -> str:
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()[:16]
+
+
+def _build_client(network: str, operator_id: str, operator_key: str) -> Client:
+    if network == "mainnet":
+        client = Client.forMainnet()
+    elif network == "previewnet":
+        client = Client.forPreviewnet()
+    else:
+        client = Client.forTestnet()
+
+    client.setOperator(AccountId.fromString(operator_id), PrivateKey.fromString(operator_key))
+
+    try:
+        from jnius import autoclass
+        Duration = autoclass('java.time.Duration')
+        client.setRequestTimeout(Duration.ofSeconds(HEDERA_REQUEST_TIMEOUT_S))
+    except Exception:
+        # ignore if jnius not present
+        pass
+    try:
+        client.setMaxAttempts(HEDERA_MAX_ATTEMPTS)
+        if HEDERA_MAX_NODES_PER_TX > 0:
+            client.setMaxNodesPerTransaction(HEDERA_MAX_NODES_PER_TX)
+    except Exception as e:
+        log.debug("Client tuning skipped: %s", e)
+
+    return client
+
+
+class _PooledSlot:
+    def __init__(self, builder):
+        self._builder = builder
+        self.client = builder()
+        self.healthy = True
+        self.last_check = time.time()
+        self.last_error = None
+        self.checking = False
+
+    def rebuild(self):
+        old = self.client
+        self.client = self._builder()
+        self.healthy = True
+        _retire(old)
+
+
+def _close_quietly(client):
+    try:
+        client.close()
+    except Exception:
+        pass
+
+
+def _retire(client):
+    """Close a replaced client once in-flight calls on it have had time to finish."""
+    t = threading.Timer(HEDERA_CLIENT_RETIRE_GRACE_S, _close_quietly, args=(client,))
+    t.daemon = True
+    t.start()
+
+
+class _ClientPool:
+    """Round-robin pool of clients for one (network, operator)."""
+
+    def __init__(self, network: str, operator_id: str, operator_key: str, size: int):
+        self.network = network
+        self.operator_id = operator_id
+        self._builder = lambda: _build_client(network, operator_id, operator_key)
+        self._slots = [_PooledSlot(self._builder) for _ in range(max(1, size))]
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def checkout(self) -> Client:
+        with self._lock:
+            slot = self._slots[self._next % len(self._slots)]
+            self._next += 1
+            stale = (time.time() - slot.last_check) >= HEDERA_HEALTHCHECK_INTERVAL_S
+            if stale and not slot.checking and HEDERA_HEALTHCHECK_INTERVAL_S > 0:
+                slot.checking = True
+                threading.Thread(target=self._health_check, args=(slot,), daemon=True).start()
+            return slot.client
+
+    def _health_check(self, slot: _PooledSlot):
+        """Ping one node in the background; rebuild the client (fresh channels) on failure."""
+        try:
+            slot.client.ping(AccountId.fromString("0.0.3"))
+            slot.healthy = True
+            slot.last_error = None
+        except Exception as e:
+            slot.healthy = False
+            slot.last_error = str(e)[:200]
+            log.warning("Hedera client health check failed (%s/%s): %s — rebuilding",
+                        self.network, self.operator_id, e)
+            try:
+                slot.rebuild()
+            except Exception as rebuild_err:
+                log.exception("Hedera client rebuild failed: %s", rebuild_err)
+        finally:
+            slot.last_check = time.time()
+            slot.checking = False
+
+    def status(self) -> dict:
+        return {
+            "network": self.network,
+            "operator_id": self.operator_id,
+            "size": len(self._slots),
+            "slots": [{
+                "healthy": s.healthy,
+                "last_check": s.last_check,
+                "last_error": s.last_error,
+            } for s in self._slots],
+        }
+
+    def close(self):
+        for s in self._slots:
+            try:
+                s.client.close()
+            except Exception:
+                pass
+
+
+_POOLS: dict[tuple, _ClientPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def has_operator() -> bool:
+    return bool(os.getenv("HEDERA_OPERATOR_ID") and os.getenv("HEDERA_OPERATOR_KEY"))
+
+
+def get_client(network: str | None = None,
+               operator_id: str | None = None,
+               operator_key: str | None = None) -> Client:
+    """
+    Return a pooled client for (network, operator). Defaults to the env operator.
+    Raises RuntimeError if no operator credentials are available.
+    """
+    network = (network or default_network()).lower()
+    operator_id = operator_id or os.getenv("HEDERA_OPERATOR_ID")
+    operator_key = operator_key or os.getenv("HEDERA_OPERATOR_KEY")
+    if not operator_id or not operator_key:
+        raise RuntimeError("Hedera client not initialized (HEDERA_OPERATOR_ID / HEDERA_OPERATOR_KEY missing)")
+
+    key = (network, operator_id, _fingerprint(operator_key))
+    pool = _POOLS.get(key)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(key)
+            if pool is None:
+                pool = _ClientPool(network, operator_id, operator_key, HEDERA_CLIENT_POOL_SIZE)
+                _POOLS[key] = pool
+                log.info("✅ Hedera client pool ready for operator %s (network=%s, size=%s)",
+                         operator_id, network, HEDERA_CLIENT_POOL_SIZE)
+    return pool.checkout()
+
+
+def registry_status() -> list[dict]:
+    return [p.status() for p in list(_POOLS.values())]
+
+
+def close_all():
+    with _POOLS_LOCK:
+        for p in _POOLS.values():
+            p.close()
+        _POOLS.clear()
@@ -6,7 +6,6 @@ import os
 import logging
 from dataclasses import dataclass
 from datetime import datetime
-from hedera import Client, AccountId, PrivateKey, PublicKey
 
 # configure logging (so prints become manageable)
 logging.basicConfig(level=logging.INFO)
@@ -26,40 +25,9 @@ class HederaConfig:
 
 _cfg = HederaConfig()
 
-# Global Hedera Client (initialized if operator creds present)
-client = None
-if _cfg.operator_id and _cfg.operator_key:
-    try:
-        priv_key = PrivateKey.fromString(_cfg.operator_key)
-        pub_key = None
-        if _cfg.operator_pub:
-            try:
-                pub_key = PublicKey.fromString(_cfg.operator_pub)
-            except Exception as e:
-                log.warning("Public key load failed (%s) — continuing with private key only", e)
-
-        # Client.forName is used in your code; map testnet/mainnet
-        if _cfg.network and _cfg.network.lower() in {"mainnet", "prod", "production"}:
-            client = Client.forMainnet()
-        else:
-            client = Client.forTestnet()
-
-        client.setOperator(AccountId.fromString(_cfg.operator_id), priv_key)
-
-        # Try setting a request timeout if JVM jnius is available
-        try:
-            from jnius import autoclass
-            Duration = autoclass('java.time.Duration')
-            client.setRequestTimeout(Duration.ofSeconds(20))
-        except Exception:
-            # ignore if jnius not present
-            pass
-
-        log.info("✅ Hedera Client initialized for operator %s (network=%s)", _cfg.operator_id, _cfg.network)
-    except Exception as e:
-        client = None
-        log.exception("❌ Hedera Client init failed: %s", e)
-else:
+# NOTE: clients are no longer built here at import time — use
+# hedera_sdk.client_pool.get_client() (pooled, shared per network/operator).
+if not (_cfg.operator_id and _cfg.operator_key):
     # don't loudly print — log at debug so you can enable it when needed
     log.debug("Hedera operator not configured: HEDERA_OPERATOR_ID / HEDERA_OPERATOR_KEY missing")
 
@@ -2,27 +2,33 @@
 import os
 import json
 from datetime import datetime
-import requests
-from hedera import (
-    TopicCreateTransaction,
-    TopicMessageSubmitTransaction,
-    TopicId
-)
-from .config import client, get_config
+from . import jvm
+from .instrument import instrumented
+from .mirror_node import get_mirror_client, decode_topic_message
+from .client_pool import get_client
+from .receipts import submitted
 
-# 🔑 Load once from .env at module import
-_DEFAULT_TOPIC_ID: TopicId | None = None
-if os.getenv("HEDERA_TOPIC_ID"):
-    _DEFAULT_TOPIC_ID = TopicId.fromString(os.getenv("HEDERA_TOPIC_ID"))
+TopicCreateTransaction, TopicMessageSubmitTransaction, TopicId = jvm.lazy_import(
+    "hedera", "TopicCreateTransaction", "TopicMessageSubmitTransaction", "TopicId")
 
+# 🔑 HEDERA_TOPIC_ID from .env, parsed on first publish (not at import -> no JVM start)
+_DEFAULT_TOPIC_ID = None
 
+
+def _default_topic():
+    global _DEFAULT_TOPIC_ID
+    if _DEFAULT_TOPIC_ID is None and os.getenv("HEDERA_TOPIC_ID"):
+        _DEFAULT_TOPIC_ID = TopicId.fromString(os.getenv("HEDERA_TOPIC_ID"))
+    return _DEFAULT_TOPIC_ID
+
+
+@instrumented("hcs_topic_create")
 def create_consensus_topic(memo: str = "KYC_AUDIT_LOGS") -> str:
     """
     Ek naya HCS Topic banata hai.
     Iska topic_id save karlo DB ya env me, baar-baar create mat karo.
     """
-    if not client:
-        raise RuntimeError("Hedera client not initialized")
+    client = get_client()
 
     tx = TopicCreateTransaction().setTopicMemo(memo).execute(client)
     receipt = tx.getReceipt(client)
@@ -35,17 +41,19 @@ def create_consensus_topic(memo: str = "KYC_AUDIT_LOGS") -> str:
     return topic_id
 
 
-def publish_to_consensus(message: dict | str, topic_id: str | None = None) -> dict:
+@instrumented("hcs_publish")
+def publish_to_consensus(message: dict | str, topic_id: str | None = None,
+                         wait_for_receipt: bool = True, on_receipt=None, max_chunks: int | None = None) -> dict:
     """
     Message ko Hedera Consensus Service (HCS) par publish karega.
+    wait_for_receipt=False -> turant tx_id return, sequence baad me receipt_tracker se.
+    max_chunks -> 1024-byte chunks allowed for a big message (sequence = first chunk).
     """
-    if not client:
-        raise RuntimeError("Hedera client not initialized")
+    client = get_client()
 
-    global _DEFAULT_TOPIC_ID
     if topic_id:
         topic = TopicId.fromString(topic_id)
-    elif _DEFAULT_TOPIC_ID:
+    elif _default_topic():
         topic = _DEFAULT_TOPIC_ID
     else:
         raise RuntimeError("No TopicId available. Call create_consensus_topic() first or pass topic_id.")
@@ -53,12 +61,16 @@ def publish_to_consensus(message: dict | str, topic_id: str | None = None) -> di
     # Message ko string bana do
     message_str = json.dumps(message) if not isinstance(message, str) else message
 
-    tx = (
-        TopicMessageSubmitTransaction()
-        .setTopicId(topic)
-        .setMessage(message_str)
-        .execute(client)
-    )
+    tx = TopicMessageSubmitTransaction().setTopicId(topic).setMessage(message_str)
+    if max_chunks:
+        tx = tx.setMaxChunks(max_chunks)
+    tx = tx.execute(client)
+    if not wait_for_receipt:
+        return submitted(tx, "hcs", on_receipt,
+                         topic_id=topic.toString(),
+                         consensus_ts=datetime.utcnow().isoformat() + "Z",
+                         message=message_str,
+                         sequence=None)
     receipt = tx.getReceipt(client)
 
     return {
@@ -72,38 +84,11 @@ def publish_to_consensus(message: dict | str, topic_id: str | None = None) -> di
 
 def fetch_topic_messages(topic_id: str, limit: int = 10) -> list[dict]:
     """
-    Hedera Mirror Node se recent messages fetch karta hai.
+    Hedera Mirror Node se recent messages fetch karta hai (newest first, shared pooled session).
     """
-    cfg = get_config()
-    url = f"{cfg.mirror_node_url}/api/v1/topics/{topic_id}/messages?order=desc&limit={limit}"
-
     try:
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-
-        messages = []
-        for m in data.get("messages", []):
-            try:
-                decoded = (
-                    bytes.fromhex(m["message"]).decode("utf-8")
-                    if "message" in m else None
-                )
-                parsed = json.loads(decoded) if decoded else None
-            except Exception:
-                decoded = None
-                parsed = None
-
-            messages.append({
-                "consensus_ts": m.get("consensus_timestamp"),
-                "seq": m.get("sequence_number"),
-                "raw": m.get("message"),
-                "decoded": decoded,
-                "parsed": parsed
-            })
-
-        return messages
-
+        page = next(get_mirror_client().topic_messages(topic_id, order="desc", limit=limit, max_pages=1), [])
+        return [decode_topic_message(m) for m in page]
     except Exception as e:
         print("❌ Error fetching topic messages:", e)
         return []
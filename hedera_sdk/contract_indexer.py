@@ -0,0 +1,155 @@
+# hedera_sdk/contract_indexer.py
+"""
+CoopTrust event indexer: eth_getLogs over the JSON-RPC relay -> contract_event_logs.
+
+- Block ranges adapt to the result size: a range that returned more than
+  CONTRACT_INDEXER_TARGET_LOGS (or that the relay rejected / timed out on) is
+  halved, a sparse one doubles, between MIN_RANGE and MAX_RANGE (the relay caps
+  eth_getLogs ranges).
+- Logs are decoded with the cached CoopTrust ABI (topic0 -> event) and
+  bulk-inserted; the cursor (MirrorCursor kind="evm_logs", last_sequence = last
+  block done) moves in the same commit, so a restart resumes from the next block
+  without re-inserting anything. Logs already stored for the range are skipped, and
+  (contract_id, tx_hash, log_index) is unique, so an overlapping run can't duplicate.
+"""
+import os
+import json
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from . import contracts
+
+COOPTRUST_CONTRACT = os.getenv("COOPTRUST_CONTRACT")
+CONTRACT_INDEXER_START_BLOCK = os.getenv("CONTRACT_INDEXER_START_BLOCK")       # default: current head
+CONTRACT_INDEXER_MIN_RANGE = int(os.getenv("CONTRACT_INDEXER_MIN_RANGE", "10"))
+CONTRACT_INDEXER_MAX_RANGE = int(os.getenv("CONTRACT_INDEXER_MAX_RANGE", "1000"))
+CONTRACT_INDEXER_TARGET_LOGS = int(os.getenv("CONTRACT_INDEXER_TARGET_LOGS", "500"))
+CONTRACT_INDEXER_MAX_RANGES = int(os.getenv("CONTRACT_INDEXER_MAX_RANGES", "200"))   # per run
+
+_ranges: dict[str, int] = {}        # contract -> current block range (process lifetime)
+_topics: dict[str, dict] = {}       # contract -> {topic0 hex: event name}
+
+
+def _hex(value) -> str:
+    h = value.hex() if hasattr(value, "hex") else str(value)
+    return h[2:].lower() if h.startswith("0x") else h.lower()
+
+
+def _event_topics(address: str) -> dict:
+    """topic0 -> event name from the CoopTrust ABI (computed once)."""
+    if address not in _topics:
+        from web3 import Web3
+        out = {}
+        for item in contracts.cooptrust_abi():
+            if item.get("type") != "event" or item.get("anonymous"):
+                continue
+            sig = f"{item['name']}({','.join(i['type'] for i in item['inputs'])})"
+            out[_hex(Web3.keccak(text=sig))] = item["name"]
+        _topics[address] = out
+    return _topics[address]
+
+
+def _decode(contract, names: dict, log) -> dict | None:
+    topics = log.get("topics") or []
+    name = names.get(_hex(topics[0])) if topics else None
+    if name is None:
+        return None                  # not a CoopTrust event we know (e.g. proxy / library logs)
+    ev = contract.events[name]().process_log(log)
+    return {"event": name, "args": {k: (v.hex() if isinstance(v, bytes) else v) for k, v in dict(ev["args"]).items()}}
+
+
+def _rows(contract, names: dict, address: str, logs: list, group_ids: set) -> list[dict]:
+    rows = []
+    for log in logs:
+        decoded = _decode(contract, names, log)
+        if decoded is None:
+            continue
+        args = decoded["args"]
+        gid = args.get("group_id")
+        uid = args.get("user_id")
+        ts = args.get("timestamp")
+        rows.append({
+            "group_id": int(gid) if gid is not None and int(gid) in group_ids else None,
+            "contract_id": address,
+            "event_name": decoded["event"],
+            "tx_hash": "0x" + _hex(log["transactionHash"]),
+            "block_number": int(log["blockNumber"]),
+            "log_index": int(log["logIndex"]),
+            "user_id": int(uid) if uid is not None else None,
+            "payload": json.dumps(args, default=str, sort_keys=True),
+            "created_at": datetime.utcfromtimestamp(int(ts)) if ts else datetime.utcnow(),
+        })
+    return rows
+
+
+def index_contract_events(address: str | None = None, max_ranges: int | None = None) -> dict:
+    """
+    Pull CoopTrust logs from the cursor up to the chain head. Needs an app context.
+    Returns {"contract", "from_block", "to_block", "events", "ranges", "range_size"}.
+    """
+    from extensions import db
+    from cooperative.models import ContractEventLog, CooperativeGroup
+    from .mirror_node import _get_cursor
+
+    address = address or COOPTRUST_CONTRACT
+    if not address:
+        raise RuntimeError("COOPTRUST_CONTRACT not set")
+    w3 = contracts.get_w3()
+    address = w3.to_checksum_address(address)
+    contract = contracts.get_cooptrust_instance(address)
+    names = _event_topics(address)
+
+    head = int(w3.eth.block_number)
+    cur = _get_cursor("evm_logs", address.lower())
+    if cur.last_sequence is None:
+        start = int(CONTRACT_INDEXER_START_BLOCK) if CONTRACT_INDEXER_START_BLOCK else head
+        cur.last_sequence = start - 1
+        db.session.commit()
+    first = cur.last_sequence + 1
+
+    size = _ranges.get(address, CONTRACT_INDEXER_MAX_RANGE // 2)
+    group_ids = {gid for (gid,) in db.session.query(CooperativeGroup.id).all()}
+    events = ranges = 0
+    while cur.last_sequence < head and ranges < (max_ranges or CONTRACT_INDEXER_MAX_RANGES):
+        lo = cur.last_sequence + 1
+        hi = min(lo + size - 1, head)
+        try:
+            logs = w3.eth.get_logs({"address": address, "fromBlock": lo, "toBlock": hi})
+        except Exception as e:
+            # "range too large" / result limit / timeout: shrink and retry the same start block
+            if size > CONTRACT_INDEXER_MIN_RANGE:
+                size = max(CONTRACT_INDEXER_MIN_RANGE, size // 2)
+                continue
+            raise RuntimeError(f"eth_getLogs {lo}-{hi} failed at minimum range: {e}") from e
+        ranges += 1
+
+        rows = _rows(contract, names, address, logs, group_ids)
+        if rows:
+            E = ContractEventLog
+            seen = set(db.session.query(E.tx_hash, E.log_index).filter(
+                E.contract_id == address, E.block_number.between(lo, hi)).all())
+            rows = [r for r in rows if (r["tx_hash"], r["log_index"]) not in seen]
+        if rows:
+            db.session.execute(insert(ContractEventLog), rows)
+        cur.last_sequence = hi
+        cur.records_synced = (cur.records_synced or 0) + len(rows)
+        cur.last_synced_at = datetime.utcnow()
+        try:
+            db.session.commit()               # rows + cursor together
+        except IntegrityError:
+            # another indexer stored this range in between; its rows and cursor win
+            db.session.rollback()
+            print(f"⚠️ Contract indexer overlap at blocks {lo}-{hi}, stopping this run")
+            break
+        events += len(rows)
+
+        if len(logs) > CONTRACT_INDEXER_TARGET_LOGS:
+            size = max(CONTRACT_INDEXER_MIN_RANGE, size // 2)
+        elif len(logs) < CONTRACT_INDEXER_TARGET_LOGS // 4:
+            size = min(CONTRACT_INDEXER_MAX_RANGE, size * 2)
+    _ranges[address] = size
+
+    return {"contract": address, "from_block": first, "to_block": cur.last_sequence,
+            "events": events, "ranges": ranges, "range_size": size}
@@ -1,50 +1,99 @@
 # hedera_sdk/contracts.py
+"""
+CoopTrust (EVM) helpers over the Hedera JSON-RPC relay.
+
+web3, the provider and the ABI/bytecode are loaded on first use (cached), so
+importing this module - and every blueprint that imports emit_trust_score - is free.
+"""
 import os
 import json
-from web3 import Web3
-from eth_account import Account
+import threading
+from functools import lru_cache
 from dotenv import load_dotenv
 
+from .instrument import instrumented, note_fee
+
 load_dotenv()
 
 # ---------------- CONFIG ----------------
-HEDERA_RPC_URL = "https://testnet.hashio.io/api"   # Hedera JSON-RPC relay
-w3 = Web3(Web3.HTTPProvider(HEDERA_RPC_URL))
+HEDERA_RPC_URL = os.getenv("HEDERA_RPC_URL", "https://testnet.hashio.io/api")   # Hedera JSON-RPC relay
 
 # ENV keys
 PRIVATE_KEY = os.getenv("HEDERA_EVM_PRIVATE_KEY")   # ✅ .env me dalna hoga
-OWNER_ADDR = None
-if PRIVATE_KEY:
-    acct = Account.from_key(PRIVATE_KEY)
-    OWNER_ADDR = acct.address
 
-# ABI & Bytecode (Remix compile karke artifacts folder me save karo)
-ABI_PATH = os.path.join("contracts", "build", "CoopTrust.abi.json")
-BIN_PATH = os.path.join("contracts", "build", "CoopTrust.bin.json")
+# ABI & Bytecode (Remix compile karke artifacts folder me save karo); resolved from
+# the repo root, not the cwd, so `flask` / gunicorn from another dir still finds them
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ABI_PATH = os.path.join(_ROOT, "contracts", "build", "CoopTrust.abi.json")
+BIN_PATH = os.path.join(_ROOT, "contracts", "build", "CoopTrust.bin.json")
+
+_w3_lock = threading.Lock()
+_w3 = None
+
+
+def get_w3():
+    """Shared Web3 instance (created on first use)."""
+    global _w3
+    if _w3 is None:
+        with _w3_lock:
+            if _w3 is None:
+                from web3 import Web3
+                _w3 = Web3(Web3.HTTPProvider(HEDERA_RPC_URL))
+    return _w3
+
 
-with open(ABI_PATH) as f:
-    COOPTRUST_ABI = json.load(f)
+@lru_cache(maxsize=1)
+def cooptrust_abi():
+    with open(ABI_PATH) as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=1)
+def cooptrust_bytecode():
+    with open(BIN_PATH) as f:
+        return json.load(f)["object"]
+
+
+@lru_cache(maxsize=1)
+def owner_address():
+    if not PRIVATE_KEY:
+        return None
+    from eth_account import Account
+    return Account.from_key(PRIVATE_KEY).address
 
-with open(BIN_PATH) as f:
-    COOPTRUST_BYTECODE = json.load(f)["object"]
 
 # ---------------- HELPERS ----------------
 def _sign_and_send(tx):
     """Signs and sends a transaction, waits for receipt"""
+    w3 = get_w3()
     signed = w3.eth.account.sign_transaction(tx, PRIVATE_KEY)
     raw_tx = getattr(signed, "rawTransaction", None) or getattr(signed, "raw_transaction", None)
     tx_hash = w3.eth.send_raw_transaction(raw_tx)
-    return w3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+    price = receipt.get("effectiveGasPrice") or tx.get("gasPrice") or 0
+    note_fee(int(receipt.gasUsed) * int(price) // 10**10)     # weibar -> tinybar
+    return receipt
+
+
+def warm_up():
+    """Load web3 + provider + ABI ahead of the first trust-score call."""
+    get_w3()
+    cooptrust_abi()
+    cooptrust_bytecode()
+    owner_address()
 
 
 # ---------------- DEPLOY ----------------
+@instrumented("contract_deploy")
 def deploy_cooptrust():
     """Deploy CoopTrust contract with OWNER as admin"""
-    contract = w3.eth.contract(abi=COOPTRUST_ABI, bytecode=COOPTRUST_BYTECODE)
+    w3 = get_w3()
+    owner = owner_address()
+    contract = w3.eth.contract(abi=cooptrust_abi(), bytecode=cooptrust_bytecode())
 
-    construct_txn = contract.constructor(OWNER_ADDR).build_transaction({
-        "from": OWNER_ADDR,
-        "nonce": w3.eth.get_transaction_count(OWNER_ADDR),
+    construct_txn = contract.constructor(owner).build_transaction({
+        "from": owner,
+        "nonce": w3.eth.get_transaction_count(owner),
         "gas": 3_000_000,
         "gasPrice": w3.eth.gas_price,
         "chainId": 296   # ✅ Hedera Testnet chainId
@@ -58,9 +107,10 @@ def deploy_cooptrust():
 # ---------------- INSTANCE ----------------
 def get_cooptrust_instance(address):
     """Return CoopTrust contract instance"""
-    return w3.eth.contract(address=address, abi=COOPTRUST_ABI)
+    return get_w3().eth.contract(address=address, abi=cooptrust_abi())
 
 # ---------------- TRUST SCORE UPDATE (emit event) ----------------
+@instrumented("contract_call")
 def emit_trust_score(contract_addr, user_id, group_id, score_x100, note=""):
     """
     Calls setTrustScore on CoopTrust smart contract.
@@ -72,16 +122,18 @@ def emit_trust_score(contract_addr, user_id, group_id, score_x100, note=""):
         # clamp score to 0–10000 (0–100 * 100)
         score_x100 = max(0, min(int(score_x100), 10000))
 
-        if not OWNER_ADDR or not PRIVATE_KEY:
+        if not PRIVATE_KEY or not owner_address():
             return {"status": "error", "error": "Missing OWNER private key in env"}
 
+        w3 = get_w3()
+        owner = owner_address()
         contract = get_cooptrust_instance(contract_addr)
 
         tx = contract.functions.setTrustScore(
             int(user_id), int(group_id or 0), score_x100, note or ""
         ).build_transaction({
-            "from": OWNER_ADDR,
-            "nonce": w3.eth.get_transaction_count(OWNER_ADDR),
+            "from": owner,
+            "nonce": w3.eth.get_transaction_count(owner),
             "gas": 200_000,
             "gasPrice": w3.eth.gas_price,
             "chainId": 296   # ✅ Hedera Testnet chainId
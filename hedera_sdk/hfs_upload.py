@@ -0,0 +1,299 @@
+# hedera_sdk/hfs_upload.py
+"""
+Chunked, resumable uploads to the Hedera File Service.
+
+The file is read in HFS_CHUNK_BYTES pieces: the first goes out with
+FileCreateTransaction, the rest as FileAppendTransaction. SHA-256 is updated per
+chunk, so the document is never held in memory as a whole.
+
+Appends to one file have to reach consensus in order, so submissions stay
+sequential. The pipelining is on our side: reading + building + freezing +
+signing of the next HFS_PREPARE_AHEAD chunks runs in a worker pool while the
+current chunk is on the network.
+
+Resume: progress lives in hfs_uploads (in-process fallback without an app
+context). upload_file(..., resume_id=...) asks the network how many bytes the
+file already holds, checks that prefix against the local file and continues
+from there, so a chunk that landed just before a crash is never appended twice.
+"""
+import os
+import uuid
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import has_app_context
+
+from . import jvm
+from . import signer
+from .instrument import instrumented
+from .client_pool import get_client
+
+FileCreateTransaction, FileAppendTransaction, FileContentsQuery, FileId, Hbar = jvm.lazy_import(
+    "hedera", "FileCreateTransaction", "FileAppendTransaction", "FileContentsQuery", "FileId", "Hbar")
+TransactionId = jvm.lazy_class('com.hedera.hashgraph.sdk.TransactionId')
+
+HFS_CHUNK_BYTES = int(os.getenv("HFS_CHUNK_BYTES", "4096"))           # fits one FileCreate / FileAppend tx
+HFS_PREPARE_AHEAD = int(os.getenv("HFS_PREPARE_AHEAD", "4"))          # chunks built + signed ahead
+HFS_MAX_FEE_HBAR = float(os.getenv("HFS_MAX_FEE_HBAR", "2"))
+HFS_CHECKPOINT_CHUNKS = int(os.getenv("HFS_CHECKPOINT_CHUNKS", "8"))  # DB progress write every N chunks
+HFS_VERIFY_SLICE_BYTES = 64 * 1024
+
+_LOCAL_STATE: dict[str, dict] = {}      # upload_id -> state, when there is no app context
+
+_STATE_FIELDS = ("upload_id", "file_path", "file_size", "file_mtime", "chunk_size", "file_id",
+                 "bytes_done", "chunks_done", "file_hash", "status", "last_error")
+
+
+# ---------------- state (DB row or in-process dict) ----------------
+def _load_state(upload_id: str) -> dict | None:
+    if has_app_context():
+        from .models import HFSUpload
+        row = HFSUpload.query.filter_by(upload_id=upload_id).first()
+        if row is not None:
+            return {f: getattr(row, f) for f in _STATE_FIELDS}
+    state = _LOCAL_STATE.get(upload_id)
+    return dict(state) if state else None
+
+
+def _save_state(state: dict):
+    _LOCAL_STATE[state["upload_id"]] = dict(state)
+    if not has_app_context():
+        return
+    from extensions import db
+    from .models import HFSUpload
+    try:
+        row = HFSUpload.query.filter_by(upload_id=state["upload_id"]).first()
+        if row is None:
+            row = HFSUpload(upload_id=state["upload_id"])
+            db.session.add(row)
+        for f in _STATE_FIELDS:
+            setattr(row, f, state[f])
+        db.session.commit()
+    except Exception as e:
+        # progress rows are bookkeeping; the upload itself carries on
+        db.session.rollback()
+        print(f"⚠️ HFS upload progress not saved for {state['upload_id']}: {e}")
+
+
+def upload_status(upload_id: str) -> dict | None:
+    state = _load_state(upload_id)
+    if state is None:
+        return None
+    size = state["file_size"] or 0
+    out = {k: state[k] for k in _STATE_FIELDS if k not in ("file_path", "file_mtime")}
+    out["progress"] = round(state["bytes_done"] / size, 4) if size else 1.0
+    return out
+
+
+# ---------------- helpers ----------------
+def _as_bytes(data) -> bytes:
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return bytes(data)
+    if hasattr(data, "toByteArray"):
+        data = data.toByteArray()
+    if isinstance(data, (bytes, bytearray)):
+        return bytes(data)
+    return bytes(b & 0xFF for b in data)          # jnius byte[] as list of signed ints
+
+
+def _content_slices(contents, step: int = HFS_VERIFY_SLICE_BYTES):
+    """Yield a FileContentsQuery result (Java ByteString or bytes) in slices."""
+    if isinstance(contents, (bytes, bytearray, memoryview)):
+        view = memoryview(contents)
+        for i in range(0, len(view), step):
+            yield bytes(view[i:i + step])
+        return
+    size = contents.size()
+    for i in range(0, size, step):
+        yield _as_bytes(contents.substring(i, min(i + step, size)))
+
+
+def _content_size(contents) -> int:
+    return len(contents) if isinstance(contents, (bytes, bytearray, memoryview)) else int(contents.size())
+
+
+def _file_id_str(receipt) -> str:
+    fid = receipt.fileId
+    try:
+        return str(fid.toString())
+    except Exception:
+        return str(fid)
+
+
+def _fetch_contents(client, file_id: str):
+    return FileContentsQuery().setFileId(FileId.fromString(file_id)).execute(client)
+
+
+def _hash_local_prefix(path: str, nbytes: int, sha, chunk_size: int):
+    """Feed the first nbytes of the local file into sha (no network)."""
+    with open(path, "rb") as f:
+        left = nbytes
+        while left > 0:
+            data = f.read(min(chunk_size, left))
+            if not data:
+                break
+            sha.update(data)
+            left -= len(data)
+
+
+def _fee():
+    return Hbar.fromTinybars(int(HFS_MAX_FEE_HBAR * 100_000_000))
+
+
+def _build_create(client, data: bytes, op_key):
+    tx = (FileCreateTransaction()
+          .setKeys(op_key.getPublicKey())
+          .setContents(data)
+          .setMaxTransactionFee(_fee()))
+    tx.setTransactionId(TransactionId.generate(client.getOperatorAccountId())).freezeWith(client)
+    return tx.sign(op_key)
+
+
+def _build_append(client, file_id: str, data: bytes, op_key):
+    tx = (FileAppendTransaction()
+          .setFileId(FileId.fromString(file_id))
+          .setContents(data)
+          .setMaxTransactionFee(_fee()))
+    tx.setTransactionId(TransactionId.generate(client.getOperatorAccountId())).freezeWith(client)
+    return tx.sign(op_key)
+
+
+def _submit(client, prepared, rebuild):
+    """Send a pre-signed tx; signer retries rebuild only when the network asks for a fresh one."""
+    first = [prepared]
+
+    def build(c):
+        return first.pop() if first else rebuild(c)
+
+    _resp, receipt = signer.sign_and_submit(build, client=client, lane="interactive")
+    status = receipt.status.toString()
+    if status != "SUCCESS":
+        raise RuntimeError(f"HFS chunk failed: {status}")
+    return receipt
+
+
+def _reconcile(client, state: dict):
+    """On resume: trust the network's byte count, after checking it against the local prefix."""
+    if not state["file_id"]:
+        state["bytes_done"] = state["chunks_done"] = 0
+        return
+    contents = _fetch_contents(client, state["file_id"])
+    remote = hashlib.sha256()
+    for piece in _content_slices(contents):
+        remote.update(piece)
+    size = _content_size(contents)
+    local = hashlib.sha256()
+    _hash_local_prefix(state["file_path"], size, local, state["chunk_size"])
+    if size > state["file_size"] or local.hexdigest() != remote.hexdigest():
+        raise RuntimeError(f"HFS file {state['file_id']} does not match the local prefix; start a new upload")
+    state["bytes_done"] = size
+    state["chunks_done"] = -(-size // state["chunk_size"])
+
+
+# ---------------- upload ----------------
+@instrumented("hfs_upload")
+def upload_file(file_path: str, progress=None, resume_id: str | None = None,
+                chunk_size: int | None = None, operator_key: str | None = None,
+                expected_hash: str | None = None) -> dict:
+    """
+    Stream file_path to HFS. progress(bytes_done, total_bytes) is called after each chunk.
+    expected_hash (e.g. computed while the upload was received) is checked against the
+    hash of the bytes actually sent, so the caller never has to re-read the file.
+    Returns {"file_id", "hash", "size", "chunks", "upload_id", "resumed"}; on failure
+    raises RuntimeError and the upload can be resumed with resume_id=<upload_id>.
+    """
+    client = get_client()
+    op_key = signer.private_key(operator_key or os.getenv("HEDERA_OPERATOR_KEY"))
+    size = os.path.getsize(file_path)
+    mtime = os.path.getmtime(file_path)
+
+    state = _load_state(resume_id) if resume_id else None
+    resumed = state is not None
+    if resumed:
+        if state["status"] == "done":
+            return {"file_id": state["file_id"], "hash": state["file_hash"], "size": state["file_size"],
+                    "chunks": state["chunks_done"], "upload_id": state["upload_id"], "resumed": True}
+        if state["file_size"] != size or (state["file_mtime"] and abs(state["file_mtime"] - mtime) > 1e-3):
+            raise RuntimeError(f"Local file changed since upload {resume_id} started; start a new upload")
+        state["file_path"] = file_path
+    else:
+        state = {"upload_id": uuid.uuid4().hex, "file_path": file_path, "file_size": size,
+                 "file_mtime": mtime, "chunk_size": int(chunk_size or HFS_CHUNK_BYTES), "file_id": None,
+                 "bytes_done": 0, "chunks_done": 0, "file_hash": None, "status": "uploading",
+                 "last_error": None}
+    step = state["chunk_size"]
+
+    try:
+        if resumed:
+            _reconcile(client, state)
+        state["status"], state["last_error"] = "uploading", None
+        _save_state(state)
+
+        sha = hashlib.sha256()
+        _hash_local_prefix(file_path, state["bytes_done"], sha, step)
+
+        with open(file_path, "rb") as f:
+            f.seek(state["bytes_done"])
+
+            # ---- chunk 0: FileCreate (also for an empty file) ----
+            if not state["file_id"]:
+                data = f.read(step)
+                sha.update(data)
+                receipt = _submit(client, _build_create(client, data, op_key),
+                                  lambda c, d=data: _build_create(c, d, op_key))
+                state["file_id"] = _file_id_str(receipt)
+                state["bytes_done"], state["chunks_done"] = len(data), 1
+                _save_state(state)
+                if progress:
+                    progress(state["bytes_done"], size)
+
+            # ---- appends: prepare ahead in the pool, submit in order ----
+            file_id = state["file_id"]
+            with ThreadPoolExecutor(max_workers=max(1, HFS_PREPARE_AHEAD),
+                                    thread_name_prefix="hfs-prepare") as pool:
+                window = []
+
+                def _fill():
+                    while len(window) < max(1, HFS_PREPARE_AHEAD):
+                        data = f.read(step)
+                        if not data:
+                            return
+                        sha.update(data)
+                        window.append((data, pool.submit(_build_append, client, file_id, data, op_key)))
+
+                _fill()
+                while window:
+                    data, fut = window.pop(0)
+                    _fill()
+                    _submit(client, fut.result(), lambda c, d=data: _build_append(c, file_id, d, op_key))
+                    state["bytes_done"] += len(data)
+                    state["chunks_done"] += 1
+                    if state["chunks_done"] % max(1, HFS_CHECKPOINT_CHUNKS) == 0:
+                        _save_state(state)
+                    if progress:
+                        progress(state["bytes_done"], size)
+
+        state["file_hash"] = sha.hexdigest()
+        if expected_hash and state["file_hash"] != expected_hash:
+            raise RuntimeError(f"hash mismatch: sent {state['file_hash']}, expected {expected_hash}")
+        state["status"] = "done"
+        _save_state(state)
+    except Exception as exc:
+        state["status"] = "failed"
+        state["last_error"] = str(exc)[:2000]
+        _save_state(state)
+        raise RuntimeError(f"Hedera upload failed (resume with upload_id={state['upload_id']}): {exc}") from exc
+
+    return {"file_id": state["file_id"], "hash": state["file_hash"], "size": size,
+            "chunks": state["chunks_done"], "upload_id": state["upload_id"], "resumed": resumed}
+
+
+# ---------------- verify ----------------
+@instrumented("hfs_verify")
+def file_sha256(file_id: str, client=None) -> str:
+    """SHA-256 of an HFS file, hashed slice by slice from the query result."""
+    contents = _fetch_contents(client or get_client(), file_id)
+    sha = hashlib.sha256()
+    for piece in _content_slices(contents):
+        sha.update(piece)
+    return sha.hexdigest()
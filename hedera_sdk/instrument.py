@@ -0,0 +1,184 @@
+# hedera_sdk/instrument.py
+"""
+Per-operation instrumentation for the hedera_sdk entry points.
+
+    @instrumented("token_transfer")
+    def transfer_hts_token(...): ...
+
+Every call records into middleware.monitor:
+  hedera_op_latency_seconds{op}         histogram
+  hedera_op_total{op,status}            SUCCESS / INSUFFICIENT_PAYER_BALANCE / BUSY / TimeoutException / ...
+  hedera_op_retries_total{op}           retries inside signer / create loops (note_retry)
+  hedera_op_fee_tinybars_total{op}      fees actually charged (note_fee; needs HEDERA_RECORD_FEES
+                                        for native tx, contract calls use gasUsed * gas price)
+
+Calls slower than HEDERA_SLOW_CALL_S go into a fixed-size ring buffer
+(HEDERA_SLOW_CALL_BUFFER) for the admin view; per-op summaries keep a bounded
+latency sample for p50 / p95. Memory stays fixed however long the process runs.
+"""
+import os
+import re
+import time
+import threading
+import contextvars
+from collections import deque
+from datetime import datetime, timezone
+from functools import wraps
+
+from middleware.monitor import metrics
+
+HEDERA_SLOW_CALL_S = float(os.getenv("HEDERA_SLOW_CALL_S", "2"))
+HEDERA_SLOW_CALL_BUFFER = int(os.getenv("HEDERA_SLOW_CALL_BUFFER", "200"))
+HEDERA_RECORD_FEES = os.getenv("HEDERA_RECORD_FEES", "false").lower() in ("1", "true", "yes")
+_SAMPLE_SIZE = 256                        # latencies kept per op for percentiles
+_OK = ("SUCCESS", "SUBMITTED")
+
+metrics.describe("hedera_op_latency_seconds", "Latency of hedera_sdk entry points")
+metrics.describe("hedera_op_total", "hedera_sdk calls by operation and final status")
+metrics.describe("hedera_op_retries_total", "Retries inside hedera_sdk calls")
+metrics.describe("hedera_op_fee_tinybars_total", "Transaction fees charged, in tinybars")
+
+_STATUS_RE = re.compile(r"status `?([A-Z][A-Z_]+)`?")
+_current = contextvars.ContextVar("hedera_op", default=None)
+_lock = threading.Lock()
+_slow = deque(maxlen=max(1, HEDERA_SLOW_CALL_BUFFER))
+_ops: dict[str, dict] = {}
+
+
+class _Call:
+    __slots__ = ("op", "retries", "fee")
+
+    def __init__(self, op: str):
+        self.op = op
+        self.retries = 0
+        self.fee = 0
+
+
+def note_retry(n: int = 1):
+    """Called by retry loops; attributed to the innermost instrumented call."""
+    call = _current.get()
+    if call is not None:
+        call.retries += n
+
+
+def note_fee(tinybars):
+    call = _current.get()
+    if call is not None and tinybars:
+        call.fee += int(tinybars)
+
+
+def note_record(resp, client):
+    """HEDERA_RECORD_FEES: fetch the tx record (a paid query) and note transactionFee."""
+    if not HEDERA_RECORD_FEES or _current.get() is None or not hasattr(resp, "getRecord"):
+        return
+    try:
+        note_fee(int(resp.getRecord(client).transactionFee.toTinybars()))
+    except Exception as e:
+        print(f"⚠️ fee record unavailable: {e}")
+
+
+def status_of(result=None, exc: BaseException | None = None) -> str:
+    """Hedera status code of an outcome: parsed from the SDK exception or the wrapper's dict."""
+    if exc is not None:
+        m = _STATUS_RE.search(str(exc))
+        if m:
+            return m.group(1)
+        if "TimeoutException" in str(exc):
+            return "TimeoutException"
+        return type(exc).__name__
+    if result is None:
+        return "ERROR"                    # wrappers that print + return None
+    if isinstance(result, dict):
+        if result.get("error"):
+            m = _STATUS_RE.search(str(result["error"]))
+            return m.group(1) if m else "ERROR"
+        if isinstance(result.get("failed"), int) and result["failed"]:
+            return "PARTIAL"              # batch payouts: some chunks failed
+        status = result.get("status")
+        if isinstance(status, str) and status:
+            return "SUCCESS" if status.lower() in ("ok", "success") else status.upper()
+    return "SUCCESS"
+
+
+def _record(op: str, took: float, status: str, call: _Call):
+    metrics.observe("hedera_op_latency_seconds", took, op=op)
+    metrics.inc("hedera_op_total", op=op, status=status)
+    if call.retries:
+        metrics.inc("hedera_op_retries_total", call.retries, op=op)
+    if call.fee:
+        metrics.inc("hedera_op_fee_tinybars_total", call.fee, op=op)
+
+    with _lock:
+        s = _ops.get(op)
+        if s is None:
+            s = _ops[op] = {"count": 0, "errors": 0, "retries": 0, "fee_tinybars": 0,
+                            "total_s": 0.0, "max_s": 0.0, "statuses": {},
+                            "sample": deque(maxlen=_SAMPLE_SIZE)}
+        s["count"] += 1
+        s["errors"] += status not in _OK
+        s["retries"] += call.retries
+        s["fee_tinybars"] += call.fee
+        s["total_s"] += took
+        s["max_s"] = max(s["max_s"], took)
+        s["statuses"][status] = s["statuses"].get(status, 0) + 1
+        s["sample"].append(took)
+        if took >= HEDERA_SLOW_CALL_S:
+            _slow.append({"op": op, "seconds": round(took, 3), "status": status,
+                          "retries": call.retries, "fee_tinybars": call.fee,
+                          "at": datetime.now(timezone.utc).isoformat()})
+
+
+def instrumented(op: str):
+    """Decorator for hedera_sdk entry points (sync functions)."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            call = _Call(op)
+            token = _current.set(call)
+            t0 = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                _current.reset(token)
+                _record(op, time.perf_counter() - t0, status_of(exc=e), call)
+                raise
+            _current.reset(token)
+            _record(op, time.perf_counter() - t0, status_of(result), call)
+            return result
+        return wrapper
+    return decorator
+
+
+# ---- admin view ----
+def _pct(values, p: float):
+    if not values:
+        return None
+    xs = sorted(values)
+    return round(xs[min(len(xs) - 1, int(len(xs) * p))], 4)
+
+
+def summary() -> dict:
+    with _lock:
+        ops = {}
+        for op, s in sorted(_ops.items()):
+            sample = list(s["sample"])
+            ops[op] = {
+                "count": s["count"],
+                "errors": s["errors"],
+                "retries": s["retries"],
+                "fee_hbar": s["fee_tinybars"] / 100_000_000,
+                "avg_s": round(s["total_s"] / s["count"], 4) if s["count"] else None,
+                "p50_s": _pct(sample, 0.50),
+                "p95_s": _pct(sample, 0.95),
+                "max_s": round(s["max_s"], 4),
+                "statuses": dict(s["statuses"]),
+            }
+        slow = list(_slow)
+    return {"slow_call_threshold_s": HEDERA_SLOW_CALL_S, "operations": ops,
+            "recent_slow_calls": slow[::-1]}
+
+
+def reset():
+    with _lock:
+        _ops.clear()
+        _slow.clear()
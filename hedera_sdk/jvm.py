@@ -0,0 +1,93 @@
+# hedera_sdk/jvm.py
+"""
+Lazy handles for the Java side of the Hedera SDK.
+
+`import hedera` / `import jnius` boots the JVM, so doing it at module level made
+every `import app` (and every `flask db ...` command) pay for JVM start-up. SDK
+modules and blueprints take proxies from here instead; the real import happens
+on the first call or attribute access:
+
+    AccountId, Hbar = jvm.lazy_import("hedera", "AccountId", "Hbar")
+    TransactionId = jvm.lazy_class("com.hedera.hashgraph.sdk.TransactionId")
+
+`except` needs a real exception class, so catch `jvm.JavaException` (resolved by
+module __getattr__ only when an exception is actually being matched; matching
+never boots the JVM).
+"""
+import sys
+import time
+import importlib
+import threading
+
+_lock = threading.Lock()
+
+
+class LazyAttr:
+    """Stand-in for `from <module> import <name>` (or a jnius autoclass) until first use."""
+
+    __slots__ = ("_module", "_name", "_java", "_target")
+
+    def __init__(self, module: str, name: str, java: bool = False):
+        self._module = module
+        self._name = name
+        self._java = java
+        self._target = None
+
+    def _resolve(self):
+        if self._target is None:
+            if self._java:
+                self._target = importlib.import_module("jnius").autoclass(self._name)
+            else:
+                self._target = getattr(importlib.import_module(self._module), self._name)
+        return self._target
+
+    def __getattr__(self, item):
+        return getattr(self._resolve(), item)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        state = "loaded" if self._target is not None else "lazy"
+        return f"<{state} {self._module}.{self._name}>"
+
+
+def lazy_import(module: str, *names: str):
+    """Proxies for `from module import a, b`; a single name returns a single proxy."""
+    proxies = tuple(LazyAttr(module, n) for n in names)
+    return proxies[0] if len(proxies) == 1 else proxies
+
+
+def lazy_class(java_name: str) -> LazyAttr:
+    """Proxy for `jnius.autoclass(java_name)`."""
+    return LazyAttr("jnius", java_name, java=True)
+
+
+def started() -> bool:
+    """True once the SDK (and with it the JVM) has been imported in this process."""
+    return "hedera" in sys.modules or "jnius" in sys.modules
+
+
+def start() -> float:
+    """Import jnius + hedera now (warm-up). Returns seconds spent; 0 if already up."""
+    with _lock:
+        if started():
+            return 0.0
+        t0 = time.perf_counter()
+        importlib.import_module("jnius")
+        importlib.import_module("hedera")
+        return time.perf_counter() - t0
+
+
+class _NotStarted(Exception):
+    """Matches nothing: with jnius never imported no Java exception can be in flight."""
+
+
+def __getattr__(name):
+    # jvm.JavaException -> jnius.JavaException; jvm.PrecheckStatusException -> hedera.*
+    if name == "JavaException":
+        jnius = sys.modules.get("jnius")
+        return jnius.JavaException if jnius is not None else _NotStarted
+    if name.startswith("_"):
+        raise AttributeError(name)
+    return getattr(importlib.import_module("hedera"), name)
@@ -0,0 +1,305 @@
+# hedera_sdk/models.py
+from datetime import datetime
+from extensions import db
+
+
+class HederaReceipt(db.Model):
+    """
+    One row per transaction submitted in submit-only mode. The receipt tracker
+    flips status from SUBMITTED to the final receipt status (SUCCESS, INVALID_SIGNATURE, ...)
+    or EXPIRED if no receipt shows up in time.
+    """
+    __tablename__ = "hedera_receipts"
+
+    id = db.Column(db.Integer, primary_key=True)
+    tx_id = db.Column(db.String(255), nullable=False, unique=True)     # "0.0.x@secs.nanos"
+    kind = db.Column(db.String(32), nullable=False, default="tx")      # transfer | hts_transfer | mint | kyc | hcs
+    status = db.Column(db.String(64), nullable=False, default="SUBMITTED", index=True)
+    ref_table = db.Column(db.String(64), nullable=True)                # optional pointer to the row that waits on it
+    ref_id = db.Column(db.Integer, nullable=True)
+    sequence_no = db.Column(db.BigInteger, nullable=True)              # HCS topic sequence (hcs only)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    submitted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    resolved_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "tx_id": self.tx_id,
+            "kind": self.kind,
+            "status": self.status,
+            "ref_table": self.ref_table,
+            "ref_id": self.ref_id,
+            "sequence_no": self.sequence_no,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "submitted_at": self.submitted_at.strftime("%Y-%m-%d %H:%M:%S") if self.submitted_at else None,
+            "resolved_at": self.resolved_at.strftime("%Y-%m-%d %H:%M:%S") if self.resolved_at else None,
+        }
+
+
+class MirrorCursor(db.Model):
+    """Where the last mirror-node sync stopped, per account (transactions) or topic (messages)."""
+    __tablename__ = "mirror_cursors"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(32), nullable=False)                    # account_tx | topic_msg | evm_logs
+    key = db.Column(db.String(64), nullable=False)                     # "0.0.x" account / topic id, 0x contract
+    last_timestamp = db.Column(db.String(32), nullable=True)           # mirror consensus_timestamp "secs.nanos"
+    last_sequence = db.Column(db.BigInteger, nullable=True)            # topic sequence number / last indexed block
+    records_synced = db.Column(db.Integer, nullable=False, default=0)
+    last_synced_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("kind", "key", name="uq_mirror_cursor_kind_key"),
+    )
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "key": self.key,
+            "last_timestamp": self.last_timestamp,
+            "last_sequence": self.last_sequence,
+            "records_synced": self.records_synced,
+            "last_synced_at": self.last_synced_at.strftime("%Y-%m-%d %H:%M:%S") if self.last_synced_at else None,
+        }
+
+
+class HCSBatch(db.Model):
+    """One row per envelope published for a batch (a batch may need several envelopes)."""
+    __tablename__ = "hcs_batches"
+
+    id = db.Column(db.Integer, primary_key=True)
+    batch_id = db.Column(db.String(32), nullable=False, index=True)
+    part_no = db.Column(db.Integer, nullable=False, default=0)
+    part_count = db.Column(db.Integer, nullable=False, default=1)
+    merkle_root = db.Column(db.String(64), nullable=False)
+    entry_count = db.Column(db.Integer, nullable=False)            # leaves in the whole batch
+    topic_id = db.Column(db.String(64), nullable=True)
+    tx_id = db.Column(db.String(255), nullable=True, index=True)
+    sequence_no = db.Column(db.BigInteger, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="published")   # published | confirmed | failed
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "batch_id": self.batch_id,
+            "part_no": self.part_no,
+            "part_count": self.part_count,
+            "merkle_root": self.merkle_root,
+            "entry_count": self.entry_count,
+            "topic_id": self.topic_id,
+            "tx_id": self.tx_id,
+            "sequence_no": self.sequence_no,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else None,
+        }
+
+
+class HCSEventProof(db.Model):
+    """Merkle inclusion proof for one event inside an HCS batch envelope."""
+    __tablename__ = "hcs_event_proofs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    batch_id = db.Column(db.String(32), nullable=False, index=True)
+    leaf_index = db.Column(db.Integer, nullable=False)
+    part_no = db.Column(db.Integer, nullable=False, default=0)     # which envelope carried the entry
+    event_hash = db.Column(db.String(64), nullable=False, index=True)
+    payload = db.Column(db.Text, nullable=False)                   # canonical JSON that was hashed
+    proof = db.Column(db.Text, nullable=False)                     # JSON [[side, hash], ...]
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "batch_id": self.batch_id,
+            "leaf_index": self.leaf_index,
+            "part_no": self.part_no,
+            "event_hash": self.event_hash,
+            "payload": self.payload,
+            "proof": self.proof,
+            "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else None,
+        }
+
+
+class HCSPublishJob(db.Model):
+    """Durable HCS publish queue: callers enqueue, the publish worker drains with retry/backoff."""
+    __tablename__ = "hcs_publish_queue"
+
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(32), nullable=False, default="audit")     # audit | alert | onboard | kyc | chat
+    payload = db.Column(db.Text, nullable=False)                           # JSON/string message
+    status = db.Column(db.String(20), nullable=False, default="pending")   # pending | in_flight | done | failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    claimed_by = db.Column(db.String(64), nullable=True)                   # claim token of the draining worker
+    last_error = db.Column(db.Text, nullable=True)
+    tx_id = db.Column(db.String(255), nullable=True)
+    event_hash = db.Column(db.String(64), nullable=True)                   # set when sent inside an HCS batch
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    published_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_hcs_publish_queue_status_next", "status", "next_attempt_at"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "source": self.source,
+            "status": self.status,
+            "attempts": self.attempts,
+            "next_attempt_at": self.next_attempt_at.strftime("%Y-%m-%d %H:%M:%S") if self.next_attempt_at else None,
+            "last_error": self.last_error,
+            "tx_id": self.tx_id,
+            "event_hash": self.event_hash,
+            "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else None,
+            "published_at": self.published_at.strftime("%Y-%m-%d %H:%M:%S") if self.published_at else None,
+        }
+
+
+class TokenAccountStatus(db.Model):
+    """
+    Local view of (account, token) readiness: associated + KYC granted. Consulted
+    before any associate / grant-KYC call; refreshed lazily from the mirror node.
+    """
+    __tablename__ = "token_account_status"
+
+    id = db.Column(db.Integer, primary_key=True)
+    account_id = db.Column(db.String(64), nullable=False)
+    token_id = db.Column(db.String(64), nullable=False)
+    associated = db.Column(db.Boolean, nullable=False, default=False)
+    kyc_granted = db.Column(db.Boolean, nullable=False, default=False)
+    source = db.Column(db.String(16), nullable=False, default="local")    # local (our tx) | mirror
+    mirror_checked_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("account_id", "token_id", name="uq_token_account_status"),
+    )
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.associated and self.kyc_granted)
+
+    def to_dict(self):
+        return {
+            "account_id": self.account_id,
+            "token_id": self.token_id,
+            "associated": self.associated,
+            "kyc_granted": self.kyc_granted,
+            "ready": self.ready,
+            "source": self.source,
+            "mirror_checked_at": self.mirror_checked_at.strftime("%Y-%m-%d %H:%M:%S") if self.mirror_checked_at else None,
+            "updated_at": self.updated_at.strftime("%Y-%m-%d %H:%M:%S") if self.updated_at else None,
+        }
+
+
+class HFSUpload(db.Model):
+    """
+    Progress of a chunked HFS upload (FileCreate + FileAppend chunks). A failed
+    upload keeps its file_id / bytes_done so it can be resumed by upload_id.
+    """
+    __tablename__ = "hfs_uploads"
+
+    id = db.Column(db.Integer, primary_key=True)
+    upload_id = db.Column(db.String(32), nullable=False, unique=True)
+    file_path = db.Column(db.String(512), nullable=False)
+    file_size = db.Column(db.BigInteger, nullable=False)
+    file_mtime = db.Column(db.Float, nullable=True)                      # detects local edits between attempts
+    chunk_size = db.Column(db.Integer, nullable=False)
+    file_id = db.Column(db.String(64), nullable=True)                    # set once FileCreate lands
+    bytes_done = db.Column(db.BigInteger, nullable=False, default=0)
+    chunks_done = db.Column(db.Integer, nullable=False, default=0)
+    file_hash = db.Column(db.String(64), nullable=True)                  # sha256, set when done
+    status = db.Column(db.String(16), nullable=False, default="uploading", index=True)  # uploading | done | failed
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "upload_id": self.upload_id,
+            "file_id": self.file_id,
+            "file_size": self.file_size,
+            "bytes_done": self.bytes_done,
+            "chunks_done": self.chunks_done,
+            "progress": round(self.bytes_done / self.file_size, 4) if self.file_size else 1.0,
+            "file_hash": self.file_hash,
+            "status": self.status,
+            "last_error": self.last_error,
+            "updated_at": self.updated_at.strftime("%Y-%m-%d %H:%M:%S") if self.updated_at else None,
+        }
+
+
+class ReminderSchedule(db.Model):
+    """
+    Repayment reminder index: one row per (source, source_id, due_date), so the
+    planner can dedupe in SQL. Tracks the optional on-chain schedule and when the
+    in-app notification went out.
+    """
+    __tablename__ = "reminder_schedules"
+
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(16), nullable=False)                    # installment | loan (legacy finance loans)
+    source_id = db.Column(db.Integer, nullable=False)                    # repayment_schedules.id | loan.id
+    loan_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    due_date = db.Column(db.DateTime, nullable=False)
+    remind_at = db.Column(db.DateTime, nullable=False)
+    amount = db.Column(db.Numeric(18, 2), nullable=True)
+    job_name = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.String(16), nullable=False, default="pending")          # pending | notified
+    notified_at = db.Column(db.DateTime, nullable=True)
+    schedule_status = db.Column(db.String(16), nullable=False, default="none")    # none | pending | scheduled | failed
+    schedule_id = db.Column(db.String(64), nullable=True)
+    schedule_attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("source", "source_id", "due_date", name="uq_reminder_source_due"),
+        db.Index("ix_reminder_schedules_status_remind_at", "status", "remind_at"),
+        db.Index("ix_reminder_schedules_schedule_status", "schedule_status"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "source": self.source,
+            "source_id": self.source_id,
+            "loan_id": self.loan_id,
+            "user_id": self.user_id,
+            "due_date": self.due_date.strftime("%Y-%m-%d"),
+            "remind_at": self.remind_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "amount": float(self.amount) if self.amount is not None else None,
+            "status": self.status,
+            "notified_at": self.notified_at.strftime("%Y-%m-%d %H:%M:%S") if self.notified_at else None,
+            "schedule_status": self.schedule_status,
+            "schedule_id": self.schedule_id,
+            "last_error": self.last_error,
+        }
+
+
+class PooledHederaAccount(db.Model):
+    """
+    Pre-created Hedera account waiting to be handed to a new user / group.
+    Key is stored exactly like users.hedera_private_key (PrivateKey.toString()).
+    """
+    __tablename__ = "hedera_account_pool"
+
+    id = db.Column(db.Integer, primary_key=True)
+    account_id = db.Column(db.String(64), nullable=False, unique=True)
+    private_key = db.Column(db.String, nullable=False)
+    public_key = db.Column(db.String, nullable=True)
+    initial_balance_hbar = db.Column(db.Numeric(18, 8), nullable=True)
+    status = db.Column(db.String(16), nullable=False, default="ready", index=True)   # ready | claimed
+    claimed_by_user_id = db.Column(db.Integer, nullable=True)
+    claimed_for = db.Column(db.String(32), nullable=True)                           # register | login | chatbot | cooperative
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -2,14 +2,12 @@
 import os
 from dotenv import load_dotenv
 
-from hedera import (
-    Client,
-    AccountId,
-    PrivateKey,
-    TokenMintTransaction,
-    TransferTransaction,
-    TokenId,
-)
+from . import jvm
+from .instrument import instrumented
+from .client_pool import get_client as pooled_client
+
+Client, AccountId, PrivateKey, TokenMintTransaction, TransferTransaction, TokenId = jvm.lazy_import(
+    "hedera", "Client", "AccountId", "PrivateKey", "TokenMintTransaction", "TransferTransaction", "TokenId")
 
 # ---- Load ENV ----
 load_dotenv()
@@ -20,18 +18,13 @@ PRODUCTION = (os.getenv("PRODUCTION", "false").lower() == "true")
 
 
 def get_client() -> Client:
-    """Return a Hedera client for Testnet/Mainnet with operator set."""
-    client = Client.forMainnet() if PRODUCTION else Client.forTestnet()
+    """Return the shared pooled Hedera client (Testnet/Mainnet) with operator set."""
     if not HEDERA_OPERATOR_ID or not HEDERA_OPERATOR_KEY:
         raise RuntimeError("HEDERA_OPERATOR_ID/HEDERA_OPERATOR_KEY not set in env")
-
-    client.setOperator(
-        AccountId.fromString(HEDERA_OPERATOR_ID),
-        PrivateKey.fromString(HEDERA_OPERATOR_KEY),
-    )
-    return client
+    return pooled_client(operator_id=HEDERA_OPERATOR_ID, operator_key=HEDERA_OPERATOR_KEY)
 
 
+@instrumented("nft_mint")
 def mint_nft(metadata: bytes, token_id: str = None):
     """
     Mint an NFT into the collection.
@@ -57,6 +50,7 @@ def mint_nft(metadata: bytes, token_id: str = None):
     }
 
 
+@instrumented("nft_transfer")
 def transfer_nft(sender: str, sender_key: str, recipient: str, serial: int, token_id: str = None):
     """
     Transfer a minted NFT from one account to another.
@@ -0,0 +1,278 @@
+# hedera_sdk/receipts.py
+"""
+Background receipt confirmation for submit-only Hedera transactions.
+
+Helpers called with wait_for_receipt=False return right after `execute` and hand
+the transaction id to `receipt_tracker.track(...)`. A single daemon thread polls
+pending ids in small concurrent batches, resolves the returned Future (and any
+callback), and updates DB rows that reference the tx id.
+"""
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+
+from . import jvm
+from .client_pool import get_client
+
+log = logging.getLogger("hedera.receipts")
+
+TransactionId = jvm.lazy_class('com.hedera.hashgraph.sdk.TransactionId')
+TransactionReceiptQuery = jvm.lazy_class('com.hedera.hashgraph.sdk.TransactionReceiptQuery')
+
+HEDERA_RECEIPT_POLL_S = float(os.getenv("HEDERA_RECEIPT_POLL_S", "2"))
+HEDERA_RECEIPT_BATCH = int(os.getenv("HEDERA_RECEIPT_BATCH", "25"))
+HEDERA_RECEIPT_WORKERS = int(os.getenv("HEDERA_RECEIPT_WORKERS", "4"))
+HEDERA_RECEIPT_TIMEOUT_S = int(os.getenv("HEDERA_RECEIPT_TIMEOUT_S", "180"))   # > tx valid duration
+
+_NOT_READY = ("UNKNOWN", "BUSY", "RECEIPT_NOT_FOUND", "TimeoutException")
+
+
+class _Pending:
+    def __init__(self, tx_id: str, kind: str):
+        self.tx_id = tx_id
+        self.kind = kind
+        self.futures: list[Future] = []
+        self.callbacks: list = []
+        self.submitted = time.time()
+        self.next_poll = self.submitted + 1.0     # consensus takes ~2-3s, don't poll instantly
+        self.attempts = 0
+        self.last_error = None
+        self.ref_table = None
+        self.ref_id = None
+        self.persisted = False
+
+
+# ---------------- DB row updaters ----------------
+def _update_outbox(tx_id: str, result: dict):
+    from finance.models import OutboxTransfer
+    for row in OutboxTransfer.query.filter_by(hedera_tx_id=tx_id).all():
+        if row.lease_expires_at is not None:
+            continue                # held by the outbox processor (middleware.offline_sync)
+        if result["status"] == "SUCCESS":
+            if row.status in ("sending", "submitted"):
+                row.status = "sent"
+        else:
+            row.status = "failed"
+            row.last_error = f"receipt {result['status']}: {result.get('error') or ''}".strip()
+
+
+_ROW_UPDATERS = [_update_outbox]       # hcs_batcher registers its own for hcs_batches
+
+
+def register_row_updater(fn):
+    """fn(tx_id, result) runs inside an app context when a receipt resolves."""
+    _ROW_UPDATERS.append(fn)
+    return fn
+
+
+class ReceiptTracker:
+    def __init__(self):
+        self.app = None
+        self._pending: dict[str, _Pending] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._resumed = False
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["receipt_tracker"] = self
+
+    # ---- public ----
+    def track(self, tx_id: str, kind: str = "tx", callback=None,
+              ref_table: str | None = None, ref_id: int | None = None) -> Future:
+        """Register a submitted tx id; returns a Future resolved with the receipt dict."""
+        fut = Future()
+        with self._lock:
+            entry = self._pending.get(tx_id)
+            if entry is None:
+                entry = _Pending(tx_id, kind)
+                self._pending[tx_id] = entry
+            entry.futures.append(fut)
+            if callback:
+                entry.callbacks.append(callback)
+            if ref_table:
+                entry.ref_table, entry.ref_id = ref_table, ref_id
+
+        # DB row is written by the worker thread, not the request (keeps SQLite write locks out of it)
+        self._ensure_thread()
+        self._wake.set()
+        return fut
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    # ---- persistence ----
+    def _persist_new(self):
+        if not self.app:
+            return
+        with self._lock:
+            fresh = [e for e in self._pending.values() if not e.persisted]
+        if not fresh:
+            return
+        from extensions import db
+        from .models import HederaReceipt
+        try:
+            with self.app.app_context():
+                known = {r.tx_id for r in HederaReceipt.query
+                         .filter(HederaReceipt.tx_id.in_([e.tx_id for e in fresh])).all()}
+                for e in fresh:
+                    if e.tx_id not in known:
+                        db.session.add(HederaReceipt(tx_id=e.tx_id, kind=e.kind,
+                                                     ref_table=e.ref_table, ref_id=e.ref_id))
+                db.session.commit()
+            for e in fresh:
+                e.persisted = True
+        except Exception as e:
+            log.warning("Receipt row insert failed: %s", e)
+
+    def _resume_from_db(self):
+        """Pick up SUBMITTED rows left by a previous process (futures are gone, DB rows still need it)."""
+        if self._resumed or not self.app:
+            return
+        self._resumed = True
+        from .models import HederaReceipt
+        try:
+            with self.app.app_context():
+                rows = HederaReceipt.query.filter_by(status="SUBMITTED").all()
+                with self._lock:
+                    for r in rows:
+                        if r.tx_id not in self._pending:
+                            entry = _Pending(r.tx_id, r.kind)
+                            entry.submitted = (r.submitted_at or datetime.utcnow()).timestamp()
+                            entry.attempts = r.attempts or 0
+                            entry.persisted = True
+                            self._pending[r.tx_id] = entry
+            if rows:
+                log.info("Resumed %s pending receipts", len(rows))
+        except Exception as e:
+            log.warning("Receipt resume skipped: %s", e)
+
+    # ---- worker ----
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, name="receipt-tracker", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        self._resume_from_db()
+        while True:
+            self._wake.wait(HEDERA_RECEIPT_POLL_S)
+            self._wake.clear()
+            try:
+                self._poll_once()
+            except Exception as e:
+                log.exception("Receipt poll failed: %s", e)
+
+    def _poll_once(self):
+        self._persist_new()
+        now = time.time()
+        with self._lock:
+            due = sorted((e for e in self._pending.values() if e.next_poll <= now),
+                         key=lambda e: e.submitted)[:HEDERA_RECEIPT_BATCH]
+        if not due:
+            return
+
+        workers = max(1, min(HEDERA_RECEIPT_WORKERS, len(due)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(self._query, due))
+
+        for entry, result in zip(due, outcomes):
+            entry.attempts += 1
+            if result is None:
+                if time.time() - entry.submitted > HEDERA_RECEIPT_TIMEOUT_S:
+                    self._resolve(entry, {"tx_id": entry.tx_id, "status": "EXPIRED",
+                                          "error": entry.last_error})
+                else:
+                    entry.next_poll = time.time() + min(2 ** entry.attempts, 15)
+                continue
+            self._resolve(entry, result)
+
+    def _query(self, entry: _Pending) -> dict | None:
+        """Receipt dict if final, None if not reached consensus yet (or transient error)."""
+        try:
+            client = get_client()
+            receipt = (TransactionReceiptQuery()
+                       .setTransactionId(TransactionId.fromString(entry.tx_id))
+                       .execute(client))
+            status = receipt.status.toString()
+            if status in ("UNKNOWN", "BUSY"):
+                return None
+            out = {"tx_id": entry.tx_id, "status": status}
+            try:
+                seq = int(receipt.topicSequenceNumber)
+                if seq > 0:
+                    out["sequence"] = seq
+            except Exception:
+                pass
+            return out
+        except Exception as e:
+            msg = str(e)
+            entry.last_error = msg[:300]
+            if any(k in msg for k in _NOT_READY):
+                return None
+            # precheck-style failure with a final status code (e.g. INVALID_SIGNATURE)
+            return {"tx_id": entry.tx_id, "status": "FAILED", "error": msg[:300]}
+
+    def _resolve(self, entry: _Pending, result: dict):
+        with self._lock:
+            self._pending.pop(entry.tx_id, None)
+
+        self._apply_to_db(entry, result)
+
+        for fut in entry.futures:
+            if not fut.done():
+                fut.set_result(result)
+        for cb in entry.callbacks:
+            try:
+                if self.app:
+                    with self.app.app_context():
+                        cb(result)
+                else:
+                    cb(result)
+            except Exception as e:
+                log.warning("Receipt callback failed for %s: %s", entry.tx_id, e)
+
+    def _apply_to_db(self, entry: _Pending, result: dict):
+        if not self.app:
+            return
+        from extensions import db
+        from .models import HederaReceipt
+        try:
+            with self.app.app_context():
+                row = HederaReceipt.query.filter_by(tx_id=entry.tx_id).first()
+                if not row:
+                    row = HederaReceipt(tx_id=entry.tx_id, kind=entry.kind,
+                                        ref_table=entry.ref_table, ref_id=entry.ref_id)
+                    db.session.add(row)
+                row.status = result["status"]
+                row.attempts = entry.attempts
+                row.last_error = result.get("error") or entry.last_error
+                row.sequence_no = result.get("sequence")
+                row.resolved_at = datetime.utcnow()
+                for fn in _ROW_UPDATERS:
+                    try:
+                        fn(entry.tx_id, result)
+                    except Exception as e:
+                        log.warning("Receipt row updater %s failed: %s", getattr(fn, "__name__", fn), e)
+                db.session.commit()
+        except Exception as e:
+            log.warning("Receipt DB update failed for %s: %s", entry.tx_id, e)
+
+
+receipt_tracker = ReceiptTracker()
+
+
+def submitted(resp_or_tx_id, kind: str, callback=None, **extra) -> dict:
+    """Common submit-only return shape used by the SDK helpers."""
+    tx_id = resp_or_tx_id if isinstance(resp_or_tx_id, str) else resp_or_tx_id.transactionId.toString()
+    receipt_tracker.track(tx_id, kind=kind, callback=callback)
+    return {"status": "SUBMITTED", "tx_id": tx_id, **extra}
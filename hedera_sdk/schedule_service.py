@@ -1,15 +1,114 @@
 # hedera_sdk/schedule_service.py
-from datetime import datetime
+"""
+Repayment reminders as Hedera scheduled transactions.
 
+Each reminder is a ScheduleCreateTransaction wrapping an HCS message (topic
+REMINDER_TOPIC_ID, else HEDERA_TOPIC_ID) with expirationTime = reminder time and
+waitForExpiry, so there is an immutable, timestamped record of what we promised
+to remind and when.
+
+Hedera has no multi-schedule create, so create_schedules() sends one tx per
+reminder, HEDERA_SCHEDULE_WORKERS at a time, through signer / submit_scheduler
+on the "batch" lane (never in front of member transfers). The network rejects an
+expiry more than HEDERA_SCHEDULE_MAX_DAYS out, so such jobs fail here without a call.
+Off by default (HEDERA_SCHEDULE_ENABLED): reminders are then DB-only.
+"""
+import os
+import json
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from . import jvm
+from . import signer
+from .client_pool import get_client
+from .instrument import instrumented
+
+ScheduleCreateTransaction, TopicMessageSubmitTransaction, TopicId = jvm.lazy_import(
+    "hedera", "ScheduleCreateTransaction", "TopicMessageSubmitTransaction", "TopicId")
+TransactionId = jvm.lazy_class('com.hedera.hashgraph.sdk.TransactionId')
+Instant = jvm.lazy_class('java.time.Instant')
+
+HEDERA_SCHEDULE_ENABLED = os.getenv("HEDERA_SCHEDULE_ENABLED", "false").lower() in ("1", "true", "yes")
+HEDERA_SCHEDULE_WORKERS = int(os.getenv("HEDERA_SCHEDULE_WORKERS", "4"))
+HEDERA_SCHEDULE_MAX_DAYS = int(os.getenv("HEDERA_SCHEDULE_MAX_DAYS", "62"))   # network limit on expirationTime (5356800s)
+
+
+def _topic():
+    tid = os.getenv("REMINDER_TOPIC_ID") or os.getenv("HEDERA_TOPIC_ID")
+    if not tid:
+        raise RuntimeError("REMINDER_TOPIC_ID / HEDERA_TOPIC_ID not set")
+    return tid
+
+
+def _epoch(run_at) -> int:
+    if isinstance(run_at, str):
+        run_at = datetime.fromisoformat(run_at.replace("Z", "+00:00"))
+    if run_at.tzinfo is None:
+        run_at = run_at.replace(tzinfo=timezone.utc)          # DB datetimes are naive UTC
+    return int(run_at.timestamp())
+
+
+def _build(client, job_name: str, run_at, payload: dict, topic_id: str, op_key):
+    inner = (TopicMessageSubmitTransaction()
+             .setTopicId(TopicId.fromString(topic_id))
+             .setMessage(json.dumps({"type": "REMINDER", "job": job_name, **payload}, default=str)))
+    tx = (ScheduleCreateTransaction()
+          .setScheduledTransaction(inner)
+          .setScheduleMemo(job_name[:100])
+          .setExpirationTime(Instant.ofEpochSecond(_epoch(run_at)))
+          .setWaitForExpiry(True))
+    tx.setTransactionId(TransactionId.generate(client.getOperatorAccountId())).freezeWith(client)
+    return tx.sign(op_key)
+
+
+def _create_one(client, job: dict, topic_id: str, op_key) -> dict:
+    if _epoch(job["run_at"]) - datetime.now(timezone.utc).timestamp() > HEDERA_SCHEDULE_MAX_DAYS * 86400:
+        raise ValueError(f"run_at is more than HEDERA_SCHEDULE_MAX_DAYS={HEDERA_SCHEDULE_MAX_DAYS} days ahead")
+    resp, receipt = signer.sign_and_submit(
+        lambda c: _build(c, job["job_name"], job["run_at"], job.get("payload") or {}, topic_id, op_key),
+        client=client, lane="batch")
+    return {"status": receipt.status.toString(), "schedule_id": receipt.scheduleId.toString(),
+            "tx_id": resp.transactionId.toString()}
+
+
+@instrumented("schedule_create_batch")
+def create_schedules(jobs: list[dict], max_workers: int | None = None) -> list[dict]:
+    """
+    jobs: [{"job_name", "run_at" (datetime | ISO string), "payload": {...}}].
+    Returns one result per job, in order: {"status", "schedule_id", "tx_id", "error"}.
+    """
+    if not jobs:
+        return []
+    client = get_client()
+    op_key = signer.private_key(os.getenv("HEDERA_OPERATOR_KEY"))
+    topic_id = _topic()
+
+    def _run(job):
+        try:
+            return {**_create_one(client, job, topic_id, op_key), "error": None}
+        except Exception as e:
+            return {"status": "FAILED", "schedule_id": None, "tx_id": None, "error": str(e)}
+
+    workers = max(1, min(int(max_workers or HEDERA_SCHEDULE_WORKERS), len(jobs)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hedera-schedule") as pool:
+        return list(pool.map(_run, jobs))
+
+
+@instrumented("schedule_create")
 def schedule_reminder_job(job_name: str, run_at_iso: str, payload: dict) -> dict:
     """
-    Placeholder: Real में ScheduleCreateTransaction.
+    Single reminder. With HEDERA_SCHEDULE_ENABLED off this stays the old local
+    acknowledgement (no network call).
     """
-    # सिर्फ़ response; कोई persistent scheduler नहीं (MVP)
-    return {
-        "status": "scheduled",
-        "job": job_name,
-        "run_at": run_at_iso,
-        "payload": payload,
-        "created_at": datetime.utcnow().isoformat() + "Z"
-    }
+    if not HEDERA_SCHEDULE_ENABLED:
+        return {
+            "status": "scheduled",
+            "job": job_name,
+            "run_at": run_at_iso,
+            "payload": payload,
+            "created_at": datetime.utcnow().isoformat() + "Z"
+        }
+    res = create_schedules([{"job_name": job_name, "run_at": run_at_iso, "payload": payload}], max_workers=1)[0]
+    if res["error"]:
+        raise RuntimeError(res["error"])
+    return {**res, "job": job_name, "run_at": run_at_iso, "payload": payload}
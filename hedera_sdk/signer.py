@@ -0,0 +1,215 @@
+# hedera_sdk/signer.py
+"""
+Signer service: parse once, sign many.
+
+- PrivateKey objects cached by key fingerprint (sha256 of the key string; the raw
+  string is never used as a dict key), AccountId / TokenId objects cached by string.
+  Every pyjnius `fromString` is a JNI round-trip, so hot paths should go through here.
+- TransferTemplate: per (token | HBAR, sender, key) builder with the parsed ids
+  and key held ready; only the per-call legs + fresh TransactionId are added.
+- sign_and_submit(): on a timeout the *same* signed bytes are re-sent (Hedera
+  dedups by TransactionId). A DUPLICATE_TRANSACTION - even on our first call,
+  since the SDK already retries across nodes internally - means that
+  TransactionId reached the network -> we fetch its receipt, never rebuild
+  (a rebuild would pay twice). Only a precheck BUSY / not-created / expired
+  rebuilds with a new TransactionId. Every execute runs through
+  submit_scheduler (per-operator AIMD limit, priority lanes, jittered backoff).
+"""
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from . import jvm
+from . import instrument
+from .client_pool import get_client
+from .submit_scheduler import submit_scheduler, backoff
+
+AccountId, PrivateKey, TokenId, TransferTransaction, Hbar = jvm.lazy_import(
+    "hedera", "AccountId", "PrivateKey", "TokenId", "TransferTransaction", "Hbar")
+TransactionId = jvm.lazy_class('com.hedera.hashgraph.sdk.TransactionId')
+TransactionReceiptQuery = jvm.lazy_class('com.hedera.hashgraph.sdk.TransactionReceiptQuery')
+
+HEDERA_SIGNER_CACHE_SIZE = int(os.getenv("HEDERA_SIGNER_CACHE_SIZE", "4096"))
+HEDERA_SUBMIT_ATTEMPTS = int(os.getenv("HEDERA_SUBMIT_ATTEMPTS", "3"))
+
+_REBUILD_ERRORS = ("BUSY", "PLATFORM_TRANSACTION_NOT_CREATED", "TRANSACTION_EXPIRED")
+
+_operators: dict[int, str] = {}      # id(pooled client) -> operator account id (one JNI call per client)
+
+
+class _LRU:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._d: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get_or_create(self, key, factory):
+        with self._lock:
+            if key in self._d:
+                self._d.move_to_end(key)
+                self.hits += 1
+                return self._d[key]
+        value = factory()          # JNI call outside the lock
+        with self._lock:
+            self.misses += 1
+            self._d[key] = value
+            if len(self._d) > self.maxsize:
+                self._d.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._d.clear()
+
+    def __len__(self):
+        return len(self._d)
+
+
+_keys = _LRU(HEDERA_SIGNER_CACHE_SIZE)
+_ids = _LRU(HEDERA_SIGNER_CACHE_SIZE)
+_templates = _LRU(HEDERA_SIGNER_CACHE_SIZE)
+
+
+def key_fingerprint(key_str: str) -> str:
+    return hashlib.sha256(key_str.strip().encode()).hexdigest()[:32]
+
+
+def private_key(key_str: str):
+    key_str = key_str.strip()
+    return _keys.get_or_create(key_fingerprint(key_str), lambda: PrivateKey.fromString(key_str))
+
+
+def account_id(s: str):
+    s = str(s).strip()
+    return _ids.get_or_create(("acc", s), lambda: AccountId.fromString(s))
+
+
+def token_id(s: str):
+    s = str(s).strip()
+    return _ids.get_or_create(("tok", s), lambda: TokenId.fromString(s))
+
+
+def cache_stats() -> dict:
+    return {
+        "keys": {"size": len(_keys), "hits": _keys.hits, "misses": _keys.misses},
+        "ids": {"size": len(_ids), "hits": _ids.hits, "misses": _ids.misses},
+        "templates": {"size": len(_templates), "hits": _templates.hits, "misses": _templates.misses},
+    }
+
+
+def clear_caches():
+    for c in (_keys, _ids, _templates):
+        c.clear()
+
+
+# ---------------- transfer templates ----------------
+class TransferTemplate:
+    """Pre-parsed sender / token / key for repeated transfers out of one account."""
+
+    def __init__(self, token: str | None, from_account: str, from_privkey: str):
+        self.token = token
+        self.from_account = from_account
+        self.tid = token_id(token) if token else None
+        self.from_acc = account_id(from_account)
+        self.priv = private_key(from_privkey)
+
+    def build(self, client, credits: dict, memo: str | None = None):
+        """credits = {to_account: amount}; amounts in token units or tinybars (HBAR)."""
+        total = sum(int(a) for a in credits.values())
+        tx = TransferTransaction()
+        if self.tid is not None:
+            tx.addTokenTransfer(self.tid, self.from_acc, -total)
+            for to, amount in credits.items():
+                tx.addTokenTransfer(self.tid, account_id(to), int(amount))
+        else:
+            tx.addHbarTransfer(self.from_acc, Hbar.fromTinybars(-total))
+            for to, amount in credits.items():
+                tx.addHbarTransfer(account_id(to), Hbar.fromTinybars(int(amount)))
+        if memo:
+            tx.setTransactionMemo(memo)
+        tx.setTransactionId(TransactionId.generate(client.getOperatorAccountId())).freezeWith(client)
+        return tx.sign(self.priv)
+
+
+def transfer_template(token: str | None, from_account: str, from_privkey: str) -> TransferTemplate:
+    key = (token or "HBAR", from_account, key_fingerprint(from_privkey))
+    return _templates.get_or_create(key, lambda: TransferTemplate(token, from_account, from_privkey))
+
+
+# ---------------- submit ----------------
+class _ReceiptOnly:
+    """Stands in for a TransactionResponse when the tx was already on the network."""
+
+    def __init__(self, tx_id):
+        self.transactionId = tx_id
+
+    def getReceipt(self, client):
+        return TransactionReceiptQuery().setTransactionId(self.transactionId).execute(client)
+
+
+def _tx_id(tx):
+    tid = getattr(tx, "transactionId", None)
+    return tid if tid is not None else tx.getTransactionId()
+
+
+def operator_of(client) -> str:
+    key = id(client)
+    op = _operators.get(key)
+    if op is None:
+        try:
+            op = str(client.getOperatorAccountId().toString())
+        except Exception:
+            op = "default"
+        _operators[key] = op
+    return op
+
+
+def sign_and_submit(build, client=None, wait_for_receipt: bool = True,
+                    max_attempts: int | None = None, lane: str = "default"):
+    """
+    build(client) -> frozen + signed transaction. Returns (response, receipt|None).
+    Retries: Timeout -> resend same bytes; any DUPLICATE -> fetch the receipt of the
+    existing TransactionId; BUSY / THROTTLED_AT_CONSENSUS -> rebuild with a fresh TransactionId.
+    lane: "interactive" | "default" | "batch" (see submit_scheduler).
+    """
+    client = client or get_client()
+    operator = operator_of(client)
+    attempts = max_attempts or HEDERA_SUBMIT_ATTEMPTS
+    signed = build(client)
+    for i in range(attempts):
+        last = i >= attempts - 1
+        try:
+            resp = submit_scheduler.run(operator, lambda: signed.execute(client), lane)
+        except jvm.JavaException as je:
+            msg = str(je)
+            if "DUPLICATE_TRANSACTION" in msg:
+                resp = _ReceiptOnly(_tx_id(signed))   # an earlier send (ours or the SDK's) went through
+            elif "TimeoutException" in msg and not last:
+                instrument.note_retry()
+                time.sleep(backoff(i))
+                continue
+            elif any(code in msg for code in _REBUILD_ERRORS) and not last:
+                instrument.note_retry()
+                time.sleep(backoff(i))
+                signed = build(client)
+                continue
+            else:
+                raise
+        if not wait_for_receipt:
+            return resp, None
+        try:
+            receipt = resp.getReceipt(client)
+        except jvm.JavaException as je:
+            # network accepted it but dropped it at consensus: back off, new TransactionId
+            if "THROTTLED_AT_CONSENSUS" in str(je) and not last:
+                submit_scheduler.throttled(operator)
+                instrument.note_retry()
+                time.sleep(backoff(i))
+                signed = build(client)
+                continue
+            raise
+        instrument.note_record(resp, client)
+        return resp, receipt
@@ -0,0 +1,958 @@
+# hedera_sdk/simulator.py
+"""
+In-process Hedera network simulator.
+
+Selected with HEDERA_BACKEND=simulator (see hedera_sdk/__init__.py). `install()`
+registers stand-in `hedera` and `jnius` modules that expose the small slice of
+the Java SDK our helpers use (Client, AccountId, PrivateKey, Hbar, the
+Transfer/Token/Topic/File transactions, balance / receipt / file queries), so
+wallet, token_service, transfer, consensus_service and kyc_service run
+unchanged against an in-memory ledger.
+
+Accounts, token balances, associations, KYC grants, topics and files live in
+memory. Latency and failure injection are env-configurable and driven by a
+seeded RNG, so benchmark / stress runs are repeatable. Mirror-node HTTP calls
+are not simulated.
+"""
+import os
+import sys
+import time
+import types
+import random
+import hashlib
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+HEDERA_SIM_SEED = int(os.getenv("HEDERA_SIM_SEED", "42"))
+HEDERA_SIM_LATENCY_MS = float(os.getenv("HEDERA_SIM_LATENCY_MS", "0"))          # submit (precheck) latency
+HEDERA_SIM_CONSENSUS_MS = float(os.getenv("HEDERA_SIM_CONSENSUS_MS", "0"))      # submit -> receipt available
+HEDERA_SIM_FAILURE_RATE = float(os.getenv("HEDERA_SIM_FAILURE_RATE", "0"))      # 0..1 per submit
+HEDERA_SIM_FAILURE_MODES = [m.strip() for m in
+                            os.getenv("HEDERA_SIM_FAILURE_MODES", "TimeoutException,BUSY").split(",") if m.strip()]
+HEDERA_SIM_AUTOFUND_HBAR = float(os.getenv("HEDERA_SIM_AUTOFUND_HBAR", "1000"))  # unknown accounts start with this
+HEDERA_SIM_MAX_TRANSFERS = int(os.getenv("HEDERA_SIM_MAX_TRANSFERS", "10"))
+HEDERA_SIM_FEE_TINYBARS = int(os.getenv("HEDERA_SIM_FEE_TINYBARS", "100000"))  # transactionFee in records
+HEDERA_SIM_CAPACITY = int(os.getenv("HEDERA_SIM_CAPACITY", "0"))     # concurrent submits per node before BUSY (0 = no limit)
+# modelled cost of one pyjnius call (µs); 0 = free. Key parsing / signing count as several calls.
+HEDERA_SIM_JNI_US = float(os.getenv("HEDERA_SIM_JNI_US", "0"))
+
+TINY = 100_000_000
+
+
+def _jni(units: float = 1):
+    """Burn HEDERA_SIM_JNI_US * units of CPU, like a JNI crossing would (busy-wait: sleep is too coarse)."""
+    if HEDERA_SIM_JNI_US <= 0:
+        return
+    end = time.perf_counter() + HEDERA_SIM_JNI_US * units / 1e6
+    while time.perf_counter() < end:
+        pass
+
+
+# ---------------- Java-ish exceptions ----------------
+class JavaException(Exception):
+    pass
+
+
+class PrecheckStatusException(JavaException):
+    def __init__(self, tx_id, status):
+        self.status = _Status(status)
+        super().__init__(f"Hedera transaction `{tx_id}` failed pre-check with the status `{status}`")
+
+
+class ReceiptStatusException(JavaException):
+    def __init__(self, tx_id, receipt):
+        self.receipt = receipt
+        super().__init__(f"receipt for transaction `{tx_id}` contained error status `{receipt.status}`")
+
+
+class TimeoutException(JavaException):
+    def __init__(self):
+        super().__init__("java.util.concurrent.TimeoutException")
+
+
+# ---------------- value types ----------------
+class _Long(int):
+    def longValue(self):
+        return int(self)
+
+    def toInt(self):
+        return int(self)
+
+    def toString(self):
+        return str(int(self))
+
+
+class _Status:
+    def __init__(self, name: str):
+        self.name = name
+
+    def toString(self):
+        return self.name
+
+    def __str__(self):
+        return self.name
+
+    def __eq__(self, other):
+        return str(other) == self.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+
+class _EntityId:
+    def __init__(self, shard: int, realm: int, num: int):
+        self.shard, self.realm, self.num = int(shard), int(realm), int(num)
+
+    @classmethod
+    def fromString(cls, s):
+        if isinstance(s, _EntityId):
+            return cls(s.shard, s.realm, s.num)     # internal normalisation, not a JNI parse
+        _jni()
+        parts = str(s).strip().split("-")[0].split(".")
+        if len(parts) != 3 or not all(p.isdigit() for p in parts):
+            raise JavaException(f"java.lang.IllegalArgumentException: Invalid ID \"{s}\"")
+        return cls(*parts)
+
+    def toString(self):
+        return f"{self.shard}.{self.realm}.{self.num}"
+
+    __str__ = toString
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.toString()})"
+
+    def __eq__(self, other):
+        return isinstance(other, _EntityId) and self.toString() == other.toString()
+
+    def __hash__(self):
+        return hash(self.toString())
+
+
+class AccountId(_EntityId):
+    pass
+
+
+class TokenId(_EntityId):
+    pass
+
+
+class TopicId(_EntityId):
+    pass
+
+
+class FileId(_EntityId):
+    pass
+
+
+class ScheduleId(_EntityId):
+    pass
+
+
+class PublicKey:
+    def __init__(self, raw: str):
+        self._raw = raw
+
+    @classmethod
+    def fromString(cls, s):
+        return cls(str(s))
+
+    def toString(self):
+        return self._raw
+
+    __str__ = toString
+
+    def __eq__(self, other):
+        return isinstance(other, PublicKey) and other._raw == self._raw
+
+    def __hash__(self):
+        return hash(self._raw)
+
+
+class PrivateKey:
+    _DER = "302e020100300506032b657004220420"
+
+    def __init__(self, raw: str):
+        self._raw = raw
+
+    @classmethod
+    def generate(cls):
+        return cls(cls._DER + network().random_hex(32))
+
+    generateED25519 = generate
+
+    @classmethod
+    def fromString(cls, s):
+        _jni(5)     # DER decode + key derivation
+        return cls(str(s))
+
+    def getPublicKey(self):
+        _jni(2)
+        return PublicKey("302a300506032b6570032100" + hashlib.sha256(self._raw.encode()).hexdigest())
+
+    def toString(self):
+        return self._raw
+
+    __str__ = toString
+
+
+class HbarUnit:
+    TINYBAR = "TINYBAR"
+    HBAR = "HBAR"
+
+
+class Hbar:
+    def __init__(self, hbars=0):
+        self._tiny = int(round(Decimal(str(hbars)) * TINY))
+
+    @classmethod
+    def fromTinybars(cls, tinybars):
+        h = cls(0)
+        h._tiny = int(tinybars)
+        return h
+
+    def toTinybars(self):
+        return _Long(self._tiny)
+
+    def to(self, unit):
+        return Decimal(self._tiny) / TINY if unit == HbarUnit.HBAR else Decimal(self._tiny)
+
+    def negated(self):
+        return Hbar.fromTinybars(-self._tiny)
+
+    def toString(self):
+        return f"{Decimal(self._tiny) / TINY} ℏ"
+
+    __str__ = toString
+
+
+class TokenType:
+    FUNGIBLE_COMMON = "FUNGIBLE_COMMON"
+    NON_FUNGIBLE_UNIQUE = "NON_FUNGIBLE_UNIQUE"
+
+
+class TokenSupplyType:
+    INFINITE = "INFINITE"
+    FINITE = "FINITE"
+
+
+class Duration:
+    @staticmethod
+    def ofSeconds(s):
+        return float(s)
+
+    @staticmethod
+    def ofMillis(ms):
+        return float(ms) / 1000.0
+
+
+class Instant:
+    def __init__(self, seconds: int):
+        self.seconds = int(seconds)
+
+    @classmethod
+    def ofEpochSecond(cls, seconds):
+        return cls(seconds)
+
+    def getEpochSecond(self):
+        return _Long(self.seconds)
+
+
+class Arrays:
+    @staticmethod
+    def asList(*items):
+        return list(items)
+
+
+class _JavaMap(dict):
+    """dict that also answers the Java Map calls our callers use (entrySet / toArray)."""
+
+    class _Entry:
+        def __init__(self, k, v):
+            self._k, self._v = k, v
+
+        def getKey(self):
+            return self._k
+
+        def getValue(self):
+            return self._v
+
+    class _EntrySet(list):
+        def toArray(self):
+            return list(self)
+
+    def entrySet(self):
+        return self._EntrySet(self._Entry(k, v) for k, v in self.items())
+
+
+class TransactionId:
+    def __init__(self, account_id: AccountId, valid_start: str):
+        self.accountId = account_id
+        self.validStart = valid_start
+
+    @classmethod
+    def generate(cls, account_id):
+        _jni()
+        return cls(AccountId.fromString(account_id), network().next_valid_start())
+
+    @classmethod
+    def fromString(cls, s):
+        acc, start = str(s).split("@", 1)
+        return cls(AccountId.fromString(acc), start)
+
+    def toString(self):
+        return f"{self.accountId.toString()}@{self.validStart}"
+
+    __str__ = toString
+
+    def __eq__(self, other):
+        return str(other) == self.toString()
+
+    def __hash__(self):
+        return hash(self.toString())
+
+
+class TransactionReceipt:
+    def __init__(self, status: str, **fields):
+        self.status = _Status(status)
+        self.accountId = fields.get("accountId")
+        self.tokenId = fields.get("tokenId")
+        self.topicId = fields.get("topicId")
+        self.fileId = fields.get("fileId")
+        self.scheduleId = fields.get("scheduleId")
+        self.topicSequenceNumber = _Long(fields.get("topicSequenceNumber") or 0)
+        self.totalSupply = _Long(fields.get("totalSupply") or 0)
+        self.serials = [_Long(s) for s in fields.get("serials") or []]
+
+
+class TransactionRecord:
+    def __init__(self, tx_id: TransactionId, receipt: TransactionReceipt):
+        self.transactionId = tx_id
+        self.receipt = receipt
+        self.transactionFee = Hbar.fromTinybars(HEDERA_SIM_FEE_TINYBARS)
+
+
+class TransactionResponse:
+    def __init__(self, tx_id: TransactionId):
+        self.transactionId = tx_id
+
+    def getReceipt(self, client):
+        receipt = network().wait_receipt(self.transactionId)
+        if receipt.status.name != "SUCCESS":
+            raise ReceiptStatusException(self.transactionId, receipt)
+        return receipt
+
+    def getRecord(self, client):
+        return TransactionRecord(self.transactionId, self.getReceipt(client))
+
+
+# ---------------- client ----------------
+class Client:
+    def __init__(self, name: str):
+        self.network_name = name
+        self._operator = None
+        self._operator_key = None
+
+    @classmethod
+    def forTestnet(cls):
+        return cls("testnet")
+
+    @classmethod
+    def forMainnet(cls):
+        return cls("mainnet")
+
+    @classmethod
+    def forPreviewnet(cls):
+        return cls("previewnet")
+
+    def setOperator(self, account_id, private_key):
+        self._operator = AccountId.fromString(account_id)
+        self._operator_key = private_key
+        network().ensure_account(self._operator, key=private_key.getPublicKey())
+        return self
+
+    def getOperatorAccountId(self):
+        return self._operator
+
+    def getOperatorPublicKey(self):
+        return self._operator_key.getPublicKey() if self._operator_key else None
+
+    def setRequestTimeout(self, _):
+        return self
+
+    def setMaxAttempts(self, _):
+        return self
+
+    def setMaxNodesPerTransaction(self, _):
+        return self
+
+    def ping(self, _node):
+        return None
+
+    def pingAll(self):
+        return None
+
+    def close(self):
+        return None
+
+
+# ---------------- transactions & queries ----------------
+class _Builder:
+    """Generic setX(...) -> self builder; fields land in self._f['x']."""
+
+    def __init__(self):
+        self._f = {}
+
+    def __getattr__(self, name):
+        if name.startswith("set") and len(name) > 3 and not name.startswith("_"):
+            key = name[3].lower() + name[4:]
+
+            def _setter(*args):
+                self._f[key] = args[0] if len(args) == 1 else args
+                return self
+            return _setter
+        raise AttributeError(name)
+
+
+class _Transaction(_Builder):
+    def __init__(self):
+        super().__init__()
+        self.transactionId = None
+        self._signers: set = set()
+        self._frozen = False
+
+    def setTransactionId(self, tx_id):
+        self.transactionId = tx_id
+        return self
+
+    def freezeWith(self, client):
+        _jni(2)     # body serialisation per node
+        if self.transactionId is None:
+            self.transactionId = TransactionId.generate(client.getOperatorAccountId())
+        self._frozen = True
+        return self
+
+    def sign(self, private_key):
+        _jni(3)     # ed25519 signature
+        self._signers.add(private_key.getPublicKey())
+        return self
+
+    def execute(self, client):
+        if not self._frozen:
+            self.freezeWith(client)
+        self._signers.add(client.getOperatorPublicKey())
+        return network().submit(self)
+
+
+class AccountCreateTransaction(_Transaction):
+    pass
+
+
+class TokenCreateTransaction(_Transaction):
+    pass
+
+
+class TokenAssociateTransaction(_Transaction):
+    pass
+
+
+class TokenGrantKycTransaction(_Transaction):
+    pass
+
+
+class TokenMintTransaction(_Transaction):
+    def addMetadata(self, data):
+        self._f.setdefault("metadata", []).append(data)
+        return self
+
+
+class TopicCreateTransaction(_Transaction):
+    pass
+
+
+class TopicMessageSubmitTransaction(_Transaction):
+    pass
+
+
+class FileCreateTransaction(_Transaction):
+    pass
+
+
+class ScheduleCreateTransaction(_Transaction):
+    pass
+
+
+class FileAppendTransaction(_Transaction):
+    pass
+
+
+class TransferTransaction(_Transaction):
+    def __init__(self):
+        super().__init__()
+        self._hbar: list = []       # (AccountId, tinybars)
+        self._tokens: list = []     # (TokenId, AccountId, amount)
+        self._nfts: list = []       # (TokenId, serial, sender, receiver)
+
+    def addHbarTransfer(self, account_id, hbar):
+        _jni()
+        self._hbar.append((AccountId.fromString(account_id), int(hbar.toTinybars())))
+        return self
+
+    def addTokenTransfer(self, token_id, account_id, amount):
+        _jni()
+        self._tokens.append((TokenId.fromString(token_id), AccountId.fromString(account_id), int(amount)))
+        return self
+
+    def addNftTransfer(self, token_id, serial, sender, receiver):
+        self._nfts.append((TokenId.fromString(token_id), int(serial),
+                           AccountId.fromString(sender), AccountId.fromString(receiver)))
+        return self
+
+
+class _Query(_Builder):
+    def execute(self, client):
+        network().delay()
+        return network().query(self)
+
+
+class AccountBalanceQuery(_Query):
+    pass
+
+
+class FileContentsQuery(_Query):
+    pass
+
+
+class TransactionReceiptQuery(_Query):
+    pass
+
+
+class _AccountBalance:
+    def __init__(self, tinybars: int, tokens: dict):
+        self.hbars = Hbar.fromTinybars(tinybars)
+        self.tokens = _JavaMap({TokenId.fromString(t): _Long(v) for t, v in tokens.items()})
+
+
+# ---------------- the network ----------------
+class SimulatedNetwork:
+    def __init__(self, seed: int = HEDERA_SIM_SEED):
+        self._lock = threading.RLock()
+        self.reset(seed)
+
+    def reset(self, seed: int | None = None):
+        with self._lock:
+            self._rng = random.Random(HEDERA_SIM_SEED if seed is None else seed)
+            self._next_account = 1001
+            self._next_entity = 5001
+            self._clock = 1_700_000_000_000_000_000      # fake ns clock for tx valid-start
+            self.accounts: dict[str, dict] = {}          # "0.0.x" -> {key, hbar, tokens{}, kyc set, assoc set}
+            self.tokens: dict[str, dict] = {}
+            self.topics: dict[str, list] = {}
+            self.files: dict[str, bytearray] = {}
+            self.schedules: dict[str, dict] = {}
+            self.receipts: dict[str, tuple] = {}         # tx_id -> (ready_at, receipt)
+            self.stats = {"submitted": 0, "succeeded": 0, "failed": 0, "injected": 0, "busy": 0}
+            self._faults = True
+            self._inflight = 0
+
+    # ---- helpers ----
+    def random_hex(self, n: int) -> str:
+        with self._lock:
+            return "".join(f"{self._rng.randrange(256):02x}" for _ in range(n))
+
+    def next_valid_start(self) -> str:
+        with self._lock:
+            self._clock += 1_000 + self._rng.randrange(1_000)
+            secs, nanos = divmod(self._clock, 1_000_000_000)
+            return f"{secs}.{nanos:09d}"
+
+    @contextmanager
+    def faults_paused(self):
+        """Bench/test setup: no failure injection inside this block."""
+        self._faults = False
+        try:
+            yield self
+        finally:
+            self._faults = True
+
+    def delay(self):
+        if HEDERA_SIM_LATENCY_MS > 0:
+            time.sleep(HEDERA_SIM_LATENCY_MS / 1000.0)
+
+    def _new_entity(self) -> str:
+        self._next_entity += 1
+        return f"0.0.{self._next_entity - 1}"
+
+    def ensure_account(self, account_id, key: PublicKey | None = None, hbar: float | None = None) -> dict:
+        aid = AccountId.fromString(account_id).toString()
+        with self._lock:
+            acc = self.accounts.get(aid)
+            if acc is None:
+                acc = {"key": key, "hbar": int((HEDERA_SIM_AUTOFUND_HBAR if hbar is None else hbar) * TINY),
+                       "tokens": {}, "kyc": set(), "assoc": set(), "nfts": set()}
+                self.accounts[aid] = acc
+            elif key is not None and acc["key"] is None:
+                acc["key"] = key
+            return acc
+
+    def ensure_token(self, token_id) -> dict:
+        """Tokens we never created (e.g. BHC id from env) are treated as permissive fungible tokens."""
+        tid = TokenId.fromString(token_id).toString()
+        with self._lock:
+            tok = self.tokens.get(tid)
+            if tok is None:
+                tok = {"name": tid, "symbol": "SIM", "decimals": 2, "type": TokenType.FUNGIBLE_COMMON,
+                       "treasury": None, "supply_key": None, "kyc_key": None, "supply": 0,
+                       "next_serial": 1, "permissive": True}
+                self.tokens[tid] = tok
+            return tok
+
+    def fund(self, account_id, hbar: float = 0, tokens: dict | None = None):
+        """Test/bench helper: top up HBAR and token balances directly."""
+        with self._lock:
+            acc = self.ensure_account(account_id)
+            acc["hbar"] += int(hbar * TINY)
+            for tid, amount in (tokens or {}).items():
+                tid = TokenId.fromString(tid).toString()
+                self.ensure_token(tid)
+                acc["tokens"][tid] = acc["tokens"].get(tid, 0) + int(amount)
+                acc["assoc"].add(tid)
+                acc["kyc"].add(tid)
+
+    def balance(self, account_id) -> dict:
+        with self._lock:
+            acc = self.ensure_account(account_id)
+            return {"hbar": acc["hbar"] / TINY, "tokens": dict(acc["tokens"])}
+
+    # ---- submit / receipt ----
+    def submit(self, tx: _Transaction) -> TransactionResponse:
+        with self._lock:
+            self._inflight += 1
+            overloaded = HEDERA_SIM_CAPACITY > 0 and self._inflight > HEDERA_SIM_CAPACITY
+        try:
+            self.delay()
+            if overloaded:
+                with self._lock:
+                    self.stats["submitted"] += 1
+                    self.stats["busy"] += 1
+                raise PrecheckStatusException(tx.transactionId.toString(), "BUSY")
+            return self._submit(tx)
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    def _submit(self, tx: _Transaction) -> TransactionResponse:
+        tx_id = tx.transactionId
+        key = tx_id.toString()
+
+        with self._lock:
+            self.stats["submitted"] += 1
+            if self._faults and HEDERA_SIM_FAILURE_RATE > 0 and self._rng.random() < HEDERA_SIM_FAILURE_RATE:
+                self.stats["injected"] += 1
+                mode = self._rng.choice(HEDERA_SIM_FAILURE_MODES or ["BUSY"])
+                if mode == "TimeoutException":
+                    raise TimeoutException()
+                raise PrecheckStatusException(key, mode)
+            if key in self.receipts:
+                raise PrecheckStatusException(key, "DUPLICATE_TRANSACTION")
+
+            handler = getattr(self, "_apply_" + type(tx).__name__, None)
+            if handler is None:
+                raise PrecheckStatusException(key, "NOT_SUPPORTED")
+            status, fields = handler(tx)
+            self.stats["succeeded" if status == "SUCCESS" else "failed"] += 1
+            ready_at = time.time() + HEDERA_SIM_CONSENSUS_MS / 1000.0
+            self.receipts[key] = (ready_at, TransactionReceipt(status, **fields))
+
+        return TransactionResponse(tx_id)
+
+    def wait_receipt(self, tx_id) -> TransactionReceipt:
+        key = str(tx_id)
+        with self._lock:
+            entry = self.receipts.get(key)
+        if entry is None:
+            raise PrecheckStatusException(key, "RECEIPT_NOT_FOUND")
+        ready_at, receipt = entry
+        wait = ready_at - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        return receipt
+
+    def query(self, q: _Query):
+        f = q._f
+        if isinstance(q, AccountBalanceQuery):
+            with self._lock:
+                acc = self.ensure_account(f["accountId"])
+                return _AccountBalance(acc["hbar"], acc["tokens"])
+        if isinstance(q, FileContentsQuery):
+            fid = FileId.fromString(f["fileId"]).toString()
+            with self._lock:
+                if fid not in self.files:
+                    raise PrecheckStatusException("query", "INVALID_FILE_ID")
+                return bytes(self.files[fid])
+        if isinstance(q, TransactionReceiptQuery):
+            return self.wait_receipt(f["transactionId"])
+        raise PrecheckStatusException("query", "NOT_SUPPORTED")
+
+    # ---- signature rules ----
+    @staticmethod
+    def _signed_by(tx, acc: dict) -> bool:
+        return acc["key"] is None or acc["key"] in tx._signers
+
+    @staticmethod
+    def _key_signed(tx, key) -> bool:
+        return key is None or key in tx._signers
+
+    # ---- handlers (called under lock; return (status, receipt fields)) ----
+    def _apply_AccountCreateTransaction(self, tx):
+        payer = self.ensure_account(tx.transactionId.accountId)
+        initial = tx._f.get("initialBalance") or Hbar(0)
+        tiny = int(initial.toTinybars())
+        if payer["hbar"] < tiny:
+            return "INSUFFICIENT_PAYER_BALANCE", {}
+        self._next_account += 1
+        new_id = AccountId(0, 0, self._next_account - 1)
+        while new_id.toString() in self.accounts:
+            self._next_account += 1
+            new_id = AccountId(0, 0, self._next_account - 1)
+        key = tx._f.get("key")
+        self.accounts[new_id.toString()] = {"key": key, "hbar": tiny, "tokens": {}, "kyc": set(),
+                                            "assoc": set(), "nfts": set()}
+        payer["hbar"] -= tiny
+        return "SUCCESS", {"accountId": new_id}
+
+    def _apply_TokenCreateTransaction(self, tx):
+        f = tx._f
+        treasury_id = AccountId.fromString(f["treasuryAccountId"]).toString()
+        treasury = self.ensure_account(treasury_id)
+        tid = self._new_entity()
+        initial = int(f.get("initialSupply") or 0)
+        self.tokens[tid] = {
+            "name": f.get("tokenName"), "symbol": f.get("tokenSymbol"),
+            "decimals": int(f.get("decimals") or 0),
+            "type": f.get("tokenType") or TokenType.FUNGIBLE_COMMON,
+            "treasury": treasury_id, "supply_key": f.get("supplyKey"), "kyc_key": f.get("kycKey"),
+            "supply": initial, "next_serial": 1, "permissive": False,
+        }
+        treasury["assoc"].add(tid)
+        treasury["kyc"].add(tid)
+        treasury["tokens"][tid] = initial
+        return "SUCCESS", {"tokenId": TokenId.fromString(tid)}
+
+    def _apply_TokenAssociateTransaction(self, tx):
+        acc_id = AccountId.fromString(tx._f["accountId"]).toString()
+        acc = self.ensure_account(acc_id)
+        if not self._signed_by(tx, acc):
+            return "INVALID_SIGNATURE", {}
+        token_ids = tx._f.get("tokenIds") or []
+        for t in token_ids:
+            tid = TokenId.fromString(t).toString()
+            self.ensure_token(tid)
+            if tid in acc["assoc"]:
+                return "TOKEN_ALREADY_ASSOCIATED_TO_ACCOUNT", {}
+        for t in token_ids:
+            tid = TokenId.fromString(t).toString()
+            acc["assoc"].add(tid)
+            acc["tokens"].setdefault(tid, 0)
+        return "SUCCESS", {}
+
+    def _apply_TokenGrantKycTransaction(self, tx):
+        tid = TokenId.fromString(tx._f["tokenId"]).toString()
+        tok = self.ensure_token(tid)
+        acc = self.ensure_account(tx._f["accountId"])
+        if not tok["permissive"] and tok["kyc_key"] is None:
+            return "TOKEN_HAS_NO_KYC_KEY", {}
+        if not self._key_signed(tx, tok["kyc_key"]):
+            return "INVALID_SIGNATURE", {}
+        if tid not in acc["assoc"] and not tok["permissive"]:
+            return "TOKEN_NOT_ASSOCIATED_TO_ACCOUNT", {}
+        acc["kyc"].add(tid)
+        return "SUCCESS", {}
+
+    def _apply_TokenMintTransaction(self, tx):
+        tid = TokenId.fromString(tx._f["tokenId"]).toString()
+        tok = self.ensure_token(tid)
+        if not self._key_signed(tx, tok["supply_key"]):
+            return "INVALID_SIGNATURE", {}
+        treasury = self.ensure_account(tok["treasury"] or tx.transactionId.accountId)
+        if tok["type"] == TokenType.NON_FUNGIBLE_UNIQUE:
+            metas = tx._f.get("metadata") or []
+            serials = []
+            for _ in metas:
+                serials.append(tok["next_serial"])
+                treasury["nfts"].add((tid, tok["next_serial"]))
+                tok["next_serial"] += 1
+            tok["supply"] += len(serials)
+            return "SUCCESS", {"serials": serials, "totalSupply": tok["supply"]}
+        amount = int(tx._f.get("amount") or 0)
+        tok["supply"] += amount
+        treasury["tokens"][tid] = treasury["tokens"].get(tid, 0) + amount
+        return "SUCCESS", {"totalSupply": tok["supply"]}
+
+    def _apply_TransferTransaction(self, tx):
+        legs = len(tx._hbar) + len(tx._tokens)
+        if legs > HEDERA_SIM_MAX_TRANSFERS:
+            return "TRANSFER_LIST_SIZE_LIMIT_EXCEEDED", {}
+
+        seen = set()
+        for aid, _ in tx._hbar:
+            if ("hbar", aid) in seen:
+                return "ACCOUNT_REPEATED_IN_ACCOUNT_AMOUNTS", {}
+            seen.add(("hbar", aid))
+        for tid, aid, _ in tx._tokens:
+            if (tid, aid) in seen:
+                return "ACCOUNT_REPEATED_IN_ACCOUNT_AMOUNTS", {}
+            seen.add((tid, aid))
+
+        if sum(t for _, t in tx._hbar) != 0:
+            return "INVALID_ACCOUNT_AMOUNTS", {}
+        per_token = {}
+        for tid, _, amt in tx._tokens:
+            per_token[tid] = per_token.get(tid, 0) + amt
+        if any(v != 0 for v in per_token.values()):
+            return "TRANSFERS_NOT_ZERO_SUM_FOR_TOKEN", {}
+
+        # validate everything before mutating (a transfer is atomic)
+        for aid, tiny in tx._hbar:
+            acc = self.ensure_account(aid)
+            if tiny < 0:
+                if not self._signed_by(tx, acc):
+                    return "INVALID_SIGNATURE", {}
+                if acc["hbar"] + tiny < 0:
+                    return "INSUFFICIENT_ACCOUNT_BALANCE", {}
+        for tid, aid, amt in tx._tokens:
+            t = tid.toString()
+            tok = self.ensure_token(t)
+            acc = self.ensure_account(aid)
+            if not tok["permissive"]:
+                if t not in acc["assoc"]:
+                    return "TOKEN_NOT_ASSOCIATED_TO_ACCOUNT", {}
+                if tok["kyc_key"] is not None and t not in acc["kyc"]:
+                    return "ACCOUNT_KYC_NOT_GRANTED_FOR_TOKEN", {}
+            if amt < 0:
+                if not self._signed_by(tx, acc):
+                    return "INVALID_SIGNATURE", {}
+                if acc["tokens"].get(t, 0) + amt < 0:
+                    return "INSUFFICIENT_TOKEN_BALANCE", {}
+        for tid, serial, sender, receiver in tx._nfts:
+            t = tid.toString()
+            src = self.ensure_account(sender)
+            if (t, serial) not in src["nfts"]:
+                return "SENDER_DOES_NOT_OWN_NFT_SERIAL_NO", {}
+            if not self._signed_by(tx, src):
+                return "INVALID_SIGNATURE", {}
+
+        for aid, tiny in tx._hbar:
+            self.accounts[aid.toString()]["hbar"] += tiny
+        for tid, aid, amt in tx._tokens:
+            acc = self.accounts[aid.toString()]
+            acc["tokens"][tid.toString()] = acc["tokens"].get(tid.toString(), 0) + amt
+        for tid, serial, sender, receiver in tx._nfts:
+            t = tid.toString()
+            self.accounts[sender.toString()]["nfts"].discard((t, serial))
+            self.ensure_account(receiver)["nfts"].add((t, serial))
+        return "SUCCESS", {}
+
+    def _apply_TopicCreateTransaction(self, tx):
+        tid = self._new_entity()
+        self.topics[tid] = []
+        return "SUCCESS", {"topicId": TopicId.fromString(tid)}
+
+    def _apply_TopicMessageSubmitTransaction(self, tx):
+        tid = TopicId.fromString(tx._f["topicId"]).toString()
+        msgs = self.topics.setdefault(tid, [])       # unknown (env) topic ids are accepted
+        msg = tx._f.get("message")
+        msgs.append(msg.encode("utf-8") if isinstance(msg, str) else bytes(msg or b""))
+        return "SUCCESS", {"topicSequenceNumber": len(msgs)}
+
+    def _apply_ScheduleCreateTransaction(self, tx):
+        inner = tx._f.get("scheduledTransaction")
+        if inner is None:
+            return "INVALID_TRANSACTION", {}
+        expiry = tx._f.get("expirationTime")
+        if expiry is not None and expiry.seconds <= time.time():
+            return "SCHEDULE_EXPIRATION_TIME_MUST_BE_HIGHER_THAN_CONSENSUS_TIME", {}
+        sid = self._new_entity()
+        self.schedules[sid] = {"inner": type(inner).__name__, "memo": tx._f.get("scheduleMemo"),
+                               "expiry": expiry.seconds if expiry is not None else None}
+        return "SUCCESS", {"scheduleId": ScheduleId.fromString(sid)}
+
+    def _apply_FileCreateTransaction(self, tx):
+        fid = self._new_entity()
+        data = tx._f.get("contents") or b""
+        self.files[fid] = bytearray(data.encode("utf-8") if isinstance(data, str) else bytes(data))
+        return "SUCCESS", {"fileId": FileId.fromString(fid)}
+
+    def _apply_FileAppendTransaction(self, tx):
+        fid = FileId.fromString(tx._f["fileId"]).toString()
+        if fid not in self.files:
+            return "INVALID_FILE_ID", {}
+        data = tx._f.get("contents") or b""
+        self.files[fid].extend(data.encode("utf-8") if isinstance(data, str) else bytes(data))
+        return "SUCCESS", {"fileId": FileId.fromString(fid)}
+
+
+_NETWORK = None
+_NETWORK_LOCK = threading.Lock()
+
+
+def network() -> SimulatedNetwork:
+    global _NETWORK
+    if _NETWORK is None:
+        with _NETWORK_LOCK:
+            if _NETWORK is None:
+                _NETWORK = SimulatedNetwork()
+    return _NETWORK
+
+
+# ---------------- module shims ----------------
+_SDK_CLASSES = {
+    c.__name__: c for c in (
+        Client, AccountId, TokenId, TopicId, FileId, ScheduleId, PrivateKey, PublicKey, Hbar, HbarUnit,
+        TokenType, TokenSupplyType, TransactionId, TransactionReceipt, TransactionRecord, TransactionResponse,
+        AccountCreateTransaction, AccountBalanceQuery, TransferTransaction,
+        TokenCreateTransaction, TokenAssociateTransaction, TokenGrantKycTransaction, TokenMintTransaction,
+        TopicCreateTransaction, TopicMessageSubmitTransaction,
+        FileCreateTransaction, FileAppendTransaction, FileContentsQuery, TransactionReceiptQuery,
+        ScheduleCreateTransaction,
+        PrecheckStatusException, ReceiptStatusException,
+    )
+}
+_SDK_CLASSES["Key"] = PublicKey
+
+
+def autoclass(name: str):
+    if name.startswith("com.hedera.hashgraph.sdk."):
+        short = name.rsplit(".", 1)[-1]
+        if short in _SDK_CLASSES:
+            return _SDK_CLASSES[short]
+    if name == "java.time.Duration":
+        return Duration
+    if name == "java.time.Instant":
+        return Instant
+    if name == "java.util.Arrays":
+        return Arrays
+    if name.startswith("[L"):
+        return list
+    raise JavaException(f"java.lang.ClassNotFoundException: {name} (not simulated)")
+
+
+def install():
+    """Register the simulated `hedera` and `jnius` modules (idempotent)."""
+    current = sys.modules.get("hedera")
+    if current is not None and getattr(current, "__simulated__", False):
+        return
+    if current is not None:
+        print("⚠️ Real hedera SDK was imported before the simulator; those imports stay live")
+
+    hedera_mod = types.ModuleType("hedera")
+    hedera_mod.__dict__.update(_SDK_CLASSES)
+    hedera_mod.__simulated__ = True
+    sys.modules["hedera"] = hedera_mod
+
+    jnius_mod = types.ModuleType("jnius")
+    jnius_mod.autoclass = autoclass
+    jnius_mod.JavaException = JavaException
+    jnius_mod.__simulated__ = True
+    sys.modules["jnius"] = jnius_mod
+    print("🧪 Hedera simulator backend active (HEDERA_BACKEND=simulator)")
@@ -0,0 +1,187 @@
+# hedera_sdk/submit_scheduler.py
+"""
+Central gate for Hedera submissions (every signer.sign_and_submit execute goes through here).
+
+- Per-operator concurrency limit, adjusted by AIMD: every clean submit under
+  HEDERA_SCHED_LATENCY_TARGET_S adds 1/limit (about +1 per window), a BUSY /
+  PLATFORM_TRANSACTION_NOT_CREATED / throttle or a slow submit halves it (at
+  most once per observed submit latency, capped by HEDERA_SCHED_COOLDOWN_S, so
+  one burst of errors doesn't collapse it to 1).
+- Priority lanes: when the operator is at its limit, waiters are released in
+  lane order (interactive -> default -> batch), FIFO within a lane. So a member's
+  repayment doesn't queue behind a 500-row profit payout.
+- Jittered exponential backoff for the retry loop in signer.
+
+Metrics (middleware.monitor): hedera_submit_queue_depth{lane}, hedera_submit_inflight{operator},
+hedera_submit_limit{operator}, hedera_submit_latency_seconds{lane}, hedera_submit_wait_seconds{lane},
+hedera_submit_total{result}.
+"""
+import os
+import time
+import heapq
+import random
+import itertools
+import threading
+
+from middleware.monitor import metrics
+
+HEDERA_SCHED_ENABLED = os.getenv("HEDERA_SCHED_ENABLED", "true").lower() in ("1", "true", "yes")
+HEDERA_SCHED_INITIAL_LIMIT = float(os.getenv("HEDERA_SCHED_INITIAL_LIMIT", "8"))
+HEDERA_SCHED_MIN_LIMIT = float(os.getenv("HEDERA_SCHED_MIN_LIMIT", "1"))
+HEDERA_SCHED_MAX_LIMIT = float(os.getenv("HEDERA_SCHED_MAX_LIMIT", "64"))
+HEDERA_SCHED_LATENCY_TARGET_S = float(os.getenv("HEDERA_SCHED_LATENCY_TARGET_S", "3"))
+HEDERA_SCHED_DECREASE = float(os.getenv("HEDERA_SCHED_DECREASE", "0.5"))
+HEDERA_SCHED_COOLDOWN_S = float(os.getenv("HEDERA_SCHED_COOLDOWN_S", "1"))
+HEDERA_SCHED_MAX_WAIT_S = float(os.getenv("HEDERA_SCHED_MAX_WAIT_S", "30"))
+HEDERA_SCHED_BACKOFF_S = float(os.getenv("HEDERA_SCHED_BACKOFF_S", "0.25"))
+HEDERA_SCHED_BACKOFF_MAX_S = float(os.getenv("HEDERA_SCHED_BACKOFF_MAX_S", "8"))
+
+LANES = {"interactive": 0, "default": 1, "batch": 2}
+THROTTLE_CODES = ("BUSY", "PLATFORM_TRANSACTION_NOT_CREATED", "THROTTLED_AT_CONSENSUS",
+                  "PLATFORM_NOT_ACTIVE")
+
+metrics.describe("hedera_submit_queue_depth", "Submissions waiting for an operator slot, by lane")
+metrics.describe("hedera_submit_inflight", "Submissions currently on the wire, by operator")
+metrics.describe("hedera_submit_limit", "AIMD concurrency limit, by operator")
+metrics.describe("hedera_submit_latency_seconds", "execute() latency (submit + precheck)")
+metrics.describe("hedera_submit_wait_seconds", "Time spent queued for a slot")
+metrics.describe("hedera_submit_total", "Submissions by result (ok | throttled | error)")
+
+
+def is_throttle(exc_or_msg) -> bool:
+    msg = str(exc_or_msg)
+    return any(code in msg for code in THROTTLE_CODES)
+
+
+def backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff (seconds) for retry attempt 0, 1, 2, ..."""
+    cap = min(HEDERA_SCHED_BACKOFF_S * (2 ** attempt), HEDERA_SCHED_BACKOFF_MAX_S)
+    return random.uniform(cap / 2, cap)
+
+
+class _OperatorLimiter:
+    def __init__(self):
+        self.limit = HEDERA_SCHED_INITIAL_LIMIT
+        self.in_flight = 0
+        self._waiters: list = []            # heap of (lane_prio, seq)
+        self._cond = threading.Condition()
+        self._last_decrease = 0.0
+        self._rtt = None                    # EWMA of execute() latency
+
+    def acquire(self, prio: int, seq: int, timeout: float):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            entry = (prio, seq)
+            heapq.heappush(self._waiters, entry)
+            try:
+                while not (self.in_flight < max(1, int(self.limit)) and self._waiters[0] == entry):
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        raise RuntimeError("Hedera submission queue timeout (operator at its concurrency limit)")
+                    self._cond.wait(left)
+            except BaseException:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._waiters)
+            self.in_flight += 1
+            self._cond.notify_all()         # the next waiter may fit as well
+
+    def _decrease(self):
+        # once per window: the submits already in flight when we backed off report
+        # the same congestion and must not halve the limit again
+        now = time.monotonic()
+        window = min(HEDERA_SCHED_COOLDOWN_S, self._rtt if self._rtt is not None else HEDERA_SCHED_COOLDOWN_S)
+        if now - self._last_decrease >= window:
+            self.limit = max(HEDERA_SCHED_MIN_LIMIT, self.limit * HEDERA_SCHED_DECREASE)
+            self._last_decrease = now
+
+    def release(self, result: str, latency: float):
+        with self._cond:
+            self.in_flight -= 1
+            self._rtt = latency if self._rtt is None else 0.8 * self._rtt + 0.2 * latency
+            if result == "throttled" or (result == "ok" and latency > HEDERA_SCHED_LATENCY_TARGET_S):
+                self._decrease()
+            elif result == "ok":
+                self.limit = min(HEDERA_SCHED_MAX_LIMIT, self.limit + 1.0 / max(self.limit, 1.0))
+            self._cond.notify_all()
+
+    def penalize(self):
+        """Throttle seen outside execute() (e.g. THROTTLED_AT_CONSENSUS in the receipt)."""
+        with self._cond:
+            self._decrease()
+
+    def depth_by_prio(self) -> dict:
+        with self._cond:
+            out = {}
+            for prio, _ in self._waiters:
+                out[prio] = out.get(prio, 0) + 1
+            return out
+
+
+class SubmissionScheduler:
+    def __init__(self):
+        self._ops: dict[str, _OperatorLimiter] = {}
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        metrics.gauge_fn("hedera_submit_queue_depth", self.queue_depth, label="lane")
+        metrics.gauge_fn("hedera_submit_inflight", lambda: {k: v["in_flight"] for k, v in self.stats().items()},
+                         label="operator")
+        metrics.gauge_fn("hedera_submit_limit", lambda: {k: v["limit"] for k, v in self.stats().items()},
+                         label="operator")
+
+    def _limiter(self, operator: str) -> _OperatorLimiter:
+        with self._lock:
+            lim = self._ops.get(operator)
+            if lim is None:
+                lim = self._ops[operator] = _OperatorLimiter()
+            return lim
+
+    def run(self, operator: str, fn, lane: str = "default"):
+        """Run fn() (one execute) inside an operator slot; AIMD learns from the outcome."""
+        if not HEDERA_SCHED_ENABLED:
+            return fn()
+        lim = self._limiter(operator)
+        t_wait = time.perf_counter()
+        lim.acquire(LANES.get(lane, LANES["default"]), next(self._seq), HEDERA_SCHED_MAX_WAIT_S)
+        metrics.observe("hedera_submit_wait_seconds", time.perf_counter() - t_wait, lane=lane)
+
+        t0 = time.perf_counter()
+        result = "error"
+        try:
+            out = fn()
+            result = "ok"
+            return out
+        except Exception as e:
+            result = "throttled" if is_throttle(e) else "error"
+            raise
+        finally:
+            took = time.perf_counter() - t0
+            lim.release(result, took)
+            metrics.observe("hedera_submit_latency_seconds", took, lane=lane)
+            metrics.inc("hedera_submit_total", result=result)
+
+    def throttled(self, operator: str):
+        if HEDERA_SCHED_ENABLED:
+            self._limiter(operator).penalize()
+            metrics.inc("hedera_submit_total", result="throttled")
+
+    # ---- introspection ----
+    def queue_depth(self) -> dict:
+        names = {v: k for k, v in LANES.items()}
+        out = {lane: 0 for lane in LANES}
+        with self._lock:
+            limiters = list(self._ops.values())
+        for lim in limiters:
+            for prio, n in lim.depth_by_prio().items():
+                out[names.get(prio, "default")] += n
+        return out
+
+    def stats(self) -> dict:
+        with self._lock:
+            items = list(self._ops.items())
+        return {op: {"limit": round(lim.limit, 2), "in_flight": lim.in_flight} for op, lim in items}
+
+
+submit_scheduler = SubmissionScheduler()
@@ -1,6 +1,16 @@
 # hedera_sdk/token_service.py
 
-from hedera import (
+from . import jvm
+from .client_pool import get_client
+from .receipts import submitted
+from . import signer
+from .instrument import instrumented
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# 💤 SDK classes resolve on first use (JVM starts then, not at import)
+(
     TokenCreateTransaction,
     TokenType,
     TokenSupplyType,
@@ -11,22 +21,35 @@ from hedera import (
     Hbar,
     AccountId,
     PrivateKey,
-    TokenId,  # ensure TokenId is imported
+    TokenId,
+) = jvm.lazy_import(
+    "hedera",
+    "TokenCreateTransaction",
+    "TokenType",
+    "TokenSupplyType",
+    "TokenAssociateTransaction",
+    "TokenGrantKycTransaction",
+    "TokenMintTransaction",
+    "TransferTransaction",
+    "Hbar",
+    "AccountId",
+    "PrivateKey",
+    "TokenId",
 )
-from .config import client
-
-# ✅ PyJNIus helpers & retry backoff
-from jnius import autoclass, JavaException
-import time
 
 # ✅ TransactionId generator (for fresh tx id per attempt)
-TransactionId = autoclass('com.hedera.hashgraph.sdk.TransactionId')
+TransactionId = jvm.lazy_class('com.hedera.hashgraph.sdk.TransactionId')
+
+# ✅ Batched transfers: network cap on account-amount legs per TransferTransaction
+# (sender debit counts as one leg), and how many chunks go out in parallel
+HEDERA_MAX_TRANSFERS_PER_TX = int(os.getenv("HEDERA_MAX_TRANSFERS_PER_TX", "10"))
+HEDERA_BATCH_WORKERS = int(os.getenv("HEDERA_BATCH_WORKERS", "4"))
 
 
 # ---------------- Fungible Token ----------------
+@instrumented("token_create")
 def create_token_for_group(group_name: str, treasury_account: str, treasury_key: str) -> dict:
-    if not client:
-        raise RuntimeError("Hedera client not initialized")
+    client = get_client()
 
     treasury_acc = AccountId.fromString(treasury_account)
     treasury_priv = PrivateKey.fromString(treasury_key)
@@ -51,123 +74,240 @@ def create_token_for_group(group_name: str, treasury_account: str, treasury_key:
     return {"token_id": receipt.tokenId.toString(), "name": group_name}
 
 
+@instrumented("token_associate")
 def associate_token_with_account(token_id: str, account_id: str, account_privkey: str) -> dict:
-    if not client:
-        raise RuntimeError("Hedera client not initialized")
+    client = get_client()
 
-    acc = AccountId.fromString(account_id)
-    priv = PrivateKey.fromString(account_privkey)
-    tid = TokenId.fromString(token_id)
+    acc = signer.account_id(account_id)
+    priv = signer.private_key(account_privkey)
+    tid = signer.token_id(token_id)
 
     # ✅ Java List<TokenId> use karo
-    Arrays = autoclass('java.util.Arrays')
+    Arrays = jvm.lazy_class('java.util.Arrays')
     token_list = Arrays.asList(tid)
 
-    tx = (
-        TokenAssociateTransaction()
-        .setAccountId(acc)
-        .setTokenIds(token_list)
-        .freezeWith(client)
-    )
-    signed = tx.sign(priv)
+    def build(c):
+        tx = (
+            TokenAssociateTransaction()
+            .setAccountId(acc)
+            .setTokenIds(token_list)
+            .freezeWith(c)
+        )
+        return tx.sign(priv)
 
-    last = None
-    for i in range(3):
-        try:
-            resp = signed.execute(client)
-            receipt = resp.getReceipt(client)
-            return {
-                "status": receipt.status.toString(),
-                "tx_id": resp.transactionId.toString(),
-                "account_id": account_id,
-                "token_id": token_id,
-            }
-        except JavaException as je:
-            if "TimeoutException" in str(je) and i < 2:
-                time.sleep(1 + i)
-                last = je
-                continue
-            raise
-
-    raise RuntimeError(f"Association failed after retries: {str(last)[:200] if last else 'unknown error'}")
-
-
-def grant_kyc(token_id: str, account_id: str, operator_privkey: str) -> dict:
-    if not client:
-        raise RuntimeError("Hedera client not initialized")
-
-    acc = AccountId.fromString(account_id)
-    priv = PrivateKey.fromString(operator_privkey)
-    tid = TokenId.fromString(token_id)
-
-    tx = TokenGrantKycTransaction().setAccountId(acc).setTokenId(tid).freezeWith(client)
-    signed = tx.sign(priv)
-    resp = signed.execute(client)
-    receipt = resp.getReceipt(client)
+    # timeouts resend the same bytes, BUSY rebuilds (signer + submit_scheduler)
+    resp, receipt = signer.sign_and_submit(build, client, lane="interactive")
+    return {
+        "status": receipt.status.toString(),
+        "tx_id": resp.transactionId.toString(),
+        "account_id": account_id,
+        "token_id": token_id,
+    }
+
+
+@instrumented("kyc_grant")
+def grant_kyc(token_id: str, account_id: str, operator_privkey: str,
+              wait_for_receipt: bool = True, on_receipt=None) -> dict:
+    client = get_client()
+
+    acc = signer.account_id(account_id)
+    priv = signer.private_key(operator_privkey)
+    tid = signer.token_id(token_id)
+
+    resp, receipt = signer.sign_and_submit(
+        lambda c: TokenGrantKycTransaction().setAccountId(acc).setTokenId(tid).freezeWith(c).sign(priv),
+        client, wait_for_receipt=wait_for_receipt, lane="interactive")
+    if not wait_for_receipt:
+        return submitted(resp, "kyc", on_receipt, account_id=account_id, token_id=token_id)
 
     return {"status": receipt.status.toString(), "account_id": account_id, "token_id": token_id}
 
 
-def mint_tokens(token_id: str, amount: int, treasury_privkey: str) -> dict:
-    if not client:
-        raise RuntimeError("Hedera client not initialized")
+@instrumented("token_mint")
+def mint_tokens(token_id: str, amount: int, treasury_privkey: str,
+                wait_for_receipt: bool = True, on_receipt=None) -> dict:
+    client = get_client()
 
-    priv = PrivateKey.fromString(treasury_privkey)
-    tx = TokenMintTransaction().setTokenId(TokenId.fromString(token_id)).setAmount(amount).freezeWith(client)
-    signed = tx.sign(priv)
-    resp = signed.execute(client)
-    receipt = resp.getReceipt(client)
+    priv = signer.private_key(treasury_privkey)
+    tid = signer.token_id(token_id)
+    resp, receipt = signer.sign_and_submit(
+        lambda c: TokenMintTransaction().setTokenId(tid).setAmount(amount).freezeWith(c).sign(priv),
+        client, wait_for_receipt=wait_for_receipt)
+    if not wait_for_receipt:
+        return submitted(resp, "mint", on_receipt, token_id=token_id, minted=amount)
 
     return {"status": receipt.status.toString(), "token_id": token_id, "minted": amount}
 
 
-def transfer_hts_token(token_id: str, from_account: str, from_privkey: str, to_account: str, amount: int) -> dict:
+@instrumented("token_transfer")
+def transfer_hts_token(token_id: str, from_account: str, from_privkey: str, to_account: str, amount: int,
+                       wait_for_receipt: bool = True, on_receipt=None, lane: str = "interactive") -> dict:
     """
-    Token transfer with retry. Har attempt par fresh TransactionId + fresh sign.
+    Token transfer with retry via signer.sign_and_submit (cached key/ids, per-token template).
+    wait_for_receipt=False: return {"status": "SUBMITTED", "tx_id": ...} right after execute;
+    receipt_tracker confirms it in the background. lane: submit_scheduler priority lane.
     """
-    if not client:
-        raise RuntimeError("Hedera client not initialized")
+    client = get_client()
+    tmpl = signer.transfer_template(token_id, from_account, from_privkey)
+
+    # fresh TransactionId only when a rebuild is needed; timeouts resend the same signed bytes
+    resp, receipt = signer.sign_and_submit(lambda c: tmpl.build(c, {to_account: int(amount)}),
+                                           client, wait_for_receipt=wait_for_receipt, lane=lane)
+    if not wait_for_receipt:
+        return submitted(resp, "hts_transfer", on_receipt, **{
+            "from": from_account, "to": to_account, "token_id": token_id, "amount": amount,
+        })
+    return {
+        "status": receipt.status.toString(),
+        "from": from_account,
+        "to": to_account,
+        "token_id": token_id,
+        "amount": amount,
+        "tx_id": resp.transactionId.toString(),
+    }
 
-    from_acc = AccountId.fromString(from_account)
-    to_acc = AccountId.fromString(to_account)
-    priv = PrivateKey.fromString(from_privkey)
-    tid = TokenId.fromString(token_id)
 
-    last = None
-    for i in range(5):
-        # ✅ NAYA tx + NAYA TransactionId + freeze + sign (loop ke andar)
-        tx = (
-            TransferTransaction()
-            .addTokenTransfer(tid, from_acc, -int(amount))
-            .addTokenTransfer(tid, to_acc,   int(amount))
-            .setTransactionId(TransactionId.generate(client.getOperatorAccountId()))
-            .freezeWith(client)
-        )
-        signed = tx.sign(priv)
+# ---------------- Batched Multi-Party Transfers ----------------
+def _normalize_transfers(transfers) -> list[tuple[int, str, object]]:
+    """Accept [{"to": acc, "amount": n}] or [(acc, n)] -> [(idx, acc, amount)]."""
+    out = []
+    for idx, t in enumerate(transfers):
+        if isinstance(t, dict):
+            out.append((idx, str(t.get("to") or t.get("account") or ""), t.get("amount")))
+        else:
+            to, amount = t
+            out.append((idx, str(to), amount))
+    return out
+
+
+def _chunk_transfers(items: list, per_chunk: int) -> list[dict]:
+    """
+    Pack recipients into chunks of at most `per_chunk` credit legs. A repeated
+    recipient is merged into its existing leg (Hedera rejects repeated accounts
+    in one transfer list), so duplicates never cost an extra slot.
+    """
+    chunks, current = [], {}
+    for idx, to, amount in items:
+        if to not in current and len(current) >= per_chunk:
+            chunks.append(current)
+            current = {}
+        leg = current.setdefault(to, {"amount": 0, "indexes": []})
+        leg["amount"] += amount
+        leg["indexes"].append(idx)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+@instrumented("transfer_chunk")
+def _submit_transfer_chunk(token_id: str | None, from_account: str, from_privkey: str,
+                           legs: dict, memo: str | None = None, lane: str = "batch") -> dict:
+    """
+    One TransferTransaction: single debit from sender + one credit per recipient.
+    token_id=None means HBAR (amounts in tinybars). Same retry policy as transfer_hts_token.
+    """
+    client = get_client()
+    tmpl = signer.transfer_template(token_id, from_account, from_privkey)
+    credits = {to: int(leg["amount"]) for to, leg in legs.items()}
+
+    resp, receipt = signer.sign_and_submit(lambda c: tmpl.build(c, credits, memo), client, lane=lane)
+    return {"status": receipt.status.toString(), "tx_id": resp.transactionId.toString()}
+
+
+def _run_transfer_batch(token_id: str | None, from_account: str, from_privkey: str,
+                        items: list, memo: str | None, max_per_tx: int | None,
+                        max_workers: int | None) -> tuple[list[dict], int]:
+    per_chunk = max(1, int(max_per_tx or HEDERA_MAX_TRANSFERS_PER_TX) - 1)  # minus sender debit leg
+
+    results: list[dict | None] = [None] * len(items)
+    valid = []
+    for idx, to, amount in items:
+        if not to or amount is None or amount <= 0:
+            results[idx] = {"to": to, "amount": amount, "status": "REJECTED",
+                            "tx_id": None, "chunk": None, "error": "recipient and positive amount required"}
+        else:
+            valid.append((idx, to, amount))
+
+    chunks = _chunk_transfers(valid, per_chunk)
+    if not chunks:
+        return results, 0
+
+    def _run(chunk_no, legs):
         try:
-            resp = signed.execute(client)
-            receipt = resp.getReceipt(client)
-            return {
-                "status": receipt.status.toString(),
-                "from": from_account,
-                "to": to_account,
-                "token_id": token_id,
-                "amount": amount,
-                "tx_id": resp.transactionId.toString(),
-            }
-        except JavaException as je:
-            msg = str(je)
-            if (("DUPLICATE_TRANSACTION" in msg) or ("TimeoutException" in msg)) and i < 2:
-                time.sleep(1 + i)
-                last = je
-                continue
-            raise
+            return chunk_no, legs, _submit_transfer_chunk(token_id, from_account, from_privkey, legs, memo), None
+        except Exception as e:
+            return chunk_no, legs, None, str(e)
+
+    workers = max(1, min(int(max_workers or HEDERA_BATCH_WORKERS), len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outcomes = list(pool.map(lambda args: _run(*args), enumerate(chunks)))
+
+    # map chunk outcome back to every input row it carried (chunk is atomic on-chain)
+    for chunk_no, legs, res, err in outcomes:
+        for to, leg in legs.items():
+            for idx in leg["indexes"]:
+                results[idx] = {
+                    "to": to,
+                    "amount": items[idx][2],
+                    "status": res["status"] if res else "FAILED",
+                    "tx_id": res["tx_id"] if res else None,
+                    "chunk": chunk_no,
+                    "error": err,
+                }
+    return results, len(chunks)
+
+
+@instrumented("token_transfer_batch")
+def transfer_hts_batch(token_id: str, from_account: str, from_privkey: str, transfers,
+                       memo: str | None = None, max_per_tx: int | None = None,
+                       max_workers: int | None = None) -> dict:
+    """
+    Pay many recipients from one account. Packs up to HEDERA_MAX_TRANSFERS_PER_TX legs
+    per TransferTransaction, splits bigger batches and submits chunks concurrently.
+    `transfers`: [{"to": "0.0.x", "amount": <int, smallest unit>}] or [("0.0.x", amount)].
+    Returns per-recipient results in input order.
+    """
+    items = [(i, to, int(a) if a is not None else None) for i, to, a in _normalize_transfers(transfers)]
+    results, n_chunks = _run_transfer_batch(token_id, from_account, from_privkey, items,
+                                            memo, max_per_tx, max_workers)
+    ok = sum(1 for r in results if r and r["status"] == "SUCCESS")
+    return {
+        "token_id": token_id,
+        "from": from_account,
+        "chunks": n_chunks,
+        "succeeded": ok,
+        "failed": len(results) - ok,
+        "results": results,
+    }
+
+
+@instrumented("hbar_transfer_batch")
+def transfer_hbar_batch(from_account: str, from_privkey: str, transfers,
+                        memo: str | None = None, max_per_tx: int | None = None,
+                        max_workers: int | None = None) -> dict:
+    """Same as transfer_hts_batch but for HBAR; amounts are in HBAR (float)."""
+    items = [(i, to, int(round(float(a) * 100_000_000)) if a is not None else None)
+             for i, to, a in _normalize_transfers(transfers)]
+    results, n_chunks = _run_transfer_batch(None, from_account, from_privkey, items,
+                                            memo, max_per_tx, max_workers)
+    for r in results:
+        if r and isinstance(r.get("amount"), int):
+            r["amount"] = r["amount"] / 100_000_000
+    ok = sum(1 for r in results if r and r["status"] == "SUCCESS")
+    return {
+        "token_id": None,
+        "from": from_account,
+        "chunks": n_chunks,
+        "succeeded": ok,
+        "failed": len(results) - ok,
+        "results": results,
+    }
 
 
 # ---------------- NFT (Non-Fungible Token) ----------------
+@instrumented("nft_create")
 def create_nft_token(name: str, symbol: str, treasury_account: str, treasury_key: str) -> dict:
-    if not client:
-        raise RuntimeError("Hedera client not initialized")
+    client = get_client()
 
     treasury_acc = AccountId.fromString(treasury_account)
     treasury_priv = PrivateKey.fromString(treasury_key)
@@ -190,9 +330,9 @@ def create_nft_token(name: str, symbol: str, treasury_account: str, treasury_key
     return {"nft_token_id": receipt.tokenId.toString(), "name": name}
 
 
+@instrumented("nft_mint")
 def mint_nft_for_user(nft_token_id: str, treasury_privkey: str, metadata: dict) -> dict:
-    if not client:
-        raise RuntimeError("Hedera client not initialized")
+    client = get_client()
 
     import json
     metadata_bytes = json.dumps(metadata).encode("utf-8")
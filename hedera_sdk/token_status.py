@@ -0,0 +1,153 @@
+# hedera_sdk/token_status.py
+"""
+(account, token) association + KYC cache.
+
+ensure_token_ready_for_account and the BHC setup endpoints look here first; only
+accounts that aren't known-ready go to the network. Unknown / stale rows are
+refreshed from the mirror node (one cheap GET) before any transaction is sent.
+Ready rows are trusted for TOKEN_STATUS_READY_TTL_S (KYC can be revoked, tokens
+dissociated) and then re-checked the same way.
+All helpers need an app context and degrade to "unknown" without one.
+
+Cache writes never commit or roll back the caller's session: they go through
+their own session, or a SAVEPOINT when the caller has uncommitted writes (a
+second connection would wait on SQLite's write lock).
+"""
+import os
+from datetime import datetime, timedelta
+
+from flask import has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+TOKEN_STATUS_MIRROR_TTL_S = int(os.getenv("TOKEN_STATUS_MIRROR_TTL_S", "300"))
+TOKEN_STATUS_READY_TTL_S = int(os.getenv("TOKEN_STATUS_READY_TTL_S", "86400"))
+TOKEN_STATUS_USE_MIRROR = os.getenv("TOKEN_STATUS_USE_MIRROR", "true").lower() in ("1", "true", "yes")
+
+# mirror kyc_status values that mean "transfers allowed"
+_KYC_OK = ("GRANTED", "NOT_APPLICABLE")
+
+
+def get_status(account_id: str, token_id: str):
+    if not has_app_context():
+        return None
+    from .models import TokenAccountStatus
+    try:
+        return TokenAccountStatus.query.filter_by(account_id=account_id, token_id=token_id).first()
+    except Exception as e:
+        # cache is an optimisation only; never block the real setup path
+        print(f"⚠️ token status cache read failed: {e}")
+        return None
+
+
+# ---- "does the caller's session hold uncommitted writes?" (flushed rows included) ----
+@event.listens_for(Session, "after_flush")
+def _flushed(session, flush_context):
+    session.info["_has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _ended(session):
+    session.info.pop("_has_writes", None)
+
+
+def _caller_has_writes(session) -> bool:
+    return bool(session.new or session.dirty or session.deleted or session.info.get("_has_writes"))
+
+
+def _save(session, account_id, token_id, associated, kyc_granted, source):
+    from .models import TokenAccountStatus
+    row = session.query(TokenAccountStatus).filter_by(account_id=account_id, token_id=token_id).first()
+    if row is None:
+        row = TokenAccountStatus(account_id=account_id, token_id=token_id,
+                                 associated=False, kyc_granted=False)
+        session.add(row)
+    if associated is not None:
+        row.associated = associated
+    if kyc_granted is not None:
+        row.kyc_granted = kyc_granted
+    row.source = source
+    row.updated_at = datetime.utcnow()
+    if source == "mirror":
+        row.mirror_checked_at = datetime.utcnow()
+    return row
+
+
+def mark(account_id: str, token_id: str, associated: bool | None = None,
+         kyc_granted: bool | None = None, source: str = "local"):
+    """Record what we just learned (from our own tx result or the mirror)."""
+    if not has_app_context():
+        return None
+    from extensions import db
+    caller = db.session()
+    try:
+        if _caller_has_writes(caller):
+            # savepoint: saved together with the caller's commit, a failure only undoes the cache row
+            with caller.begin_nested():
+                return _save(caller, account_id, token_id, associated, kyc_granted, source)
+        with Session(db.engine, expire_on_commit=False) as own:
+            row = _save(own, account_id, token_id, associated, kyc_granted, source)
+            own.commit()
+            return row
+    except Exception as e:
+        print(f"⚠️ token status cache write failed for {account_id}/{token_id}: {e}")
+        return None
+
+
+def _fresh(row) -> bool:
+    return row.updated_at is not None and \
+        row.updated_at >= datetime.utcnow() - timedelta(seconds=TOKEN_STATUS_READY_TTL_S)
+
+
+def refresh_from_mirror(account_id: str, token_id: str):
+    """
+    Pull the token relationship from the mirror node. Mirror lags consensus by a few
+    seconds, so "not found" never downgrades a recent locally-confirmed association.
+    """
+    from .mirror_node import get_mirror_client
+    try:
+        rel = get_mirror_client().account_token(account_id, token_id)
+    except Exception as e:
+        print(f"⚠️ mirror token lookup failed for {account_id}/{token_id}: {e}")
+        return get_status(account_id, token_id)
+
+    if rel is None:
+        row = get_status(account_id, token_id)
+        # an expired "ready" that the mirror no longer shows was dissociated, not lagging
+        if row is None or (row.ready and not _fresh(row)):
+            return mark(account_id, token_id, associated=False, kyc_granted=False, source="mirror")
+        return mark(account_id, token_id, source="mirror")
+    kyc = str(rel.get("kyc_status") or "").upper()
+    return mark(account_id, token_id, associated=True,
+                kyc_granted=kyc in _KYC_OK if kyc else None, source="mirror")
+
+
+def is_ready(account_id: str, token_id: str, refresh: bool = True) -> bool:
+    """True if the account is known to be associated + KYC'd for the token."""
+    row = get_status(account_id, token_id)
+    if row is not None and row.ready and _fresh(row):
+        return True
+    if not refresh or not TOKEN_STATUS_USE_MIRROR or not has_app_context():
+        return False
+    stale = row is None or row.ready or row.mirror_checked_at is None or \
+        row.mirror_checked_at < datetime.utcnow() - timedelta(seconds=TOKEN_STATUS_MIRROR_TTL_S)
+    if not stale:
+        return False
+    row = refresh_from_mirror(account_id, token_id)
+    return bool(row is not None and row.ready)
+
+
+def ready_accounts(token_id: str, account_ids: list[str]) -> set[str]:
+    """Bulk cache lookup (single query, no network) for setup endpoints. Expired ready rows don't count."""
+    if not account_ids or not has_app_context():
+        return set()
+    from .models import TokenAccountStatus
+    rows = TokenAccountStatus.query.filter(
+        TokenAccountStatus.token_id == token_id,
+        TokenAccountStatus.account_id.in_(list(account_ids)),
+        TokenAccountStatus.associated.is_(True),
+        TokenAccountStatus.kyc_granted.is_(True),
+        TokenAccountStatus.updated_at >= datetime.utcnow() - timedelta(seconds=TOKEN_STATUS_READY_TTL_S),
+    ).all()
+    return {r.account_id for r in rows}
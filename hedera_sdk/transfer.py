@@ -3,13 +3,16 @@ import os
 from dataclasses import dataclass
 from typing import Dict, Any
 
-from hedera import (
-    Client,
-    AccountId,
-    PrivateKey,
-    Hbar,
-    TransferTransaction,
-)
+from . import jvm
+from .client_pool import get_client as pooled_client
+from .receipts import submitted
+from . import signer
+from . import instrument
+from .instrument import instrumented
+from .submit_scheduler import submit_scheduler
+
+Client, AccountId, PrivateKey, Hbar, TransferTransaction = jvm.lazy_import(
+    "hedera", "Client", "AccountId", "PrivateKey", "Hbar", "TransferTransaction")
 
 # ---- Config from ENV (.env via python-dotenv or your Config class) ----
 HEDERA_OPERATOR_ID = os.getenv("HEDERA_OPERATOR_ID")
@@ -60,22 +63,22 @@ class HederaResult:
 
 
 def get_client() -> Client:
-    """Return a Hedera client for Testnet/Mainnet and set operator from ENV."""
-    client = Client.forMainnet() if PRODUCTION else Client.forTestnet()
+    """Return the shared pooled Hedera client for the env operator."""
     if not HEDERA_OPERATOR_ID or not HEDERA_OPERATOR_KEY:
         raise RuntimeError("HEDERA_OPERATOR_ID/HEDERA_OPERATOR_KEY not set in environment")
-
-    client.setOperator(AccountId.fromString(HEDERA_OPERATOR_ID),
-                   PrivateKey.fromString(HEDERA_OPERATOR_KEY))
-    return client
+    return pooled_client(operator_id=HEDERA_OPERATOR_ID, operator_key=HEDERA_OPERATOR_KEY)
 
 
+@instrumented("hbar_transfer")
 def transfer_hbar(
     sender_account: str,
     sender_key: str,
     recipient_account: str,
     amount_hbar: float,
     memo: str | None = None,   # ✅ optional memo
+    wait_for_receipt: bool = True,
+    on_receipt=None,
+    lane: str = "interactive",
 ) -> Dict[str, Any]:
     """
     REAL HBAR transfer on Hedera.
@@ -86,9 +89,9 @@ def transfer_hbar(
 
     client = get_client()
 
-    sender_id    = AccountId.fromString(sender_account)
-    recipient_id = AccountId.fromString(recipient_account)
-    priv         = PrivateKey.fromString(sender_key)
+    sender_id    = signer.account_id(sender_account)      # cached parse (no JNI round-trip on repeat)
+    recipient_id = signer.account_id(recipient_account)
+    priv         = signer.private_key(sender_key)
 
     # ✅ precise tinybars conversion
     tiny = int(round(float(amount_hbar) * 100_000_000))
@@ -109,10 +112,16 @@ def transfer_hbar(
 
     _freeze_with(tx, client)
     tx = tx.sign(priv)
-    resp = tx.execute(client)
-    receipt = _get_receipt(resp, client)
-
+    resp = submit_scheduler.run(signer.operator_of(client), lambda: tx.execute(client), lane)
     tid = _tx_id_str(tx)
+
+    if not wait_for_receipt:
+        res = submitted(tid, "transfer", on_receipt, path=[str(sender_id), str(recipient_id)])
+        res["transaction_id"] = tid
+        return res
+
+    receipt = _get_receipt(resp, client)
+    instrument.note_record(resp, client)
     return {
         "transaction_id": tid,            # canonical
         "tx_id": tid,                     # alias (for callers using tx_id)
@@ -1,35 +1,41 @@
 # hedera_sdk/wallet.py
-from hedera import (
+from . import jvm
+from . import instrument
+from .instrument import instrumented
+from .client_pool import get_client
+from . import token_service  # uses your real HTS functions
+from . import token_status
+from extensions import db
+from users.models import User
+
+# 💤 SDK classes resolve on first use (JVM starts then, not at import)
+(
     AccountCreateTransaction,
     AccountBalanceQuery,
-    AccountId,
     Hbar,
     PrivateKey,
     TokenId,
     TransferTransaction,
+) = jvm.lazy_import(
+    "hedera",
+    "AccountCreateTransaction",
+    "AccountBalanceQuery",
+    "Hbar",
+    "PrivateKey",
+    "TokenId",
+    "TransferTransaction",
 )
-from .config import client
-from . import token_service  # uses your real HTS functions
-from extensions import db
-from users.models import User
-from jnius import autoclass
-AccountId = autoclass("com.hedera.hashgraph.sdk.AccountId")
+AccountId = jvm.lazy_class("com.hedera.hashgraph.sdk.AccountId")
 
 
 # ⬇️ NEW: transient timeout ke liye
 import time
-try:
-    from jnius import JavaException
-except Exception:
-    # fallback: agar jnius import fail ho to generic Exception catch ho jayega
-    class JavaException(Exception):
-        pass
 
 
 # ---------- FIXED: create & balance (normalized) ----------
+@instrumented("account_create")
 def create_hedera_account(user_id: int | None = None, initial_balance: float = 10, metadata: dict | None = None):
-    if not client:
-        raise RuntimeError("Hedera client not initialized")
+    client = get_client()
 
     last = None
     for i in range(3):  # 3 tries: 0s, 1s, 2s backoff on Timeout
@@ -67,9 +73,10 @@ def create_hedera_account(user_id: int | None = None, initial_balance: float = 1
                 "metadata": metadata or {}
             }
 
-        except JavaException as je:
+        except jvm.JavaException as je:
             # Hedera Java SDK Timeout friendly retry
             if "TimeoutException" in str(je) and i < 2:
+                instrument.note_retry()
                 time.sleep(i + 1)  # 1s, 2s
                 last = je
                 continue
@@ -80,9 +87,9 @@ def create_hedera_account(user_id: int | None = None, initial_balance: float = 1
             return None
 
 
+@instrumented("account_balance")
 def fetch_wallet_balance(account_id: str) -> dict:
-    if not client:
-        raise RuntimeError("Hedera client not initialized")
+    client = get_client()
     try:
         acc = AccountId.fromString(account_id)
         bal = AccountBalanceQuery().setAccountId(acc).execute(client)
@@ -113,12 +120,12 @@ def fetch_wallet_balance(account_id: str) -> dict:
 
 
 # ---------- NEW: HBAR transfer ----------
+@instrumented("hbar_transfer")
 def transfer_hbar(from_account_id: str, from_private_key: str, to_account_id: str, amount_hbar: float) -> dict:
     """
     Move HBAR on-chain (e.g., fund new accounts, ops wallet funding, etc.).
     """
-    if not client:
-        raise RuntimeError("Hedera client not initialized")
+    client = get_client()
 
     try:
         from_acc = AccountId.fromString(from_account_id)
@@ -146,6 +153,7 @@ def transfer_hbar(from_account_id: str, from_private_key: str, to_account_id: st
         return {"error": str(e)}
 
 
+@instrumented("token_ready")
 def ensure_token_ready_for_account(
     token_id: str,
     account_id: str,
@@ -156,40 +164,50 @@ def ensure_token_ready_for_account(
     1) Associate the token to the account (retry-safe + idempotent).
     2) Grant KYC for that token to that account (retry with backoff).
     Returns dict: {"associate": <assoc_result>, "grant_kyc": True|False, "error": optional}
+    Already-ready accounts (token_status cache / mirror) return without any tx.
     """
+    if token_status.is_ready(account_id, token_id):
+        return {"associate": "already", "grant_kyc": True, "cached": True}
+
     result = {"associate": None, "grant_kyc": None}
+    cached = token_status.get_status(account_id, token_id)
 
     # ---------- 1) Associate (retry-safe + idempotent) ----------
-    last_assoc_err = None
-    for attempt_num in range(3):  # 3 tries with backoff
-        try:
-            assoc = token_service.associate_token_with_account(
-                token_id=token_id,
-                account_id=account_id,
-                account_privkey=account_private_key,
-            )
-            result["associate"] = assoc
-            last_assoc_err = None
-            break
-        except Exception as e:
-            msg = str(e)
-            # If already associated, treat as success
-            if "TOKEN_ALREADY_ASSOCIATED_TO_ACCOUNT" in msg or "ALREADY_ASSOCIATED" in msg:
-                result["associate"] = "already"
+    if cached is not None and cached.associated:
+        result["associate"] = "already"   # only KYC missing
+    else:
+        last_assoc_err = None
+        for attempt_num in range(3):  # 3 tries with backoff
+            try:
+                assoc = token_service.associate_token_with_account(
+                    token_id=token_id,
+                    account_id=account_id,
+                    account_privkey=account_private_key,
+                )
+                result["associate"] = assoc
                 last_assoc_err = None
                 break
-            # Retry on transient errors
-            if ("TimeoutException" in msg or "DUPLICATE_TRANSACTION" in msg) and attempt_num < 2:
-                last_assoc_err = e
-                time.sleep(attempt_num + 1)  # 1s, 2s
-                continue
-            # Non-transient: re-raise so caller can handle
-            raise
-    else:
-        # loop exhausted without success
-        result["associate"] = "failed"
-        result["error"] = str(last_assoc_err) if last_assoc_err else "associate failed"
-        return result
+            except Exception as e:
+                msg = str(e)
+                # If already associated, treat as success
+                if "TOKEN_ALREADY_ASSOCIATED_TO_ACCOUNT" in msg or "ALREADY_ASSOCIATED" in msg:
+                    result["associate"] = "already"
+                    last_assoc_err = None
+                    break
+                # Retry on transient errors
+                if ("TimeoutException" in msg or "DUPLICATE_TRANSACTION" in msg) and attempt_num < 2:
+                    last_assoc_err = e
+                    instrument.note_retry()
+                    time.sleep(attempt_num + 1)  # 1s, 2s
+                    continue
+                # Non-transient: re-raise so caller can handle
+                raise
+        else:
+            # loop exhausted without success
+            result["associate"] = "failed"
+            result["error"] = str(last_assoc_err) if last_assoc_err else "associate failed"
+            return result
+    token_status.mark(account_id, token_id, associated=True)
 
     # ---------- 2) Grant KYC (retry + verify) ----------
     last_err = None
@@ -203,9 +221,11 @@ def ensure_token_ready_for_account(
             # normalize different return shapes:
             if hasattr(kyc, "status") and str(kyc.status).upper().endswith("SUCCESS"):
                 result["grant_kyc"] = True
+                token_status.mark(account_id, token_id, kyc_granted=True)
                 return result
             if isinstance(kyc, dict) and str(kyc.get("status", "")).upper().endswith("SUCCESS"):
                 result["grant_kyc"] = True
+                token_status.mark(account_id, token_id, kyc_granted=True)
                 return result
 
             # If token_service returns something else, treat as transient failure and retry
@@ -215,11 +235,13 @@ def ensure_token_ready_for_account(
             # Retry on transient issues reported by JVM / network
             if ("TimeoutException" in msg or "DUPLICATE_TRANSACTION" in msg) and attempt_num < 2:
                 last_err = e
+                instrument.note_retry()
                 time.sleep(attempt_num + 1)
                 continue
             # For idempotent errors like already granted, accept as success
             if "KYC_ALREADY_GRANTED" in msg or "ALREADY_KYC_GRANTED" in msg:
                 result["grant_kyc"] = True
+                token_status.mark(account_id, token_id, kyc_granted=True)
                 return result
             last_err = e
         # backoff before next attempt
@@ -234,6 +256,7 @@ def ensure_token_ready_for_account(
 
 
 # ---------- NEW: helper to fetch ONE token’s balance cleanly ----------
+@instrumented("token_balance")
 def fetch_single_token_balance(account_id: str, token_id: str) -> int | None:
     """
     Returns raw token units (respect your token's decimals separately).
@@ -0,0 +1 @@
+# jobs/__init__.py
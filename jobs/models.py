@@ -0,0 +1,45 @@
+# jobs/models.py
+from datetime import datetime
+from extensions import db
+
+
+class JobRun(db.Model):
+    """One execution of a periodic job (worker.py / dev scheduler)."""
+    __tablename__ = "job_runs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_name = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(16), nullable=False, default="running")   # running | success | failed
+    worker_id = db.Column(db.String(96), nullable=True)
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    duration_s = db.Column(db.Float, nullable=True)
+    result = db.Column(db.Text, nullable=True)        # JSON summary returned by the job
+    error = db.Column(db.Text, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_job_runs_name_started", "job_name", "started_at"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "job_name": self.job_name,
+            "status": self.status,
+            "worker_id": self.worker_id,
+            "started_at": self.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "finished_at": self.finished_at.strftime("%Y-%m-%d %H:%M:%S") if self.finished_at else None,
+            "duration_s": self.duration_s,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class WorkerLease(db.Model):
+    """Leader lock: whoever holds an unexpired lease runs the scheduler."""
+    __tablename__ = "worker_leases"
+
+    name = db.Column(db.String(64), primary_key=True)
+    holder = db.Column(db.String(96), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    acquired_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
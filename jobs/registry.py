@@ -0,0 +1,155 @@
+# jobs/registry.py
+"""
+Every periodic job in one table. worker.py runs them in production; app.py runs
+the same table in-process for `flask run` (dev) unless SCHEDULER_MODE=worker.
+
+Each execution gets a job_runs row (status, duration, JSON result / traceback);
+a job receives the start time of its previous successful run, so sweeps can
+cover exactly the window since then.
+"""
+import os
+import json
+import time
+import socket
+import traceback
+from datetime import datetime, timedelta
+
+from middleware.monitor import metrics
+
+
+def _on(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", "4"))          # jobs that may run at the same time
+JOB_RUN_KEEP_DAYS = int(os.getenv("JOB_RUN_KEEP_DAYS", "14"))
+WORKER_ID = f"{socket.gethostname()[:64]}:{os.getpid()}"
+
+metrics.describe("job_runs_total", "Periodic job executions by job and status")
+metrics.describe("job_duration_seconds", "Periodic job duration")
+
+
+# ---- job bodies: (previous successful start | None, this start) -> JSON-able summary ----
+def _outbox(prev, now):
+    from middleware.offline_sync import process_outbox
+    return process_outbox()
+
+
+def _credit_interest(prev, now):
+    from cooperative.routes import accrue_credit_interest
+    return {"updated": accrue_credit_interest()}
+
+
+def _profit_settlement(prev, now):
+    from cooperative.routes import auto_settle_and_distribute_profits
+    auto_settle_and_distribute_profits()
+
+
+def _overdue_sweep(prev, now):
+    from jobs.tasks import sweep_overdue
+    return sweep_overdue(since=prev, now=now)
+
+
+def _trust_snapshots(prev, now):
+    from jobs.tasks import snapshot_trust_scores
+    return snapshot_trust_scores()
+
+
+def _reminders(prev, now):
+    from utils.reminder_service import send_repayment_reminders
+    return {"sent": len(send_repayment_reminders())}
+
+
+def _archival(prev, now):
+    from archive.store import run_archival
+    return run_archival()
+
+
+def _contract_indexer(prev, now):
+    from hedera_sdk.contract_indexer import index_contract_events
+    return index_contract_events()
+
+
+JOBS = [
+    {"name": "outbox_retry", "fn": _outbox, "enabled": True,
+     "every": {"seconds": int(os.getenv("OUTBOX_INTERVAL_S", "60"))}},
+    {"name": "credit_interest", "fn": _credit_interest, "enabled": _on("CREDIT_INTEREST_ENABLED"),
+     "every": {"hours": int(os.getenv("CREDIT_INTEREST_INTERVAL_H", "24"))}},
+    {"name": "profit_settlement", "fn": _profit_settlement, "enabled": _on("PROFIT_SETTLEMENT_ENABLED"),
+     "every": {"hours": int(os.getenv("PROFIT_SETTLEMENT_INTERVAL_H", "24"))}},
+    {"name": "overdue_sweep", "fn": _overdue_sweep, "enabled": _on("OVERDUE_SWEEP_ENABLED", "true"),
+     "every": {"minutes": int(os.getenv("OVERDUE_SWEEP_INTERVAL_MIN", "60"))}},
+    {"name": "trust_snapshots", "fn": _trust_snapshots, "enabled": _on("TRUST_SNAPSHOT_ENABLED", "true"),
+     "every": {"hours": int(os.getenv("TRUST_SNAPSHOT_INTERVAL_H", "24"))}},
+    {"name": "repayment_reminders", "fn": _reminders, "enabled": _on("REMINDERS_ENABLED"),
+     "every": {"minutes": int(os.getenv("REMINDER_INTERVAL_MIN", "60"))}},
+    {"name": "cold_archival", "fn": _archival, "enabled": _on("ARCHIVE_ENABLED"),
+     "every": {"hours": 24}},
+    {"name": "contract_event_indexer", "fn": _contract_indexer, "enabled": _on("CONTRACT_INDEXER_ENABLED"),
+     "every": {"seconds": int(os.getenv("CONTRACT_INDEXER_INTERVAL_S", "30"))}},
+]
+
+
+def run_job(app, job: dict):
+    """Run one job inside an app context and record it in job_runs."""
+    from extensions import db
+    from jobs.models import JobRun
+
+    name = job["name"]
+    with app.app_context():
+        prev = db.session.query(db.func.max(JobRun.started_at)) \
+            .filter(JobRun.job_name == name, JobRun.status == "success").scalar()
+        now = datetime.utcnow()
+        run = JobRun(job_name=name, status="running", worker_id=WORKER_ID, started_at=now)
+        db.session.add(run)
+        db.session.commit()
+        run_id = run.id
+
+        t0 = time.perf_counter()
+        try:
+            result, status, error = job["fn"](prev, now), "success", None
+        except Exception:
+            db.session.rollback()
+            result, status, error = None, "failed", traceback.format_exc()[-4000:]
+            print(f"❌ Job {name} failed:\n{error}")
+        took = time.perf_counter() - t0
+
+        metrics.inc("job_runs_total", job=name, status=status)
+        metrics.observe("job_duration_seconds", took, job=name)
+        run = db.session.get(JobRun, run_id)
+        run.status = status
+        run.finished_at = datetime.utcnow()
+        run.duration_s = round(took, 3)
+        run.result = json.dumps(result, default=str)[:4000] if result is not None else None
+        run.error = error
+        db.session.commit()
+
+
+def prune_job_runs(app) -> int:
+    from extensions import db
+    from jobs.models import JobRun
+    with app.app_context():
+        cutoff = datetime.utcnow() - timedelta(days=JOB_RUN_KEEP_DAYS)
+        n = JobRun.query.filter(JobRun.started_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        return n
+
+
+def build_scheduler(app, threads: int | None = None):
+    """APScheduler with every enabled job; at most one instance of each job at a time."""
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.executors.pool import ThreadPoolExecutor
+
+    scheduler = BackgroundScheduler(
+        executors={"default": ThreadPoolExecutor(max(1, threads or WORKER_THREADS))},
+        job_defaults={"max_instances": 1, "coalesce": True, "misfire_grace_time": 60},
+    )
+    for job in JOBS:
+        if job["enabled"]:
+            scheduler.add_job(run_job, "interval", args=[app, job], id=job["name"],
+                              replace_existing=True, **job["every"])
+    return scheduler
+
+
+def enabled_jobs() -> list[str]:
+    return [j["name"] for j in JOBS if j["enabled"]]
@@ -0,0 +1,78 @@
+# jobs/tasks.py
+"""
+Periodic jobs that had no home before worker.py: overdue sweep and daily trust
+score snapshots. Both are set-based (one read, bulk inserts) and safe to re-run.
+"""
+from datetime import datetime, date, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from cooperative.models import GroupMembership, Loan, RepaymentSchedule, TrustScore, TrustScoreHistory
+from notifications.models import Notification
+
+
+def sweep_overdue(since: datetime | None = None, now: datetime | None = None) -> dict:
+    """
+    Installments that fell due in (since, now] and are still unpaid -> one warning
+    notification to the borrower and one summary per group to its admins.
+    `since` is the previous successful run, so every installment is announced once.
+    """
+    now = now or datetime.utcnow()
+    since = since or now - timedelta(days=1)
+    rows = (db.session.query(RepaymentSchedule.loan_id, RepaymentSchedule.installment_no,
+                             RepaymentSchedule.due_amount, Loan.user_id, Loan.group_id)
+            .join(Loan, RepaymentSchedule.loan_id == Loan.id)
+            .filter(RepaymentSchedule.status == "due",
+                    RepaymentSchedule.due_date > since,
+                    RepaymentSchedule.due_date <= now)
+            .all())
+    if not rows:
+        return {"overdue": 0, "groups": 0}
+
+    notes = [{"user_id": uid, "type": "warning", "is_read": False, "created_at": now,
+              "message": f"⚠️ Overdue installment #{n} for Loan {loan_id} ({float(amount):.2f} BHC)"}
+             for loan_id, n, amount, uid, _ in rows]
+    per_group = {}
+    for _, _, _, _, gid in rows:
+        per_group[gid] = per_group.get(gid, 0) + 1
+    admins = db.session.query(GroupMembership.group_id, GroupMembership.user_id) \
+        .filter(GroupMembership.group_id.in_(per_group.keys()), GroupMembership.role == "admin").all()
+    for gid, uid in admins:
+        notes.append({"user_id": uid, "type": "warning", "is_read": False, "created_at": now,
+                      "message": f"⚠️ {per_group[gid]} installment(s) went overdue in your group"})
+    db.session.execute(insert(Notification), notes)
+    db.session.commit()
+    return {"overdue": len(rows), "groups": len(per_group)}
+
+
+def snapshot_trust_scores(today: date | None = None) -> dict:
+    """Daily TrustScoreHistory row (reason DAILY_SNAPSHOT) for every TrustScore not snapshotted today."""
+    today = today or date.today()
+    H = TrustScoreHistory
+    reason = "DAILY_SNAPSHOT"
+
+    done = set(db.session.query(H.user_id, H.group_id)
+               .filter(H.reason == reason, H.snapshot_date == today).all())
+    latest_ids = db.session.query(db.func.max(H.id)).group_by(H.user_id, H.group_id).subquery()
+    prev = {(u, g): float(s) for u, g, s in
+            db.session.query(H.user_id, H.group_id, H.score_after).filter(H.id.in_(db.select(latest_ids))).all()}
+
+    now = datetime.utcnow()
+    rows = []
+    for uid, gid, score in db.session.query(TrustScore.user_id, TrustScore.group_id, TrustScore.score).all():
+        if (uid, gid) in done:
+            continue
+        score = round(float(score or 0), 2)
+        rows.append({"user_id": uid, "group_id": gid, "delta": round(score - prev.get((uid, gid), 0.0), 2),
+                     "score_after": score, "reason": reason, "created_at": now, "snapshot_date": today})
+    if not rows:
+        return {"snapshots": 0}
+    try:
+        db.session.execute(insert(TrustScoreHistory), rows)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()           # another run got there first today
+        return {"snapshots": 0, "raced": True}
+    return {"snapshots": len(rows)}
@@ -0,0 +1,133 @@
+# middleware/monitor.py
+"""
+Tiny in-process metrics registry (counters, gauges, latency histograms) with a
+Prometheus text renderer for /metrics. No external dependency on purpose.
+"""
+import threading
+from bisect import bisect_left
+
+# seconds; covers fast DB work up to slow Hedera consensus
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _key(labels: dict | None) -> tuple:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _fmt_labels(key: tuple, extra: dict | None = None) -> str:
+    items = list(key) + list((extra or {}).items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict] = {}
+        self._gauges: dict[str, dict] = {}
+        self._gauge_fns: dict[str, tuple] = {}
+        self._hists: dict[str, dict] = {}
+        self._help: dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            k = _key(labels)
+            series[k] = series.get(k, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges.setdefault(name, {})[_key(labels)] = value
+
+    def gauge_fn(self, name: str, fn, label: str = "status"):
+        """Gauge computed at scrape time, fn() -> number or {label_value: number}."""
+        self._gauge_fns[name] = (fn, label)
+
+    def observe(self, name: str, value: float, buckets=DEFAULT_BUCKETS, **labels):
+        with self._lock:
+            series = self._hists.setdefault(name, {})
+            k = _key(labels)
+            h = series.get(k)
+            if h is None:
+                h = series[k] = _Histogram(buckets)
+            h.observe(value)
+
+    # ---- export ----
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = {
+                "counters": {n: {str(dict(k)): v for k, v in s.items()} for n, s in self._counters.items()},
+                "gauges": {n: {str(dict(k)): v for k, v in s.items()} for n, s in self._gauges.items()},
+                "histograms": {
+                    n: {str(dict(k)): {"count": h.count, "sum": round(h.sum, 6),
+                                       "avg": round(h.sum / h.count, 6) if h.count else None}
+                        for k, h in s.items()}
+                    for n, s in self._hists.items()
+                },
+            }
+        for name, (fn, _label) in self._gauge_fns.items():
+            try:
+                out["gauges"][name] = fn()
+            except Exception as e:
+                out["gauges"][name] = f"error: {e}"
+        return out
+
+    def render_prometheus(self) -> str:
+        lines = []
+
+        def _head(name, kind):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for name, series in self._counters.items():
+                _head(name, "counter")
+                for k, v in series.items():
+                    lines.append(f"{name}{_fmt_labels(k)} {v}")
+            for name, series in self._gauges.items():
+                _head(name, "gauge")
+                for k, v in series.items():
+                    lines.append(f"{name}{_fmt_labels(k)} {v}")
+            for name, series in self._hists.items():
+                _head(name, "histogram")
+                for k, h in series.items():
+                    cum = 0
+                    for le, c in zip(list(h.buckets) + ["+Inf"], h.counts):
+                        cum += c
+                        lines.append(f"{name}_bucket{_fmt_labels(k, {'le': le})} {cum}")
+                    lines.append(f"{name}_sum{_fmt_labels(k)} {h.sum}")
+                    lines.append(f"{name}_count{_fmt_labels(k)} {h.count}")
+
+        for name, (fn, label) in self._gauge_fns.items():
+            try:
+                val = fn()
+            except Exception:
+                continue
+            _head(name, "gauge")
+            if isinstance(val, dict):
+                for lv, v in val.items():
+                    lines.append(f"{name}{_fmt_labels(((label, lv),))} {v}")
+            else:
+                lines.append(f"{name} {val}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
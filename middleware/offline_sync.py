@@ -1,57 +1,288 @@
 # middleware/offline_sync.py
-import time
-from datetime import datetime
+"""
+Outbox retry: transfers that went through on-chain but whose DB write failed
+(finance /transfer saves them to outbox_transfers) get their TransactionHistory
+row written here.
+
+- Workers claim due rows in batches (status 'sending' + lease_expires_at +
+  claimed_by token), so several processes / OUTBOX_WORKERS threads can drain
+  the table without stepping on each other; a crashed worker's lease expires
+  and the rows are picked up again.
+- One IN query per batch checks which tx ids are already in
+  transaction_history (indexed), the rest are bulk-inserted.
+- Every try leaves an OutboxAttempt row; failures back off exponentially
+  (next_attempt_at) instead of being retried every minute, and after
+  OUTBOX_MAX_ATTEMPTS the row goes to the dead-letter state ('dead') that the
+  claim query never scans. Operators list / requeue / cancel those through
+  /api/super-admin/outbox (requeue_rows, cancel_rows, outbox_summary below).
+"""
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from sqlalchemy import and_, insert, or_, update
+
 from extensions import db
-from finance.models import OutboxTransfer, TransactionHistory
-import json
+from finance.models import OutboxTransfer, OutboxAttempt, TransactionHistory
+from middleware.monitor import metrics
+
+OUTBOX_BATCH = int(os.getenv("OUTBOX_BATCH", "100"))                   # rows claimed per batch
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "1"))                 # claim loops per run (>1 makes sense on Postgres)
+OUTBOX_LEASE_S = int(os.getenv("OUTBOX_LEASE_S", "120"))
+OUTBOX_BACKOFF_S = float(os.getenv("OUTBOX_BACKOFF_S", "30"))
+OUTBOX_BACKOFF_MAX_S = float(os.getenv("OUTBOX_BACKOFF_MAX_S", "3600"))
+OUTBOX_MAX_BATCHES = int(os.getenv("OUTBOX_MAX_BATCHES", "50"))       # per worker per run
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))       # then -> 'dead'
+OUTBOX_RATE_WINDOW_S = int(os.getenv("OUTBOX_RATE_WINDOW_S", "3600"))  # retry-rate window for the summary
+
+REQUEUEABLE = ("dead", "failed", "cancelled")
+CANCELLABLE = ("pending", "dead", "failed")
+
+metrics.describe("outbox_processed_total", "Outbox rows processed by result (recorded | already | retry | dead)")
+metrics.describe("outbox_rows", "outbox_transfers rows by status")
+metrics.describe("outbox_oldest_pending_seconds", "Age of the oldest pending outbox row")
+metrics.describe("outbox_retry_rate", "Failed / total outbox attempts over OUTBOX_RATE_WINDOW_S")
+
+
+def _backoff(attempts: int) -> float:
+    delay = min(OUTBOX_BACKOFF_S * (2 ** max(attempts - 1, 0)), OUTBOX_BACKOFF_MAX_S)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _due(now: datetime):
+    O = OutboxTransfer
+    return or_(
+        and_(O.status == "pending", or_(O.next_attempt_at.is_(None), O.next_attempt_at <= now)),
+        and_(O.status == "sending", O.lease_expires_at < now),        # lease of a dead worker
+    )
+
+
+def _claim(token: str) -> list[OutboxTransfer]:
+    O = OutboxTransfer
+    now = datetime.utcnow()
+    ids = [i for (i,) in db.session.query(O.id).filter(_due(now)).order_by(O.id)
+           .limit(OUTBOX_BATCH).with_for_update(skip_locked=True).all()]
+    if not ids:
+        db.session.rollback()
+        return []
+    # conditional UPDATE: on SQLite (no SKIP LOCKED) a row another worker just took no longer matches
+    db.session.execute(
+        update(O).where(O.id.in_(ids), _due(now))
+        .values(status="sending", claimed_by=token, lease_expires_at=now + timedelta(seconds=OUTBOX_LEASE_S))
+        .execution_options(synchronize_session=False))
+    db.session.commit()
+    return O.query.filter(O.claimed_by == token, O.status == "sending").order_by(O.id).all()
+
+
+def _history(row: OutboxTransfer, now: datetime) -> dict:
+    return {
+        "sender_id": row.sender_id,
+        "recipient_id": row.recipient_id,
+        "tx_type": "transfer",
+        "asset_type": row.asset_type,
+        "token_id": row.token_id,
+        "amount": row.amount,
+        "description": row.purpose or f"Recovered {row.asset_type} transfer",
+        "from_account": None,
+        "to_account": None,
+        "hedera_tx_id": row.hedera_tx_id,
+        "hedera_path": row.hedera_path,
+        "meta": row.meta,
+        "timestamp": now,
+    }
+
+
+def _process_batch(rows: list[OutboxTransfer]) -> dict:
+    now = datetime.utcnow()
+    # plain snapshots: the ORM rows are expired if we have to roll back below
+    items = [{"id": r.id, "tx": r.hedera_tx_id, "attempts": r.attempts or 0, "history": _history(r, now)}
+             for r in rows]
+
+    tx_ids = {it["tx"] for it in items if it["tx"]}
+    known = set()
+    if tx_ids:
+        known = {tx for (tx,) in db.session.query(TransactionHistory.hedera_tx_id)
+                 .filter(TransactionHistory.hedera_tx_id.in_(tx_ids)).all()}
+    new, already = [], []
+    for it in items:
+        if it["tx"] and it["tx"] in known:
+            already.append(it)
+        else:
+            new.append(it)
+            if it["tx"]:
+                known.add(it["tx"])               # same tx twice in the outbox: record once
+
+    failed = []
+    try:
+        if new:
+            db.session.execute(insert(TransactionHistory), [it["history"] for it in new])
+        _finish(new, already, failed, now)
+        db.session.commit()
+    except Exception:
+        # one bad row (e.g. missing recipient) must not hold the batch back: redo row by row
+        db.session.rollback()
+        recorded = []
+        for it in new:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(TransactionHistory), [it["history"]])
+                recorded.append(it)
+            except Exception as e:
+                failed.append((it, e))
+        new = recorded
+        _finish(new, already, failed, now)
+        db.session.commit()
+
+    dead = sum(1 for it, _ in failed if it["attempts"] + 1 >= OUTBOX_MAX_ATTEMPTS)
+    for it, e in failed:
+        print(f"⚠️ Retry failed for tx {it['tx']}: {e}")
+    if new or already:
+        print(f"✅ Outbox: {len(new)} restored to DB, {len(already)} already recorded")
+    metrics.inc("outbox_processed_total", len(new), result="recorded")
+    metrics.inc("outbox_processed_total", len(already), result="already")
+    metrics.inc("outbox_processed_total", len(failed) - dead, result="retry")
+    metrics.inc("outbox_processed_total", dead, result="dead")
+    return {"recorded": len(new), "already": len(already), "failed": len(failed)}
+
+
+def _finish(recorded: list, already: list, failed: list, now: datetime):
+    changes, attempts = [], []
+    for it, note in [(it, "recorded") for it in recorded] + [(it, "already recorded") for it in already]:
+        changes.append({"id": it["id"], "status": "done", "attempts": it["attempts"] + 1, "last_error": None,
+                        "next_attempt_at": None, "lease_expires_at": None, "claimed_by": None, "updated_at": now})
+        attempts.append({"outbox_id": it["id"], "attempt_at": now, "success": True,
+                         "hedera_tx_id": it["tx"], "response": note, "error": None})
+    for it, e in failed:
+        n = it["attempts"] + 1
+        dead = n >= OUTBOX_MAX_ATTEMPTS
+        changes.append({"id": it["id"], "status": "dead" if dead else "pending", "attempts": n,
+                        "last_error": str(e)[:2000],
+                        "next_attempt_at": None if dead else now + timedelta(seconds=_backoff(n)),
+                        "lease_expires_at": None, "claimed_by": None, "updated_at": now})
+        if dead:
+            print(f"❌ Outbox row {it['id']} moved to dead-letter after {n} attempts")
+        attempts.append({"outbox_id": it["id"], "attempt_at": now, "success": False,
+                         "hedera_tx_id": it["tx"], "response": None, "error": str(e)[:2000]})
+    if changes:
+        db.session.execute(update(OutboxTransfer), changes)
+        db.session.execute(insert(OutboxAttempt), attempts)
 
-def process_outbox():
+
+def _drain(worker: str) -> dict:
+    totals = {"batches": 0, "recorded": 0, "already": 0, "failed": 0}
+    while totals["batches"] < OUTBOX_MAX_BATCHES:
+        rows = _claim(f"{worker}:{uuid.uuid4().hex[:8]}")
+        if not rows:
+            break
+        res = _process_batch(rows)
+        totals["batches"] += 1
+        for k, v in res.items():
+            totals[k] += v
+        if len(rows) < OUTBOX_BATCH:
+            break
+    return totals
+
+
+def process_outbox(workers: int | None = None) -> dict:
     """
-    Retry pending on-chain transfers that failed DB write earlier.
+    Record due outbox transfers in TransactionHistory. Needs an app context.
+    Returns {"batches", "recorded", "already", "failed"}.
     """
     print("🔄 Outbox retry started...")
-    pending = OutboxTransfer.query.filter_by(status="pending").all()
-
-    for row in pending:
-        try:
-            # Check if already exists (idempotent)
-            exists = TransactionHistory.query.filter_by(hedera_tx_id=row.hedera_tx_id).first()
-            if exists:
-                print(f"⏭️ Already recorded in TransactionHistory: {row.hedera_tx_id}")
-                row.status = "done"
-                db.session.commit()
-                continue
-
-            # Reconstruct minimal record
-            txn = TransactionHistory(
-                sender_id=row.sender_id,
-                recipient_id=row.recipient_id,
-                tx_type="transfer",
-                asset_type=row.asset_type,
-                token_id=row.token_id,
-                amount=row.amount,
-                description=row.purpose or f"Recovered {row.asset_type} transfer",
-                from_account=None,
-                to_account=None,
-                hedera_tx_id=row.hedera_tx_id,
-                hedera_path=row.hedera_path,
-                meta=row.meta,
-                timestamp=datetime.utcnow(),
-            )
-
-            db.session.add(txn)
-            row.status = "done"
-            row.updated_at = datetime.utcnow()
-            db.session.commit()
-
-            print(f"✅ Outbox transfer restored to DB: {row.hedera_tx_id}")
-
-        except Exception as e:
-            db.session.rollback()
-            row.attempts = (row.attempts or 0) + 1
-            row.last_error = str(e)
-            row.updated_at = datetime.utcnow()
-            db.session.commit()
-            print(f"⚠️ Retry failed for tx {row.hedera_tx_id}: {e}")
-
-    print("✅ Outbox retry finished.")
+    worker = f"{socket.gethostname()[:32]}:{os.getpid()}"
+    workers = max(1, workers or OUTBOX_WORKERS)
+    if workers == 1:
+        totals = _drain(worker)
+    else:
+        app = current_app._get_current_object()
+
+        def _run(i):
+            with app.app_context():
+                return _drain(f"{worker}:{i}")
+
+        totals = {"batches": 0, "recorded": 0, "already": 0, "failed": 0}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="outbox") as pool:
+            for res in pool.map(_run, range(workers)):
+                for k, v in res.items():
+                    totals[k] += v
+    print(f"✅ Outbox retry finished: {totals}")
+    return totals
+
+
+# ---------------- operator tooling ----------------
+def requeue_rows(ids: list[int] | None = None, status: str | None = None) -> int:
+    """
+    Dead / failed / cancelled rows (by id, or every row in `status`) back to pending,
+    due now, attempt counter reset (history stays in outbox_attempts). Returns rows moved.
+    """
+    O = OutboxTransfer
+    q = update(O).where(O.status.in_(REQUEUEABLE))
+    if ids:
+        q = q.where(O.id.in_(ids))
+    elif status in REQUEUEABLE:
+        q = q.where(O.status == status)
+    else:
+        return 0
+    n = db.session.execute(
+        q.values(status="pending", attempts=0, next_attempt_at=None, lease_expires_at=None,
+                 claimed_by=None, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)).rowcount
+    db.session.commit()
+    return n
+
+
+def cancel_rows(ids: list[int]) -> int:
+    """Pending / dead / failed rows -> 'cancelled' (never retried again). Returns rows changed."""
+    if not ids:
+        return 0
+    O = OutboxTransfer
+    n = db.session.execute(
+        update(O).where(O.id.in_(ids), O.status.in_(CANCELLABLE))
+        .values(status="cancelled", next_attempt_at=None, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)).rowcount
+    db.session.commit()
+    return n
+
+
+def _status_counts() -> dict:
+    rows = db.session.query(OutboxTransfer.status, db.func.count(OutboxTransfer.id)) \
+        .group_by(OutboxTransfer.status).all()
+    out = {"pending": 0, "sending": 0, "done": 0, "dead": 0}
+    out.update({s: n for s, n in rows})
+    return out
+
+
+def _oldest_pending_seconds(now: datetime) -> float:
+    oldest = db.session.query(db.func.min(OutboxTransfer.created_at)) \
+        .filter(OutboxTransfer.status.in_(("pending", "sending"))).scalar()
+    return round((now - oldest).total_seconds(), 1) if oldest else 0.0
+
+
+def _retry_rate(now: datetime) -> dict:
+    since = now - timedelta(seconds=OUTBOX_RATE_WINDOW_S)
+    total, failed = db.session.query(
+        db.func.count(OutboxAttempt.id),
+        db.func.sum(db.case((OutboxAttempt.success.is_(False), 1), else_=0)),
+    ).filter(OutboxAttempt.attempt_at >= since).one()
+    total, failed = total or 0, failed or 0
+    return {"attempts": total, "failed": failed, "rate": round(failed / total, 4) if total else 0.0}
+
+
+def outbox_summary() -> dict:
+    """Counts by status, oldest pending age and recent retry rate. Needs an app context."""
+    now = datetime.utcnow()
+    return {"by_status": _status_counts(),
+            "oldest_pending_seconds": _oldest_pending_seconds(now),
+            "retry_window_s": OUTBOX_RATE_WINDOW_S,
+            "retries": _retry_rate(now),
+            "max_attempts": OUTBOX_MAX_ATTEMPTS}
+
+
+# scrape-time gauges (/metrics runs inside a request, so the DB is reachable)
+metrics.gauge_fn("outbox_rows", _status_counts)
+metrics.gauge_fn("outbox_oldest_pending_seconds", lambda: _oldest_pending_seconds(datetime.utcnow()))
+metrics.gauge_fn("outbox_retry_rate", lambda: _retry_rate(datetime.utcnow())["rate"])
@@ -0,0 +1,46 @@
+"""add archive_checkpoints table
+
+Revision ID: 7c1e4b9a2d10
+Revises: 5856990c3664
+Create Date: 2025-10-20 10:12:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e4b9a2d10'
+down_revision = '5856990c3664'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'archive_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('period', sa.String(length=7), nullable=False),
+        sa.Column('group_id', sa.Integer(), nullable=True),
+        sa.Column('kind', sa.String(length=80), nullable=True),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('amount_sum', sa.Numeric(18, 2), nullable=True),
+        sa.Column('min_id', sa.Integer(), nullable=True),
+        sa.Column('max_id', sa.Integer(), nullable=True),
+        sa.Column('first_at', sa.DateTime(), nullable=True),
+        sa.Column('last_at', sa.DateTime(), nullable=True),
+        sa.Column('file_path', sa.String(length=255), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_archive_checkpoints_group_id', 'archive_checkpoints', ['group_id'], unique=False)
+    op.create_index('ix_archive_cp_table_group_period', 'archive_checkpoints',
+                    ['table_name', 'group_id', 'period'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_archive_cp_table_group_period', table_name='archive_checkpoints')
+    op.drop_index('ix_archive_checkpoints_group_id', table_name='archive_checkpoints')
+    op.drop_table('archive_checkpoints')
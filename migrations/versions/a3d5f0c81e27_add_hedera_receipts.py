@@ -0,0 +1,41 @@
+"""add hedera_receipts table
+
+Revision ID: a3d5f0c81e27
+Revises: 7c1e4b9a2d10
+Create Date: 2025-10-21 09:40:17.552031
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d5f0c81e27'
+down_revision = '7c1e4b9a2d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'hedera_receipts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tx_id', sa.String(length=255), nullable=False),
+        sa.Column('kind', sa.String(length=32), nullable=False),
+        sa.Column('status', sa.String(length=64), nullable=False),
+        sa.Column('ref_table', sa.String(length=64), nullable=True),
+        sa.Column('ref_id', sa.Integer(), nullable=True),
+        sa.Column('sequence_no', sa.BigInteger(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('submitted_at', sa.DateTime(), nullable=False),
+        sa.Column('resolved_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tx_id')
+    )
+    op.create_index('ix_hedera_receipts_status', 'hedera_receipts', ['status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_hedera_receipts_status', table_name='hedera_receipts')
+    op.drop_table('hedera_receipts')
@@ -0,0 +1,52 @@
+"""add reminder_schedules table
+
+Revision ID: a7d2e4f9c013
+Revises: f1c6d2e8b934
+Create Date: 2025-10-25 09:31:07.512304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d2e4f9c013'
+down_revision = 'f1c6d2e8b934'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'reminder_schedules',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('source', sa.String(length=16), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=False),
+        sa.Column('loan_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('due_date', sa.DateTime(), nullable=False),
+        sa.Column('remind_at', sa.DateTime(), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=18, scale=2), nullable=True),
+        sa.Column('job_name', sa.String(length=100), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('notified_at', sa.DateTime(), nullable=True),
+        sa.Column('schedule_status', sa.String(length=16), nullable=False),
+        sa.Column('schedule_id', sa.String(length=64), nullable=True),
+        sa.Column('schedule_attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('source', 'source_id', 'due_date', name='uq_reminder_source_due')
+    )
+    op.create_index('ix_reminder_schedules_user_id', 'reminder_schedules', ['user_id'], unique=False)
+    op.create_index('ix_reminder_schedules_status_remind_at', 'reminder_schedules', ['status', 'remind_at'], unique=False)
+    op.create_index('ix_reminder_schedules_schedule_status', 'reminder_schedules', ['schedule_status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_reminder_schedules_schedule_status', table_name='reminder_schedules')
+    op.drop_index('ix_reminder_schedules_status_remind_at', table_name='reminder_schedules')
+    op.drop_index('ix_reminder_schedules_user_id', table_name='reminder_schedules')
+    op.drop_table('reminder_schedules')
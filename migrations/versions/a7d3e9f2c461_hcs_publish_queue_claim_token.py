@@ -0,0 +1,26 @@
+"""hcs_publish_queue.claimed_by (conditional claims)
+
+Revision ID: a7d3e9f2c461
+Revises: f3c8a2d5b147
+Create Date: 2025-10-28 11:05:17.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9f2c461'
+down_revision = 'f3c8a2d5b147'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('hcs_publish_queue', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('claimed_by', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('hcs_publish_queue', schema=None) as batch_op:
+        batch_op.drop_column('claimed_by')
@@ -0,0 +1,62 @@
+"""add block_number / log_index / user_id to contract_event_logs
+
+Revision ID: b3e9c5a1d274
+Revises: a7d2e4f9c013
+Create Date: 2025-10-25 14:02:55.108733
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e9c5a1d274'
+down_revision = 'a7d2e4f9c013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('contract_event_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('block_number', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('log_index', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_contract_event_logs_block_number'), ['block_number'], unique=False)
+
+    # backfill user_id from the decoded args of already indexed events
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, payload FROM contract_event_logs WHERE payload IS NOT NULL AND user_id IS NULL")).fetchall()
+    for row_id, payload in rows:
+        try:
+            uid = json.loads(payload).get("user_id")
+            uid = int(uid) if uid is not None else None
+        except (ValueError, TypeError, AttributeError):
+            continue
+        if uid is not None:
+            bind.execute(sa.text("UPDATE contract_event_logs SET user_id = :u WHERE id = :i"), {"u": uid, "i": row_id})
+
+    # one row per log: drop duplicates an overlapping indexer run may have left, keep the first
+    op.execute("""
+        DELETE FROM contract_event_logs
+        WHERE log_index IS NOT NULL AND id NOT IN (
+          SELECT MIN(id) FROM contract_event_logs
+          WHERE log_index IS NOT NULL
+          GROUP BY contract_id, tx_hash, log_index
+        );
+    """)
+    with op.batch_alter_table('contract_event_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_contract_event_logs_user_event', ['user_id', 'event_name'], unique=False)
+        batch_op.create_unique_constraint('uq_contract_event_log', ['contract_id', 'tx_hash', 'log_index'])
+
+
+def downgrade():
+    with op.batch_alter_table('contract_event_logs', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_contract_event_log', type_='unique')
+        batch_op.drop_index('ix_contract_event_logs_user_event')
+        batch_op.drop_index(batch_op.f('ix_contract_event_logs_block_number'))
+        batch_op.drop_column('user_id')
+        batch_op.drop_column('log_index')
+        batch_op.drop_column('block_number')
@@ -0,0 +1,36 @@
+"""add mirror_cursors table
+
+Revision ID: b81e6c2f4a93
+Revises: a3d5f0c81e27
+Create Date: 2025-10-21 15:02:48.117390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81e6c2f4a93'
+down_revision = 'a3d5f0c81e27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'mirror_cursors',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=32), nullable=False),
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('last_timestamp', sa.String(length=32), nullable=True),
+        sa.Column('last_sequence', sa.BigInteger(), nullable=True),
+        sa.Column('records_synced', sa.Integer(), nullable=False),
+        sa.Column('last_synced_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('kind', 'key', name='uq_mirror_cursor_kind_key')
+    )
+
+
+def downgrade():
+    op.drop_table('mirror_cursors')
@@ -0,0 +1,61 @@
+"""add hcs_batches and hcs_event_proofs tables
+
+Revision ID: c4f7a1d9e352
+Revises: b81e6c2f4a93
+Create Date: 2025-10-22 10:41:09.552871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f7a1d9e352'
+down_revision = 'b81e6c2f4a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'hcs_batches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('batch_id', sa.String(length=32), nullable=False),
+        sa.Column('part_no', sa.Integer(), nullable=False),
+        sa.Column('part_count', sa.Integer(), nullable=False),
+        sa.Column('merkle_root', sa.String(length=64), nullable=False),
+        sa.Column('entry_count', sa.Integer(), nullable=False),
+        sa.Column('topic_id', sa.String(length=64), nullable=True),
+        sa.Column('tx_id', sa.String(length=255), nullable=True),
+        sa.Column('sequence_no', sa.BigInteger(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_hcs_batches_batch_id', 'hcs_batches', ['batch_id'])
+    op.create_index('ix_hcs_batches_tx_id', 'hcs_batches', ['tx_id'])
+
+    op.create_table(
+        'hcs_event_proofs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('batch_id', sa.String(length=32), nullable=False),
+        sa.Column('leaf_index', sa.Integer(), nullable=False),
+        sa.Column('part_no', sa.Integer(), nullable=False),
+        sa.Column('event_hash', sa.String(length=64), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('proof', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_hcs_event_proofs_batch_id', 'hcs_event_proofs', ['batch_id'])
+    op.create_index('ix_hcs_event_proofs_event_hash', 'hcs_event_proofs', ['event_hash'])
+
+
+def downgrade():
+    op.drop_index('ix_hcs_event_proofs_event_hash', table_name='hcs_event_proofs')
+    op.drop_index('ix_hcs_event_proofs_batch_id', table_name='hcs_event_proofs')
+    op.drop_table('hcs_event_proofs')
+    op.drop_index('ix_hcs_batches_tx_id', table_name='hcs_batches')
+    op.drop_index('ix_hcs_batches_batch_id', table_name='hcs_batches')
+    op.drop_table('hcs_batches')
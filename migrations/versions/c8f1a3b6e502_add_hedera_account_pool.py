@@ -0,0 +1,40 @@
+"""add hedera_account_pool table
+
+Revision ID: c8f1a3b6e502
+Revises: b3e9c5a1d274
+Create Date: 2025-10-26 11:47:19.604218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8f1a3b6e502'
+down_revision = 'b3e9c5a1d274'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'hedera_account_pool',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('account_id', sa.String(length=64), nullable=False),
+        sa.Column('private_key', sa.String(), nullable=False),
+        sa.Column('public_key', sa.String(), nullable=True),
+        sa.Column('initial_balance_hbar', sa.Numeric(precision=18, scale=8), nullable=True),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('claimed_by_user_id', sa.Integer(), nullable=True),
+        sa.Column('claimed_for', sa.String(length=32), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('account_id')
+    )
+    op.create_index('ix_hedera_account_pool_status', 'hedera_account_pool', ['status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_hedera_account_pool_status', table_name='hedera_account_pool')
+    op.drop_table('hedera_account_pool')
@@ -0,0 +1,41 @@
+"""add hcs_publish_queue table
+
+Revision ID: d2a9e6b0f418
+Revises: c4f7a1d9e352
+Create Date: 2025-10-22 16:18:37.204615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a9e6b0f418'
+down_revision = 'c4f7a1d9e352'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'hcs_publish_queue',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('source', sa.String(length=32), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('tx_id', sa.String(length=255), nullable=True),
+        sa.Column('event_hash', sa.String(length=64), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('published_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_hcs_publish_queue_status_next', 'hcs_publish_queue', ['status', 'next_attempt_at'])
+
+
+def downgrade():
+    op.drop_index('ix_hcs_publish_queue_status_next', table_name='hcs_publish_queue')
+    op.drop_table('hcs_publish_queue')
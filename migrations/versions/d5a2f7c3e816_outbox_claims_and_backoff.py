@@ -0,0 +1,44 @@
+"""outbox claims + backoff, index transaction_history.hedera_tx_id
+
+Revision ID: d5a2f7c3e816
+Revises: c8f1a3b6e502
+Create Date: 2025-10-26 16:20:41.337905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a2f7c3e816'
+down_revision = 'c8f1a3b6e502'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('outbox_transfers', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('claimed_by', sa.String(length=64), nullable=True))
+        batch_op.create_index('ix_outbox_transfers_status_next', ['status', 'next_attempt_at'], unique=False)
+
+    with op.batch_alter_table('outbox_attempts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_outbox_attempts_outbox_id'), ['outbox_id'], unique=False)
+
+    with op.batch_alter_table('transaction_history', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_transaction_history_hedera_tx_id'), ['hedera_tx_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transaction_history', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_transaction_history_hedera_tx_id'))
+
+    with op.batch_alter_table('outbox_attempts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_outbox_attempts_outbox_id'))
+
+    with op.batch_alter_table('outbox_transfers', schema=None) as batch_op:
+        batch_op.drop_index('ix_outbox_transfers_status_next')
+        batch_op.drop_column('claimed_by')
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('next_attempt_at')
@@ -0,0 +1,36 @@
+"""add token_account_status table
+
+Revision ID: e5b3c8d1a7f6
+Revises: d2a9e6b0f418
+Create Date: 2025-10-23 11:05:52.630194
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b3c8d1a7f6'
+down_revision = 'd2a9e6b0f418'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'token_account_status',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('account_id', sa.String(length=64), nullable=False),
+        sa.Column('token_id', sa.String(length=64), nullable=False),
+        sa.Column('associated', sa.Boolean(), nullable=False),
+        sa.Column('kyc_granted', sa.Boolean(), nullable=False),
+        sa.Column('source', sa.String(length=16), nullable=False),
+        sa.Column('mirror_checked_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('account_id', 'token_id', name='uq_token_account_status')
+    )
+
+
+def downgrade():
+    op.drop_table('token_account_status')
@@ -0,0 +1,37 @@
+"""add offline_applied_ops table
+
+Revision ID: e9b4c1d7a305
+Revises: d5a2f7c3e816
+Create Date: 2025-10-27 10:12:08.551240
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9b4c1d7a305'
+down_revision = 'd5a2f7c3e816'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'offline_applied_ops',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('client_id', sa.String(length=64), nullable=False),
+        sa.Column('op_type', sa.String(length=20), nullable=False),
+        sa.Column('ref_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('agent_id', sa.Integer(), nullable=True),
+        sa.Column('applied_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['agent_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('client_id')
+    )
+
+
+def downgrade():
+    op.drop_table('offline_applied_ops')
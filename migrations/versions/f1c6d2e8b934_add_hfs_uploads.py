@@ -0,0 +1,44 @@
+"""add hfs_uploads table
+
+Revision ID: f1c6d2e8b934
+Revises: e5b3c8d1a7f6
+Create Date: 2025-10-24 10:12:41.381027
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c6d2e8b934'
+down_revision = 'e5b3c8d1a7f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'hfs_uploads',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('upload_id', sa.String(length=32), nullable=False),
+        sa.Column('file_path', sa.String(length=512), nullable=False),
+        sa.Column('file_size', sa.BigInteger(), nullable=False),
+        sa.Column('file_mtime', sa.Float(), nullable=True),
+        sa.Column('chunk_size', sa.Integer(), nullable=False),
+        sa.Column('file_id', sa.String(length=64), nullable=True),
+        sa.Column('bytes_done', sa.BigInteger(), nullable=False),
+        sa.Column('chunks_done', sa.Integer(), nullable=False),
+        sa.Column('file_hash', sa.String(length=64), nullable=True),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('upload_id')
+    )
+    op.create_index('ix_hfs_uploads_status', 'hfs_uploads', ['status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_hfs_uploads_status', table_name='hfs_uploads')
+    op.drop_table('hfs_uploads')
@@ -0,0 +1,48 @@
+"""add job_runs and worker_leases tables
+
+Revision ID: f3c8a2d5b147
+Revises: e9b4c1d7a305
+Create Date: 2025-10-27 15:40:22.918364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8a2d5b147'
+down_revision = 'e9b4c1d7a305'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'job_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_name', sa.String(length=64), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('worker_id', sa.String(length=96), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('duration_s', sa.Float(), nullable=True),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_job_runs_name_started', 'job_runs', ['job_name', 'started_at'], unique=False)
+
+    op.create_table(
+        'worker_leases',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('holder', sa.String(length=96), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('acquired_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('worker_leases')
+    op.drop_index('ix_job_runs_name_started', table_name='job_runs')
+    op.drop_table('job_runs')
@@ -0,0 +1,407 @@
+# offline_sync/apply_engine.py
+"""
+Bulk apply engine for offline-captured operations (/api/sync/sync).
+
+    ops = [{"type": "deposit", "client_id": "...", "user_id": 7, "slug": "kisan-coop",
+            "amount": 250, "created_at": "2025-10-27T08:15:00Z"}, ...]
+    results = apply_operations(ops, agent_id)
+
+Types: deposit (agent-collected cash -> pending DepositRequest for admin approval),
+vote (only the member's own vote), loan_request, complaint.
+Everything a type needs (groups, users, memberships, balances, voting sessions,
+existing votes, already-applied client_ids) is loaded with a handful of IN
+queries; each type is then written in ONE transaction with bulk INSERT/UPDATEs.
+Within a type, ops run in (created_at, client_id) order, so conflicts resolve
+the same way on every replay:
+  - client_id seen before          -> "duplicate" (re-sync after a lost ack)
+  - second vote by the same member -> "conflict", earliest vote kept
+Results come back one per input op, in input order:
+  {"index", "client_id", "type", "status": applied|duplicate|conflict|rejected|error, "id"?, "reason"?}
+"error" means the type's transaction failed and the op can be retried.
+"""
+import os
+import json
+import hashlib
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from extensions import db
+from users.models import User
+from complaints.models import Complaint
+from notifications.models import Notification
+from finance.models import DepositRequest
+from cooperative.models import (
+    CooperativeGroup, GroupMembership, LoanRequest, VotingSession, VoteDetail,
+)
+from offline_sync.models import AppliedOfflineOp
+
+OFFLINE_APPLY_MAX_OPS = int(os.getenv("OFFLINE_APPLY_MAX_OPS", "2000"))    # per sync call
+
+OP_TYPES = {"deposit": "deposit", "deposit_request": "deposit", "vote": "vote",
+            "loan_request": "loan_request", "loan": "loan_request", "complaint": "complaint"}
+STAFF_ROLES = ("super-admin", "bank-admin")
+_ORDER = ("complaint", "loan_request", "deposit", "vote")
+
+
+def _result(it, status, **extra) -> dict:
+    return {"index": it["index"], "client_id": it["client_id"], "type": it["type"], "status": status, **extra}
+
+
+def _parse_ts(value) -> datetime:
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+        except ValueError:
+            pass
+    return datetime.max                      # undated ops go last, then by client_id
+
+
+def _normalize(ops: list, agent_id: int, results: list) -> list[dict]:
+    items = []
+    for i, op in enumerate(ops):
+        if not isinstance(op, dict):
+            results[i] = {"index": i, "client_id": None, "type": None, "status": "rejected",
+                          "reason": "operation must be an object"}
+            continue
+        kind = OP_TYPES.get(str(op.get("type") or "").lower())
+        # no client_id from the device: a content hash keeps replays of the same op idempotent
+        client_id = str(op.get("client_id") or "")[:64] or \
+            "h:" + hashlib.sha256(json.dumps(op, sort_keys=True, default=str).encode()).hexdigest()[:40]
+        it = {"index": i, "type": kind, "client_id": client_id, "data": op,
+              "created_at": _parse_ts(op.get("created_at"))}
+        if kind is None:
+            results[i] = _result(it, "rejected", reason=f"unknown type {op.get('type')!r}")
+            continue
+        try:
+            it["user_id"] = int(op.get("user_id") or agent_id)
+            it["group_id"] = int(op["group_id"]) if op.get("group_id") else None
+        except (TypeError, ValueError):
+            results[i] = _result(it, "rejected", reason="invalid user_id / group_id")
+            continue
+        it["slug"] = op.get("slug")
+        items.append(it)
+    return items
+
+
+def _dedupe(items: list, results: list) -> list[dict]:
+    ids = {it["client_id"] for it in items}
+    done = {}
+    if ids:
+        done = dict(db.session.query(AppliedOfflineOp.client_id, AppliedOfflineOp.ref_id)
+                    .filter(AppliedOfflineOp.client_id.in_(ids)).all())
+    out, seen = [], set()
+    for it in items:
+        if it["client_id"] in done:
+            results[it["index"]] = _result(it, "duplicate", id=done[it["client_id"]], reason="already applied")
+        elif it["client_id"] in seen:
+            results[it["index"]] = _result(it, "duplicate", reason="same client_id earlier in this batch")
+        else:
+            seen.add(it["client_id"])
+            out.append(it)
+    return out
+
+
+class _Context:
+    """Everything the validators need, loaded in bulk."""
+
+    def __init__(self, items: list, agent_id: int):
+        self.agent_id = agent_id
+        self.now = datetime.utcnow()
+        self.notes = []                                  # (user_ids, message, type) sent after commit
+
+        slugs = {it["slug"] for it in items if it["slug"] and not it["group_id"]}
+        gids = {it["group_id"] for it in items if it["group_id"]}
+        lr_ids = set()
+        for it in items:
+            if it["type"] == "vote":
+                try:
+                    lr_ids.add(int(it["data"].get("loan_request_id")))
+                except (TypeError, ValueError):
+                    pass
+
+        self.sessions = {}
+        if lr_ids:
+            self.sessions = {s.loan_request_id: s for s in
+                             VotingSession.query.filter(VotingSession.loan_request_id.in_(lr_ids)).all()}
+            gids |= {s.group_id for s in self.sessions.values()}
+
+        q = CooperativeGroup.query
+        groups = q.filter(db.or_(CooperativeGroup.id.in_(gids), CooperativeGroup.slug.in_(slugs))).all() \
+            if gids or slugs else []
+        self.groups = {g.id: g for g in groups}
+        by_slug = {g.slug: g.id for g in groups}
+        for it in items:
+            if not it["group_id"] and it["slug"]:
+                it["group_id"] = by_slug.get(it["slug"])
+
+        uids = {it["user_id"] for it in items} | {agent_id}
+        self.users = {u.id: u for u in User.query.filter(User.id.in_(uids)).all()}
+        self.roles = {}
+        if self.groups:
+            rows = db.session.query(GroupMembership.group_id, GroupMembership.user_id, GroupMembership.role) \
+                .filter(GroupMembership.group_id.in_(self.groups.keys()), GroupMembership.user_id.in_(uids)).all()
+            self.roles = {(g, u): r or "member" for g, u, r in rows}
+
+    def is_member(self, gid, uid) -> bool:
+        return (gid, uid) in self.roles
+
+    def may_act_for(self, uid, gid=None) -> bool:
+        """The syncing agent may submit for itself, as staff, or as admin of the op's group."""
+        if uid == self.agent_id:
+            return True
+        agent = self.users.get(self.agent_id)
+        if agent and agent.role in STAFF_ROLES:
+            return True
+        return gid is not None and self.roles.get((gid, self.agent_id)) == "admin"
+
+    def check_member_op(self, it, need_kyc=True) -> str | None:
+        gid, uid = it["group_id"], it["user_id"]
+        if gid not in self.groups:
+            return "group not found"
+        user = self.users.get(uid)
+        if not user:
+            return "user not found"
+        if not self.is_member(gid, uid):
+            return "not a group member"
+        if need_kyc and user.kyc_status != "verified":
+            return "KYC required"
+        if not self.may_act_for(uid, gid):
+            return "not permitted for this agent"
+        return None
+
+    def applied(self, it, ref_id):
+        return {"client_id": it["client_id"], "op_type": it["type"], "ref_id": ref_id,
+                "user_id": it["user_id"], "agent_id": self.agent_id, "applied_at": self.now}
+
+
+def _amount(it) -> float | None:
+    try:
+        amt = float(it["data"].get("amount", 0) or 0)
+    except (TypeError, ValueError):
+        return None
+    return amt if amt > 0 else None
+
+
+def _insert_ids(model, rows: list[dict]) -> list[int]:
+    return list(db.session.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows))
+
+
+# ---------------- per-type appliers (no commit; caller commits per type) ----------------
+def _apply_complaints(batch, ctx, results):
+    valid = []
+    for it in batch:
+        msg = (it["data"].get("message") or "").strip()
+        if not msg:
+            results[it["index"]] = _result(it, "rejected", reason="message required")
+        elif it["user_id"] not in ctx.users:
+            results[it["index"]] = _result(it, "rejected", reason="user not found")
+        elif not ctx.may_act_for(it["user_id"], it["group_id"]):
+            results[it["index"]] = _result(it, "rejected", reason="not permitted for this agent")
+        else:
+            valid.append((it, msg))
+    if not valid:
+        return
+    ids = _insert_ids(Complaint, [{"user_id": it["user_id"], "message": msg, "status": "pending",
+                                   "timestamp": ctx.now} for it, msg in valid])
+    db.session.execute(insert(AppliedOfflineOp), [ctx.applied(it, i) for (it, _), i in zip(valid, ids)])
+    for (it, _), i in zip(valid, ids):
+        results[it["index"]] = _result(it, "applied", id=i)
+
+
+def _apply_loan_requests(batch, ctx, results):
+    valid = []
+    for it in batch:
+        amt = _amount(it)
+        err = "Invalid loan amount" if amt is None else ctx.check_member_op(it)
+        if not err and not ctx.users[it["user_id"]].hedera_account_id:
+            err = "User wallet missing"
+        if err:
+            results[it["index"]] = _result(it, "rejected", reason=err)
+        else:
+            valid.append((it, amt))
+    if not valid:
+        return
+    ids = _insert_ids(LoanRequest, [{"group_id": it["group_id"], "user_id": it["user_id"], "amount": amt,
+                                     "purpose": (it["data"].get("purpose") or "").strip(), "status": "pending",
+                                     "created_at": ctx.now} for it, amt in valid])
+    db.session.execute(insert(VotingSession), [{"group_id": it["group_id"], "loan_request_id": i, "status": "ongoing",
+                                                "started_at": ctx.now, "created_at": ctx.now}
+                                               for (it, _), i in zip(valid, ids)])
+    db.session.execute(insert(AppliedOfflineOp), [ctx.applied(it, i) for (it, _), i in zip(valid, ids)])
+
+    per_group = {}
+    for (it, amt), i in zip(valid, ids):
+        results[it["index"]] = _result(it, "applied", id=i)
+        per_group.setdefault(it["group_id"], []).append((i, it["user_id"], amt))
+    members = db.session.query(GroupMembership.group_id, GroupMembership.user_id) \
+        .filter(GroupMembership.group_id.in_(per_group.keys())).all()
+    for gid, reqs in per_group.items():
+        grp = ctx.groups[gid]
+        requesters = {uid for _, uid, _ in reqs}
+        voters = [u for g, u in members if g == gid and u not in requesters]
+        listing = ", ".join(f"#{i} ({amt} BHC)" for i, _, amt in reqs)
+        ctx.notes.append((voters, f"🗳️ New loan requests in {grp.name}: {listing} — Vote: vote <id> yes|no", "info"))
+        for i, uid, amt in reqs:
+            ctx.notes.append(([uid], f"📌 Loan request {amt} BHC created in {grp.name}", "info"))
+
+
+def _apply_deposits(batch, ctx, results):
+    # cash collected offline has not moved on-chain: it becomes a pending DepositRequest
+    # for admin approval, never a direct Deposit / MemberBalance credit
+    valid = []
+    for it in batch:
+        amt = _amount(it)
+        err = "Invalid amount" if amt is None else ctx.check_member_op(it)
+        if err:
+            results[it["index"]] = _result(it, "rejected", reason=err)
+        else:
+            valid.append((it, amt))
+    if not valid:
+        return
+
+    agent = ctx.agent_id
+    rows = []
+    for it, amt in valid:
+        note = (f"Offline deposit for {ctx.groups[it['group_id']].slug} (group {it['group_id']}), "
+                f"agent {agent}, client {it['client_id']}")
+        if it["data"].get("note"):
+            note += f": {it['data']['note']}"
+        rows.append({"user_id": it["user_id"], "amount": amt, "note": note[:200], "status": "pending",
+                     "timestamp": ctx.now})
+    ids = _insert_ids(DepositRequest, rows)
+    db.session.execute(insert(AppliedOfflineOp), [ctx.applied(it, i) for (it, _), i in zip(valid, ids)])
+
+    for (it, amt), i in zip(valid, ids):
+        results[it["index"]] = _result(it, "applied", id=i, pending_approval=True)
+        ctx.notes.append(([it["user_id"]], f"⏳ Deposit request {amt} BHC for {ctx.groups[it['group_id']].name} "
+                                           f"submitted. Waiting for admin approval.", "info"))
+
+
+def _apply_votes(batch, ctx, results):
+    from cooperative.routes import _loan_for_approved_request
+
+    valid = []
+    for it in batch:
+        choice = str(it["data"].get("vote") or it["data"].get("choice") or "").lower()
+        try:
+            session = ctx.sessions.get(int(it["data"].get("loan_request_id")))
+        except (TypeError, ValueError):
+            session = None
+        err = None
+        if choice not in ("yes", "no"):
+            err = "Vote must be yes/no"
+        elif not session or session.status != "ongoing":
+            err = "No ongoing voting"
+        elif it["user_id"] != ctx.agent_id:
+            err = "votes can only be cast by the member themselves"     # no proxy votes, even by admins
+        else:
+            it["group_id"] = session.group_id
+            err = ctx.check_member_op(it, need_kyc=False)
+        if err:
+            results[it["index"]] = _result(it, "rejected", reason=err)
+        else:
+            valid.append((it, session, choice))
+    if not valid:
+        return
+
+    sids = {s.id for _, s, _ in valid}
+    existing = set(db.session.query(VoteDetail.session_id, VoteDetail.voter_id)
+                   .filter(VoteDetail.session_id.in_(sids),
+                           VoteDetail.voter_id.in_({it["user_id"] for it, _, _ in valid})).all())
+    rows, kept = [], []
+    for it, s, choice in valid:                      # batch is already in (created_at, client_id) order
+        key = (s.id, it["user_id"])
+        if key in existing:
+            results[it["index"]] = _result(it, "conflict", conflict="duplicate_vote",
+                                           reason="Already voted; earlier vote kept")
+            continue
+        existing.add(key)
+        rows.append({"session_id": s.id, "voter_id": it["user_id"], "choice": choice, "created_at": ctx.now})
+        kept.append((it, s))
+    if not rows:
+        return
+    ids = _insert_ids(VoteDetail, rows)
+    db.session.execute(insert(AppliedOfflineOp), [ctx.applied(it, i) for (it, _), i in zip(kept, ids)])
+    for (it, _), i in zip(kept, ids):
+        results[it["index"]] = _result(it, "applied", id=i)
+
+    # quorum, same rule as cooperative.routes._close_voting_if_quorum, for every touched session at once
+    touched = {s.id: s for _, s in kept}
+    tally = {}
+    for sid, choice, n in db.session.query(VoteDetail.session_id, VoteDetail.choice, db.func.count(VoteDetail.id)) \
+            .filter(VoteDetail.session_id.in_(touched.keys())).group_by(VoteDetail.session_id, VoteDetail.choice):
+        tally.setdefault(sid, {})[choice] = n
+    gids = {s.group_id for s in touched.values()}
+    members = dict(db.session.query(GroupMembership.group_id, db.func.count(GroupMembership.id))
+                   .filter(GroupMembership.group_id.in_(gids)).group_by(GroupMembership.group_id).all())
+    closing = {}
+    for sid, s in touched.items():
+        yes, no = tally.get(sid, {}).get("yes", 0), tally.get(sid, {}).get("no", 0)
+        n = members.get(s.group_id, 0)
+        if yes + no >= (n // 2) + 1 or yes + no == n:
+            closing[s.loan_request_id] = (s, yes > no)
+    if not closing:
+        return
+    admins = db.session.query(GroupMembership.group_id, GroupMembership.user_id) \
+        .filter(GroupMembership.group_id.in_(gids), GroupMembership.role == "admin").all()
+    for lr in LoanRequest.query.filter(LoanRequest.id.in_(closing.keys())).all():
+        s, approved = closing[lr.id]
+        s.status = lr.status = "approved" if approved else "rejected"
+        s.closed_at = ctx.now
+        if approved:
+            _loan_for_approved_request(lr)
+            grp = ctx.groups[lr.group_id]
+            ctx.notes.append(([u for g, u in admins if g == lr.group_id],
+                              f"🔔 Loan #{lr.id} approved for {grp.name}. Use: disburse {lr.id}", "info"))
+
+
+_APPLIERS = {"complaint": _apply_complaints, "loan_request": _apply_loan_requests,
+             "deposit": _apply_deposits, "vote": _apply_votes}
+
+
+def _send_notes(notes):
+    rows = [{"user_id": uid, "message": msg, "type": ntype, "is_read": False, "created_at": datetime.utcnow()}
+            for uids, msg, ntype in notes for uid in uids]
+    if not rows:
+        return
+    try:
+        db.session.execute(insert(Notification), rows)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ Offline sync notifications failed: {e}")
+
+
+def apply_operations(ops: list, agent_id: int) -> list[dict]:
+    """Apply a batch of offline operations. Needs an app context. One result per op, in input order."""
+    results: list = [None] * len(ops)
+    items = _dedupe(_normalize(ops, agent_id, results), results)
+    if not items:
+        return results
+    ctx = _Context(items, agent_id)
+
+    for kind in _ORDER:
+        batch = sorted((it for it in items if it["type"] == kind),
+                       key=lambda it: (it["created_at"], it["client_id"]))
+        if not batch:
+            continue
+        notes_before = len(ctx.notes)
+        try:
+            _APPLIERS[kind](batch, ctx, results)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            del ctx.notes[notes_before:]
+            print(f"⚠️ Offline sync: {kind} batch of {len(batch)} failed: {e}")
+            for it in batch:
+                results[it["index"]] = _result(it, "error", reason=str(e)[:300])
+    _send_notes(ctx.notes)
+    return results
+
+
+def summarize(results: list) -> dict:
+    out = {}
+    for r in results:
+        out[r["status"]] = out.get(r["status"], 0) + 1
+    return out
@@ -0,0 +1,16 @@
+# offline_sync/models.py
+from datetime import datetime
+from extensions import db
+
+
+class AppliedOfflineOp(db.Model):
+    """client_id of every offline operation the apply engine has written, so a re-sync is a no-op."""
+    __tablename__ = "offline_applied_ops"
+
+    id = db.Column(db.Integer, primary_key=True)
+    client_id = db.Column(db.String(64), nullable=False, unique=True)   # generated on the device
+    op_type = db.Column(db.String(20), nullable=False)                  # deposit | vote | loan_request | complaint
+    ref_id = db.Column(db.Integer, nullable=True)                       # Deposit.id / VoteDetail.id / ...
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    agent_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)   # who synced it
+    applied_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -1,20 +1,169 @@
-import json, os
-
-QUEUE_FILE = "offline_queue.json"
-
-def add_to_queue(data):
-    queue = []
-    if os.path.exists(QUEUE_FILE):
-        with open(QUEUE_FILE, "r") as f:
-            queue = json.load(f)
-    queue.append(data)
-    with open(QUEUE_FILE, "w") as f:
-        json.dump(queue, f)
-
-def flush_queue():
-    if not os.path.exists(QUEUE_FILE):
-        return []
-    with open(QUEUE_FILE, "r") as f:
-        queue = json.load(f)
-    os.remove(QUEUE_FILE)
-    return queue
+# offline_sync/queue_handler.py
+"""
+Durable local queue for offline-captured actions (SQLite, WAL mode).
+
+- add_to_queue() is one INSERT: O(1), safe from concurrent requests / workers
+  (WAL lets readers run while a writer appends; writers wait on busy_timeout).
+- read_batch() leases up to N entries (leased_until) without removing them;
+  ack() deletes them once they are applied, nack() / an expired lease hands
+  them out again. Nothing is lost if the process dies between read and apply.
+- every entry carries the owner_id of the user who queued it; a consumer can
+  lease only its own entries, so one user's sync never settles another's work.
+- synchronous=NORMAL: fsync happens at WAL checkpoints, not per append
+  (OFFLINE_QUEUE_SYNC=FULL for fsync on every commit).
+
+An old offline_queue.json is imported once on first open and renamed.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+
+OFFLINE_QUEUE_PATH = os.getenv("OFFLINE_QUEUE_PATH", "offline_queue.db")
+OFFLINE_QUEUE_SYNC = os.getenv("OFFLINE_QUEUE_SYNC", "NORMAL").upper()      # NORMAL | FULL
+OFFLINE_QUEUE_LEASE_S = int(os.getenv("OFFLINE_QUEUE_LEASE_S", "300"))
+LEGACY_QUEUE_FILE = "offline_queue.json"
+
+
+class DurableQueue:
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # autocommit mode; transactions are explicit (BEGIN IMMEDIATE) where they matter
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={'FULL' if OFFLINE_QUEUE_SYNC == 'FULL' else 'NORMAL'}")
+            self._local.conn = conn
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    self._init_schema(conn)
+                    self._ready = True
+        return conn
+
+    def _init_schema(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS offline_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload TEXT NOT NULL,
+                enqueued_at REAL NOT NULL,
+                leased_until REAL,
+                deliveries INTEGER NOT NULL DEFAULT 0,
+                owner_id INTEGER
+            )""")
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(offline_queue)")}
+        if "owner_id" not in cols:          # queue file from before owner stamping
+            conn.execute("ALTER TABLE offline_queue ADD COLUMN owner_id INTEGER")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_offline_queue_owner ON offline_queue (owner_id, id)")
+        self._import_legacy(conn)
+
+    def _import_legacy(self, conn):
+        if not os.path.exists(LEGACY_QUEUE_FILE):
+            return
+        try:
+            with open(LEGACY_QUEUE_FILE, "r") as f:
+                old = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read {LEGACY_QUEUE_FILE}, leaving it in place: {e}")
+            return
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("INSERT INTO offline_queue (payload, enqueued_at) VALUES (?, ?)",
+                         [(json.dumps(item), now) for item in old])
+        conn.execute("COMMIT")
+        os.replace(LEGACY_QUEUE_FILE, LEGACY_QUEUE_FILE + ".imported")
+        print(f"📦 Imported {len(old)} entries from {LEGACY_QUEUE_FILE}")
+
+    # ---- producer side ----
+    def put(self, data, owner_id: int | None = None) -> int:
+        cur = self._conn().execute("INSERT INTO offline_queue (payload, enqueued_at, owner_id) VALUES (?, ?, ?)",
+                                   (json.dumps(data), time.time(), owner_id))
+        return cur.lastrowid
+
+    def put_many(self, items: list, owner_id: int | None = None) -> int:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("INSERT INTO offline_queue (payload, enqueued_at, owner_id) VALUES (?, ?, ?)",
+                         [(json.dumps(d), now, owner_id) for d in items])
+        conn.execute("COMMIT")
+        return len(items)
+
+    # ---- consumer side ----
+    def read_batch(self, limit: int = 500, lease_s: int | None = None, owner_id: int | None = None,
+                   unowned: bool = False) -> list[tuple[int, object]]:
+        """
+        Lease up to `limit` entries (oldest first). Returns [(entry_id, data)].
+        owner_id -> only that user's entries (+ entries without an owner if `unowned`).
+        """
+        conn = self._conn()
+        now = time.time()
+        where, args = "(leased_until IS NULL OR leased_until < ?)", [now]
+        if owner_id is not None:
+            where += " AND (owner_id = ?" + (" OR owner_id IS NULL)" if unowned else ")")
+            args.append(int(owner_id))
+        conn.execute("BEGIN IMMEDIATE")          # one consumer leases at a time
+        try:
+            rows = conn.execute(f"SELECT id, payload FROM offline_queue WHERE {where} ORDER BY id LIMIT ?",
+                                (*args, int(limit))).fetchall()
+            if rows:
+                conn.executemany(
+                    "UPDATE offline_queue SET leased_until = ?, deliveries = deliveries + 1 WHERE id = ?",
+                    [(now + (lease_s or OFFLINE_QUEUE_LEASE_S), r[0]) for r in rows])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [(i, json.loads(p)) for i, p in rows]
+
+    def ack(self, ids: list[int]) -> int:
+        """Remove applied entries."""
+        if not ids:
+            return 0
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        n = conn.executemany("DELETE FROM offline_queue WHERE id = ?", [(int(i),) for i in ids]).rowcount
+        conn.execute("COMMIT")
+        return n
+
+    def nack(self, ids: list[int]) -> int:
+        """Give leased entries back right away (e.g. apply failed for a retryable reason)."""
+        if not ids:
+            return 0
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        n = conn.executemany("UPDATE offline_queue SET leased_until = NULL WHERE id = ?",
+                             [(int(i),) for i in ids]).rowcount
+        conn.execute("COMMIT")
+        return n
+
+    def depth(self) -> dict:
+        now = time.time()
+        total, leased = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(CASE WHEN leased_until >= ? THEN 1 ELSE 0 END), 0) FROM offline_queue",
+            (now,)).fetchone()
+        return {"queued": total - leased, "leased": leased}
+
+
+offline_queue = DurableQueue(OFFLINE_QUEUE_PATH)
+
+
+def add_to_queue(data, owner_id: int | None = None) -> int:
+    return offline_queue.put(data, owner_id)
+
+
+def flush_queue(limit: int = 500) -> list:
+    """
+    Old API: hand out queued records and drop them. Prefer read_batch() + ack()
+    so entries survive until they are actually applied.
+    """
+    batch = offline_queue.read_batch(limit)
+    offline_queue.ack([i for i, _ in batch])
+    return [data for _, data in batch]
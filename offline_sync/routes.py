@@ -1,18 +1,52 @@
 from flask import Blueprint, request, jsonify
-from offline_sync.queue_handler import add_to_queue, flush_queue
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from offline_sync.queue_handler import add_to_queue, offline_queue
+from offline_sync.apply_engine import apply_operations, summarize, OFFLINE_APPLY_MAX_OPS, STAFF_ROLES
+from users.models import User
 
 sync_bp = Blueprint('sync', __name__, url_prefix='/api/sync')
 
 # Data  queue route
 @sync_bp.route('/queue', methods=['POST'])
+@jwt_required()
 def add_data_to_queue():
     data = request.get_json()
-    add_to_queue(data)
-    return jsonify({"message": "Data added to local queue"}), 201
+    entry_id = add_to_queue(data, owner_id=int(get_jwt_identity()))
+    return jsonify({"message": "Data added to local queue", "entry_id": entry_id}), 201
 
-# Queue flush DB route
+# Apply offline operations: {"operations": [...]} from the device, or (no body) the local queue
 @sync_bp.route('/sync', methods=['POST'])
+@jwt_required()
 def sync_data():
-    queued_data = flush_queue()
-    # DB save logic
-    return jsonify({"message": "Data synced successfully", "records": queued_data}), 200
+    agent_id = int(get_jwt_identity())
+    body = request.get_json(silent=True) or {}
+
+    if "operations" in body:
+        ops = body.get("operations")
+        if not isinstance(ops, list):
+            return jsonify({"error": "operations must be a list"}), 400
+        if len(ops) > OFFLINE_APPLY_MAX_OPS:
+            return jsonify({"error": f"Max {OFFLINE_APPLY_MAX_OPS} operations per sync"}), 413
+        results = apply_operations(ops, agent_id)
+        return jsonify({"message": "Data synced successfully", "summary": summarize(results),
+                        "results": results}), 200
+
+    # only the caller's own entries; staff also pick up unowned ones (imported from the old JSON queue)
+    user = User.query.get(agent_id)
+    staff = bool(user and user.role in STAFF_ROLES)
+    limit = min(int(request.args.get("limit", 500)), OFFLINE_APPLY_MAX_OPS)
+    batch = offline_queue.read_batch(limit, owner_id=agent_id, unowned=staff)
+    results = apply_operations([data for _, data in batch], agent_id)
+    # ack what is settled (applied / duplicate / conflict / rejected); "error" and permission
+    # rejections go back, so an entry is never dropped because the wrong user synced it
+    def _retry(r):
+        return r["status"] == "error" or r.get("reason") == "not permitted for this agent"
+    offline_queue.ack([entry_id for (entry_id, _), r in zip(batch, results) if not _retry(r)])
+    offline_queue.nack([entry_id for (entry_id, _), r in zip(batch, results) if _retry(r)])
+    return jsonify({"message": "Data synced successfully", "summary": summarize(results), "results": results,
+                    "remaining": offline_queue.depth()["queued"]}), 200
+
+# Queue depth
+@sync_bp.route('/status', methods=['GET'])
+def queue_status():
+    return jsonify(offline_queue.depth()), 200
@@ -48,3 +48,125 @@ def update_role(user_id):
     return jsonify({
         "message": f"User {user.username} role changed from {old_role} to {new_role}"
     }), 200
+
+
+# ✅ Hedera operation stats (latency / status / retries / fees + recent slow calls)
+@super_admin_bp.route('/hedera/ops', methods=['GET'])
+@jwt_required()
+def hedera_ops_summary():
+    current_id = int(get_jwt_identity())
+    super_admin = User.query.get(current_id)
+    if not super_admin or super_admin.role != "super-admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    from hedera_sdk import instrument
+    from hedera_sdk.submit_scheduler import submit_scheduler
+    out = instrument.summary()
+    out["submit_queue"] = {"depth": submit_scheduler.queue_depth(), "operators": submit_scheduler.stats()}
+    return jsonify(out), 200
+
+
+# ✅ Outbox operator tooling (dead-letter queue)
+@super_admin_bp.route('/outbox', methods=['GET'])
+@jwt_required()
+def outbox_list():
+    current_id = int(get_jwt_identity())
+    super_admin = User.query.get(current_id)
+    if not super_admin or super_admin.role != "super-admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    from finance.models import OutboxTransfer
+    from middleware.offline_sync import outbox_summary
+    status = request.args.get("status", "dead")
+    limit = min(int(request.args.get("limit", 50)), 500)
+    offset = int(request.args.get("offset", 0))
+
+    q = OutboxTransfer.query
+    if status != "all":
+        q = q.filter(OutboxTransfer.status == status)
+    rows = q.order_by(OutboxTransfer.id.desc()).offset(offset).limit(limit).all()
+    return jsonify({"summary": outbox_summary(), "status": status,
+                    "rows": [r.to_dict() for r in rows]}), 200
+
+
+@super_admin_bp.route('/outbox/<int:outbox_id>', methods=['GET'])
+@jwt_required()
+def outbox_detail(outbox_id):
+    current_id = int(get_jwt_identity())
+    super_admin = User.query.get(current_id)
+    if not super_admin or super_admin.role != "super-admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    from finance.models import OutboxTransfer, OutboxAttempt
+    row = OutboxTransfer.query.get(outbox_id)
+    if not row:
+        return jsonify({"error": "Not found"}), 404
+    attempts = (OutboxAttempt.query.filter_by(outbox_id=outbox_id)
+                .order_by(OutboxAttempt.attempt_at.desc()).limit(100).all())
+    return jsonify({**row.to_dict(), "attempt_log": [{
+        "attempt_at": a.attempt_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "success": a.success,
+        "hedera_tx_id": a.hedera_tx_id,
+        "response": a.response,
+        "error": a.error,
+    } for a in attempts]}), 200
+
+
+@super_admin_bp.route('/outbox/requeue', methods=['POST'])
+@jwt_required()
+def outbox_requeue():
+    current_id = int(get_jwt_identity())
+    super_admin = User.query.get(current_id)
+    if not super_admin or super_admin.role != "super-admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    from middleware.offline_sync import requeue_rows, REQUEUEABLE
+    data = request.get_json() or {}
+    ids = [int(i) for i in data.get("ids") or []]
+    status = data.get("status")
+    if not ids and status not in REQUEUEABLE:
+        return jsonify({"error": f"Give ids or a status in {list(REQUEUEABLE)}"}), 400
+    return jsonify({"requeued": requeue_rows(ids=ids, status=status)}), 200
+
+
+@super_admin_bp.route('/outbox/cancel', methods=['POST'])
+@jwt_required()
+def outbox_cancel():
+    current_id = int(get_jwt_identity())
+    super_admin = User.query.get(current_id)
+    if not super_admin or super_admin.role != "super-admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    from middleware.offline_sync import cancel_rows
+    ids = [int(i) for i in (request.get_json() or {}).get("ids") or []]
+    if not ids:
+        return jsonify({"error": "ids required"}), 400
+    return jsonify({"cancelled": cancel_rows(ids)}), 200
+
+
+@super_admin_bp.route('/jobs', methods=['GET'])
+@jwt_required()
+def jobs_overview():
+    current_id = int(get_jwt_identity())
+    super_admin = User.query.get(current_id)
+    if not super_admin or super_admin.role != "super-admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    from jobs.models import JobRun, WorkerLease
+    from jobs.registry import JOBS
+    name = request.args.get("job")
+    limit = min(int(request.args.get("limit", 50)), 500)
+
+    latest_ids = db.session.query(db.func.max(JobRun.id)).group_by(JobRun.job_name)
+    latest = {r.job_name: r.to_dict() for r in JobRun.query.filter(JobRun.id.in_(latest_ids)).all()}
+    q = JobRun.query
+    if name:
+        q = q.filter(JobRun.job_name == name)
+    recent = q.order_by(JobRun.id.desc()).limit(limit).all()
+    lease = WorkerLease.query.get("scheduler")
+    return jsonify({
+        "jobs": [{"name": j["name"], "enabled": j["enabled"], "last_run": latest.get(j["name"])} for j in JOBS],
+        "leader": {"holder": lease.holder,
+                   "expires_at": lease.expires_at.strftime("%Y-%m-%d %H:%M:%S")} if lease else None,
+        "runs": [r.to_dict() for r in recent],
+    }), 200
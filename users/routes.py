@@ -12,7 +12,7 @@ from finance.models import FraudLog
 from notifications.models import Notification
 import json
 # Hedera + Logging
-from hedera_sdk.wallet import create_hedera_account                    # ✅ correct
+from utils.account_pool import account_pool
 from utils.audit_logger import log_audit_action
 from utils.consensus_helper import publish_to_consensus
 from finance.models import DepositRequest 
@@ -47,7 +47,7 @@ def register_user():
 
     # 2) Create Hedera account, MUST have id + private key
     try:
-        acct = create_hedera_account(user_id=new_user.id, metadata={"source": "register"})
+        acct = account_pool.acquire_account(user_id=new_user.id, metadata={"source": "register"})
         if not acct or not acct.get("account_id") or not acct.get("private_key"):
             db.session.delete(new_user)   # cleanup if Hedera failed
             db.session.commit()
@@ -67,7 +67,7 @@ def register_user():
 
     # 3) Publish + audit (non-blocking)
     try:
-        publish_to_consensus({"event": "onboard", "user_id": new_user.id, "account": new_user.hedera_account_id})
+        publish_to_consensus({"event": "onboard", "user_id": new_user.id, "account": new_user.hedera_account_id}, source="onboard")
     except Exception:
         pass
 
@@ -109,7 +109,7 @@ def login_user():
         # ✅ If Hedera account missing (backfill)
         if not user.hedera_account_id or not user.hedera_private_key:
             try:
-                acct = create_hedera_account(user_id=user.id, metadata={"source": "login"})
+                acct = account_pool.acquire_account(user_id=user.id, metadata={"source": "login"})
                 if not acct or not acct.get("account_id") or not acct.get("private_key"):
                     return jsonify({'error': 'Hedera account creation failed (no key returned)'}), 502
 
@@ -130,7 +130,7 @@ def login_user():
                 except Exception:
                     pass
                 try:
-                    publish_to_consensus({"event": "onboard", "user_id": user.id, "account": user.hedera_account_id})
+                    publish_to_consensus({"event": "onboard", "user_id": user.id, "account": user.hedera_account_id}, source="onboard")
                 except Exception:
                     pass
 
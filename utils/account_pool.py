@@ -0,0 +1,243 @@
+# utils/account_pool.py
+"""
+Pre-provisioned Hedera account pool.
+
+A background thread keeps ACCOUNT_POOL_TARGET accounts created ahead of time in
+hedera_account_pool (AccountCreateTransaction + receipt, off the request path).
+Registration / login backfill / chat `onboard` / new groups call acquire_account(),
+which claims a ready row in one local transaction - milliseconds instead of the
+5-15 s an inline create takes. When depth drops to ACCOUNT_POOL_LOW_WATER the
+refill thread is woken; an empty pool falls back to the inline create.
+
+Metrics (middleware.monitor): hedera_account_pool_depth{status},
+hedera_account_pool_claims_total{result}, hedera_account_pool_refill_seconds.
+"""
+import os
+import threading
+import traceback
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from middleware.monitor import metrics
+
+ACCOUNT_POOL_ENABLED = os.getenv("ACCOUNT_POOL_ENABLED", "false").lower() in ("1", "true", "yes")
+ACCOUNT_POOL_TARGET = int(os.getenv("ACCOUNT_POOL_TARGET", "20"))
+ACCOUNT_POOL_LOW_WATER = int(os.getenv("ACCOUNT_POOL_LOW_WATER", "5"))
+ACCOUNT_POOL_INITIAL_HBAR = float(os.getenv("ACCOUNT_POOL_INITIAL_HBAR", "10"))   # same as create_hedera_account
+ACCOUNT_POOL_REFILL_WORKERS = int(os.getenv("ACCOUNT_POOL_REFILL_WORKERS", "4"))
+ACCOUNT_POOL_CHECK_S = int(os.getenv("ACCOUNT_POOL_CHECK_S", "60"))
+_CLAIM_TRIES = 5
+
+metrics.describe("hedera_account_pool_depth", "Pre-created Hedera accounts by status")
+metrics.describe("hedera_account_pool_claims_total", "acquire_account() by result (hit | miss)")
+metrics.describe("hedera_account_pool_refill_seconds", "AccountCreate + receipt time per pooled account")
+
+
+class AccountPool:
+    def __init__(self):
+        self.app = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._refill_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["hedera_account_pool"] = self
+
+    @property
+    def enabled(self) -> bool:
+        return ACCOUNT_POOL_ENABLED and self.app is not None
+
+    # ---- claim side ----
+    def claim(self, user_id: int | None = None, purpose: str | None = None) -> dict | None:
+        """
+        Take one ready account. With user_id, the user row gets account id + key in
+        the same commit (like create_hedera_account does). None if the pool is empty.
+        Needs an app context.
+        """
+        from extensions import db
+        from hedera_sdk.models import PooledHederaAccount as P
+
+        for _ in range(_CLAIM_TRIES):
+            row = (P.query.filter(P.status == "ready").order_by(P.id)
+                   .with_for_update(skip_locked=True).first())
+            if row is None:
+                db.session.rollback()
+                return None
+            # conditional flip: on SQLite (no SKIP LOCKED) two workers can pick the same row
+            now = datetime.utcnow()
+            won = P.query.filter(P.id == row.id, P.status == "ready").update(
+                {"status": "claimed", "claimed_by_user_id": user_id, "claimed_for": purpose, "claimed_at": now},
+                synchronize_session=False)
+            if not won:
+                db.session.rollback()
+                continue
+            account = {"account_id": row.account_id, "private_key": row.private_key,
+                       "public_key": row.public_key}
+            if user_id is not None:
+                from users.models import User
+                user = User.query.get(user_id)
+                if user:
+                    user.hedera_account_id = account["account_id"]
+                    user.hedera_private_key = account["private_key"]
+            db.session.commit()
+            return account
+        return None
+
+    def acquire_account(self, user_id: int | None = None, metadata: dict | None = None) -> dict | None:
+        """
+        Drop-in for wallet.create_hedera_account(): pooled account if one is ready,
+        else the inline create. Same return shape (+ "pooled").
+        """
+        metadata = metadata or {}
+        if self.enabled:
+            purpose = metadata.get("source") or metadata.get("type")
+            try:
+                account = self.claim(user_id, purpose)
+            except Exception as e:
+                from extensions import db
+                db.session.rollback()
+                print(f"⚠️ Account pool claim failed, creating inline: {e}")
+                account = None
+            self._after_claim()
+            if account:
+                metrics.inc("hedera_account_pool_claims_total", result="hit")
+                return {"user_id": user_id, **account, "metadata": metadata, "pooled": True}
+            metrics.inc("hedera_account_pool_claims_total", result="miss")
+
+        from hedera_sdk.wallet import create_hedera_account
+        acct = create_hedera_account(user_id=user_id, metadata=metadata)
+        if acct:
+            acct["pooled"] = False
+        return acct
+
+    def _after_claim(self):
+        try:
+            depth = self._update_depth()
+        except Exception:
+            depth = {"ready": 0}
+        if depth["ready"] <= ACCOUNT_POOL_LOW_WATER:
+            self._ensure_thread()
+            self._wake.set()
+
+    # ---- refill side ----
+    def _create_one(self):
+        import time
+        from hedera_sdk.wallet import create_hedera_account
+        t0 = time.perf_counter()
+        acct = create_hedera_account(user_id=None, initial_balance=ACCOUNT_POOL_INITIAL_HBAR,
+                                     metadata={"source": "pool"})
+        metrics.observe("hedera_account_pool_refill_seconds", time.perf_counter() - t0)
+        return acct
+
+    def refill(self, target: int | None = None) -> int:
+        """Create accounts until `ready` reaches target. Returns accounts added. Needs an app context."""
+        from extensions import db
+        from hedera_sdk.models import PooledHederaAccount
+
+        if not self._refill_lock.acquire(blocking=False):
+            return 0                                # another refill is already running
+        try:
+            missing = (target or ACCOUNT_POOL_TARGET) - self.depth()["ready"]
+            if missing <= 0:
+                return 0
+            def _save(a) -> bool:
+                try:
+                    db.session.add(PooledHederaAccount(
+                        account_id=a["account_id"], private_key=a["private_key"], public_key=a.get("public_key"),
+                        initial_balance_hbar=ACCOUNT_POOL_INITIAL_HBAR, status="ready"))
+                    db.session.commit()
+                    return True
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"⚠️ Account pool: could not save {a.get('account_id')}: {e}")
+                    return False
+
+            # each funded account (and its key) is stored as soon as its create returns,
+            # so a crash or a failed commit mid-refill loses at most the in-flight ones
+            workers = max(1, min(ACCOUNT_POOL_REFILL_WORKERS, missing))
+            saved, unsaved, failed = 0, [], 0
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="account-pool") as pool:
+                for fut in as_completed([pool.submit(self._create_one) for _ in range(missing)]):
+                    try:
+                        a = fut.result()
+                    except Exception as e:
+                        failed += 1
+                        print(f"⚠️ Account pool create failed: {e}")
+                        continue
+                    if not a:
+                        failed += 1
+                    elif _save(a):
+                        saved += 1
+                    else:
+                        unsaved.append(a)
+            for a in unsaved:                       # one more try once the creates are done
+                if _save(a):
+                    saved += 1
+                else:
+                    print(f"❌ Account pool: funded account {a.get('account_id')} NOT stored (key lost)")
+            if failed:
+                print(f"⚠️ Account pool refill: {failed} of {missing} creates failed")
+            self._update_depth()
+            return saved
+        finally:
+            self._refill_lock.release()
+
+    def _ensure_thread(self):
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        if not self.app.config.get("BACKGROUND_JOBS", True):
+            return                  # web process in worker mode: worker.py refills
+        self._thread = threading.Thread(target=self._loop, name="hedera-account-pool", daemon=True)
+        self._thread.start()
+
+    def start(self):
+        """Start the refill thread (fills up to target right away)."""
+        if self.enabled:
+            self._stop.clear()
+            self._ensure_thread()
+            self._wake.set()
+
+    def stop(self, timeout: float = 30):
+        """Stop the refill thread (worker.py lost the lease). A refill in progress finishes first."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(ACCOUNT_POOL_CHECK_S)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                with self.app.app_context():
+                    if self.depth()["ready"] <= ACCOUNT_POOL_LOW_WATER:
+                        added = self.refill()
+                        if added:
+                            print(f"🏊 Account pool refilled: +{added}")
+            except Exception:
+                traceback.print_exc()
+
+    # ---- introspection ----
+    def _update_depth(self) -> dict:
+        depth = self.depth()
+        for status, n in depth.items():
+            metrics.set_gauge("hedera_account_pool_depth", n, status=status)
+        return depth
+
+    def depth(self) -> dict:
+        """{status: count}. Needs an app context."""
+        from extensions import db
+        from hedera_sdk.models import PooledHederaAccount
+        rows = db.session.query(PooledHederaAccount.status, db.func.count(PooledHederaAccount.id)) \
+            .group_by(PooledHederaAccount.status).all()
+        out = {"ready": 0, "claimed": 0}
+        out.update({s: n for s, n in rows})
+        return out
+
+
+account_pool = AccountPool()
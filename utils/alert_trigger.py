@@ -9,13 +9,13 @@ from security.models import AlertLog
 # Use the standardized consensus helper
 from utils.consensus_helper import publish_to_consensus as consensus_publish
 
-def publish_to_consensus(message):
+def publish_to_consensus(message, source="alert"):
     """
     Thin wrapper to keep backward compatibility with older callers.
     Always returns a dict.
     """
     try:
-        return consensus_publish(message)
+        return consensus_publish(message, source=source)
     except Exception as e:
         tb = traceback.format_exc()
         print(f"[Alert Trigger] consensus_publish failed: {e}\n{tb}")
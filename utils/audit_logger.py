@@ -68,7 +68,7 @@ def log_audit_action(user_id, action, table_name, record_id=None, old=None, new=
             "new": new,
             "local_log_id": getattr(log_entry, "id", None)
         }
-        res = consensus_publish(payload)
+        res = consensus_publish(payload, source="audit")
         # optional: log publish result to stdout for debugging
         if res.get("status") == "error":
             print(f"[Audit Logger] Hedera publish returned error: {res}")
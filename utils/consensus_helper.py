@@ -1,17 +1,20 @@
 # utils/consensus_helper.py
 import os, json, re
+from flask import has_app_context
 
 # Hedera SDK Java binding wrapper
 try:
     from hedera_sdk.consensus_service import publish_to_consensus as sdk_publish
 except ImportError:
     import uuid
-    def sdk_publish(topic_id, message):
+    def sdk_publish(message, topic_id=None, **kwargs):
         print(f"[Mock Hedera Publish] topic:{topic_id} message:{message}")
         return {"status": "ok", "topic": topic_id, "message_id": str(uuid.uuid4())}
 
 _TOPIC_ENV_KEYS = ("HEDERA_TOPIC_ID", "HEDERA_CONSENSUS_TOPIC_ID")
 _TOPIC_FALLBACK = "0.0.6613182"
+# blocks for the receipt by default; false = submit only, receipt confirmed in background
+HCS_WAIT_FOR_RECEIPT = os.getenv("HCS_WAIT_FOR_RECEIPT", "true").lower() in ("1", "true", "yes")
 _TOPIC_RE = re.compile(r"^\d+\.\d+\.\d+(?:-[a-z0-9]+)?$")
 
 def _get_topic_id() -> str:
@@ -21,10 +24,30 @@ def _get_topic_id() -> str:
             return v.strip()
     return _TOPIC_FALLBACK
 
-def publish_to_consensus(message):
+def publish_to_consensus(message, source: str = "event"):
+    """
+    Audit/alert entry point, never waits on Hedera when the app is up:
+    - durable publish queue (HCS_QUEUE_ENABLED) -> row insert only, worker publishes
+    - else HCS batcher (HCS_BATCH_ENABLED) -> buffered into a Merkle-rooted batch
+    - else published straight away.
+    """
+    from utils.publish_queue import publish_queue
+    if publish_queue.enabled and has_app_context():
+        try:
+            return publish_queue.enqueue(message, source=source)
+        except Exception as e:
+            print(f"[Consensus Helper] enqueue failed, publishing directly: {e}")
+
+    from utils.hcs_batcher import hcs_batcher
+    if hcs_batcher.enabled:
+        return hcs_batcher.add(message)
+    return publish_now(message)
+
+
+def publish_now(message, max_chunks: int = 1):
     """
     Always read topic id from env; send JSON/string as the *message*.
-    Also retries once with swapped args if SDK raises 'Invalid ID ...' by mistake.
+    max_chunks > 1 lets the SDK split a big message into that many HCS chunks.
     """
     topic_id = _get_topic_id()
     if not _TOPIC_RE.match(topic_id):
@@ -34,17 +57,11 @@ def publish_to_consensus(message):
     # normalize payload to string
     message_str = json.dumps(message, default=str, ensure_ascii=False) if isinstance(message, dict) else str(message)
 
+    opts = {"wait_for_receipt": HCS_WAIT_FOR_RECEIPT}
+    if max_chunks > 1:
+        opts["max_chunks"] = max_chunks
     try:
-        return sdk_publish(topic_id, message_str)
+        return sdk_publish(message_str, topic_id=topic_id, **opts)
     except Exception as e:
-        # If someone flipped the SDK arg order, error often says 'Invalid ID "{...}"'
-        s = str(e)
-        if "Invalid ID" in s and (message_str.startswith("{") or message_str.startswith("[")):
-            try:
-                # retry with args swapped (defensive)
-                return sdk_publish(message_str, topic_id)
-            except Exception as e2:
-                print(f"[Consensus Helper] Retry failed: {e2}")
-                return {"status": "error", "error": str(e2)}
         print(f"[Consensus Helper] Failed to publish: {e}")
         return {"status": "error", "error": str(e)}
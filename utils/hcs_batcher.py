@@ -0,0 +1,340 @@
+# utils/hcs_batcher.py
+"""
+Batched HCS publishing.
+
+Audit / alert / onboarding / KYC events are buffered for HCS_BATCH_WINDOW_MS or
+until HCS_BATCH_MAX_ENTRIES, then published as one envelope carrying the Merkle
+root of the batch plus the compact entries. If the entries don't fit in
+HCS_ENVELOPE_MAX_BYTES they are split over several envelopes that all carry the
+same root; an entry too big for one envelope gets its own, sent as a chunked
+HCS message (up to HCS_MAX_CHUNKS chunks of 1024 bytes). Every event keeps a local inclusion proof (hcs_event_proofs), so a
+single event can be checked against the root that went to the topic.
+
+Tree: leaf = sha256(0x00 || canonical_json), node = sha256(0x01 || left || right),
+an odd node is carried up unchanged.
+"""
+import os
+import json
+import uuid
+import atexit
+import hashlib
+import threading
+import traceback
+
+HCS_BATCH_ENABLED = os.getenv("HCS_BATCH_ENABLED", "true").lower() in ("1", "true", "yes")
+HCS_BATCH_WINDOW_MS = int(os.getenv("HCS_BATCH_WINDOW_MS", "2000"))
+HCS_BATCH_MAX_ENTRIES = int(os.getenv("HCS_BATCH_MAX_ENTRIES", "50"))
+HCS_ENVELOPE_MAX_BYTES = int(os.getenv("HCS_ENVELOPE_MAX_BYTES", "1024"))   # one HCS chunk
+HCS_BATCH_MAX_RETRIES = int(os.getenv("HCS_BATCH_MAX_RETRIES", "3"))
+HCS_MAX_CHUNKS = int(os.getenv("HCS_MAX_CHUNKS", "20"))                      # SDK default
+_HCS_CHUNK_BYTES = 1024
+
+
+# ---------------- merkle helpers ----------------
+def canonical(event) -> str:
+    if isinstance(event, str):
+        return event
+    return json.dumps(event, sort_keys=True, separators=(",", ":"), default=str, ensure_ascii=False)
+
+
+def leaf_hash(payload: str) -> str:
+    return hashlib.sha256(b"\x00" + payload.encode("utf-8")).hexdigest()
+
+
+def _node_hash(left: str, right: str) -> str:
+    return hashlib.sha256(b"\x01" + bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+def build_tree(leaves: list[str]) -> list[list[str]]:
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        cur, nxt = levels[-1], []
+        for i in range(0, len(cur), 2):
+            nxt.append(_node_hash(cur[i], cur[i + 1]) if i + 1 < len(cur) else cur[i])
+        levels.append(nxt)
+    return levels
+
+
+def merkle_proof(levels: list[list[str]], index: int) -> list[list[str]]:
+    """[[side, sibling_hash], ...] from leaf to root; side is where the sibling sits."""
+    proof = []
+    for level in levels[:-1]:
+        sib = index ^ 1
+        if sib < len(level):
+            proof.append(["L" if sib < index else "R", level[sib]])
+        index //= 2
+    return proof
+
+
+def verify_proof(payload: str, proof: list, root: str) -> bool:
+    h = leaf_hash(payload)
+    for side, sib in proof:
+        h = _node_hash(sib, h) if side == "L" else _node_hash(h, sib)
+    return h == root
+
+
+# ---------------- envelopes ----------------
+def _size(env) -> int:
+    return len(canonical(env).encode("utf-8"))
+
+
+def chunks_needed(message: str) -> int:
+    return max(1, -(-len(message.encode("utf-8")) // _HCS_CHUNK_BYTES))
+
+
+def _pack_envelopes(batch_id: str, root: str, payloads: list[str], hashes: list[str]) -> list[dict]:
+    """
+    Greedy-pack entries into envelopes <= HCS_ENVELOPE_MAX_BYTES. An entry that
+    doesn't fit on its own travels alone in a chunked envelope; only one beyond
+    HCS_MAX_CHUNKS chunks is reduced to its hash (the payload stays in the proof table).
+    """
+    def _env(entries):
+        return {"v": 1, "t": "hcs_batch", "b": batch_id, "r": root, "n": len(payloads),
+                "p": 0, "pc": 99999, "e": entries}
+
+    envelopes, current = [], []
+    for i, (payload, h) in enumerate(zip(payloads, hashes)):
+        entry = {"i": i, "d": json.loads(payload) if payload.startswith(("{", "[")) else payload}
+        size = _size(_env([entry]))
+        if size > HCS_ENVELOPE_MAX_BYTES:
+            if size <= HCS_MAX_CHUNKS * _HCS_CHUNK_BYTES:
+                if current:
+                    envelopes.append(current)
+                    current = []
+                envelopes.append([entry])
+                continue
+            print(f"⚠️ HCS batch {batch_id}: entry {i} is {size} bytes (> {HCS_MAX_CHUNKS} chunks), sending hash only")
+            entry = {"i": i, "h": h}
+        if current and _size(_env(current + [entry])) > HCS_ENVELOPE_MAX_BYTES:
+            envelopes.append(current)
+            current = []
+        current.append(entry)
+    if current:
+        envelopes.append(current)
+
+    out = []
+    for part_no, entries in enumerate(envelopes):
+        env = _env(entries)
+        env["p"], env["pc"] = part_no, len(envelopes)
+        out.append(env)
+    return out
+
+
+class HCSBatcher:
+    def __init__(self):
+        self.app = None
+        self._buffer: list[tuple[str, int]] = []     # (canonical payload, attempts)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.stats = {"queued": 0, "batches": 0, "envelopes": 0, "failed": 0}
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["hcs_batcher"] = self
+        try:
+            from hedera_sdk.receipts import register_row_updater
+            register_row_updater(_update_batch_receipt)
+        except Exception:
+            pass
+        atexit.register(self.flush)
+
+    @property
+    def enabled(self) -> bool:
+        return HCS_BATCH_ENABLED and self.app is not None
+
+    def add(self, event) -> dict:
+        payload = canonical(event)
+        with self._lock:
+            self._buffer.append((payload, 0))
+            self.stats["queued"] += 1
+            full = len(self._buffer) >= HCS_BATCH_MAX_ENTRIES
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+        return {"status": "queued", "event_hash": leaf_hash(payload)}
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    # ---- worker ----
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, name="hcs-batcher", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            self._wake.wait(HCS_BATCH_WINDOW_MS / 1000.0)
+            self._wake.clear()
+            try:
+                while self.pending():
+                    if not self.flush():
+                        break
+            except Exception:
+                traceback.print_exc()
+
+    def flush(self) -> dict | None:
+        """Publish up to HCS_BATCH_MAX_ENTRIES buffered events as one batch."""
+        with self._flush_lock:
+            with self._lock:
+                items = self._buffer[:HCS_BATCH_MAX_ENTRIES]
+                del self._buffer[:HCS_BATCH_MAX_ENTRIES]
+            if not items:
+                return None
+            try:
+                return self.publish_events([p for p, _ in items])
+            except RuntimeError as e:
+                return self._on_failure(items, e)
+
+    def publish_events(self, events: list) -> dict:
+        """
+        Publish the given events right now as one batch (used by flush and by the
+        durable publish queue). Raises RuntimeError if an envelope can't be sent.
+        """
+        payloads = [canonical(e) for e in events]
+        hashes = [leaf_hash(p) for p in payloads]
+        levels = build_tree(hashes)
+        root = levels[-1][0]
+        batch_id = uuid.uuid4().hex
+        envelopes = _pack_envelopes(batch_id, root, payloads, hashes)
+
+        from utils.consensus_helper import publish_now
+        results = []
+        for env in envelopes:
+            message = canonical(env)
+            res = publish_now(message, max_chunks=chunks_needed(message))
+            if res.get("status") == "error":
+                raise RuntimeError(res.get("error") or "HCS publish failed")
+            results.append(res)
+
+        part_of = {}
+        for env in envelopes:
+            for entry in env["e"]:
+                part_of[entry["i"]] = env["p"]
+
+        self._persist(batch_id, root, envelopes, results, payloads, hashes, levels, part_of)
+        self.stats["batches"] += 1
+        self.stats["envelopes"] += len(envelopes)
+        return {"status": "ok", "batch_id": batch_id, "root": root, "entries": len(payloads),
+                "envelopes": len(envelopes), "event_hashes": hashes,
+                "tx_ids": [r.get("tx_id") for r in results]}
+
+    def _on_failure(self, items, error):
+        # NOTE: envelopes already sent for this batch stay on the topic; the retried batch gets a new id/root
+        retry = [(p, a + 1) for p, a in items if a + 1 < HCS_BATCH_MAX_RETRIES]
+        dropped = len(items) - len(retry)
+        with self._lock:
+            self._buffer[:0] = retry
+        self.stats["failed"] += 1
+        print(f"⚠️ HCS batch publish failed ({error}); requeued={len(retry)} dropped={dropped}")
+        return None
+
+    def _persist(self, batch_id, root, envelopes, results, payloads, hashes, levels, part_of):
+        from extensions import db
+        from hedera_sdk.models import HCSBatch, HCSEventProof
+        try:
+            with self.app.app_context():
+                for env, res in zip(envelopes, results):
+                    db.session.add(HCSBatch(
+                        batch_id=batch_id, part_no=env["p"], part_count=env["pc"],
+                        merkle_root=root, entry_count=len(payloads),
+                        topic_id=res.get("topic_id") or res.get("topic"),
+                        tx_id=res.get("tx_id"),
+                        sequence_no=res.get("sequence"),
+                        status="confirmed" if res.get("sequence") else "published",
+                    ))
+                for i, (payload, h) in enumerate(zip(payloads, hashes)):
+                    db.session.add(HCSEventProof(
+                        batch_id=batch_id, leaf_index=i, part_no=part_of.get(i, 0),
+                        event_hash=h, payload=payload,
+                        proof=json.dumps(merkle_proof(levels, i)),
+                    ))
+                db.session.commit()
+        except Exception as e:
+            print(f"⚠️ HCS batch proofs not saved for {batch_id}: {e}")
+
+
+def _update_batch_receipt(tx_id: str, result: dict):
+    from hedera_sdk.models import HCSBatch
+    for row in HCSBatch.query.filter_by(tx_id=tx_id).all():
+        if result.get("status") == "SUCCESS":
+            row.status = "confirmed"
+            row.sequence_no = result.get("sequence") or row.sequence_no
+        else:
+            row.status = "failed"
+            row.error = result.get("error") or result.get("status")
+
+
+hcs_batcher = HCSBatcher()
+
+
+# ---------------- verification ----------------
+def verify_event(event_hash: str, check_topic: bool = False) -> dict:
+    """
+    Check a stored event against its batch root (and optionally against the envelope
+    on the topic via mirror node). Needs an app context.
+    """
+    from hedera_sdk.models import HCSBatch, HCSEventProof
+    ev = HCSEventProof.query.filter_by(event_hash=event_hash).first()
+    if not ev:
+        return {"event_hash": event_hash, "found": False}
+
+    part = HCSBatch.query.filter_by(batch_id=ev.batch_id, part_no=ev.part_no).first()
+    root = part.merkle_root if part else None
+    ok_local = bool(root) and leaf_hash(ev.payload) == event_hash and \
+        verify_proof(ev.payload, json.loads(ev.proof), root)
+
+    out = {
+        "event_hash": event_hash,
+        "found": True,
+        "batch_id": ev.batch_id,
+        "leaf_index": ev.leaf_index,
+        "merkle_root": root,
+        "proof_valid": ok_local,
+        "topic_id": part.topic_id if part else None,
+        "sequence_no": part.sequence_no if part else None,
+        "tx_id": part.tx_id if part else None,
+    }
+
+    if check_topic:
+        if not part or not part.sequence_no or not part.topic_id:
+            out["on_topic"] = "pending"
+        else:
+            try:
+                env = _read_envelope(part.topic_id, part.sequence_no)
+                out["on_topic"] = env.get("r") == root and env.get("b") == ev.batch_id
+            except Exception as e:
+                out["on_topic"] = f"error: {e}"
+    return out
+
+
+def _read_envelope(topic_id: str, sequence_no: int) -> dict:
+    """Envelope at sequence_no from the mirror node; a chunked one is put back together."""
+    import base64
+    from hedera_sdk.mirror_node import get_mirror_client, decode_topic_message
+    mirror = get_mirror_client()
+    first = mirror.get(f"/api/v1/topics/{topic_id}/messages/{sequence_no}")
+    info = first.get("chunk_info") or {}
+    total = int(info.get("total") or 1)
+    if total <= 1:
+        return decode_topic_message(first).get("parsed") or {}
+
+    chunks = {int(info.get("number") or 1): first["message"]}
+    for page in mirror.topic_messages(topic_id, after_sequence=sequence_no):
+        for m in page:
+            ci = m.get("chunk_info") or {}
+            if ci.get("initial_transaction_id") == info.get("initial_transaction_id"):
+                chunks[int(ci["number"])] = m["message"]
+        if len(chunks) >= total:
+            break
+    if len(chunks) < total:
+        return {}
+    raw = b"".join(base64.b64decode(chunks[n]) for n in sorted(chunks))
+    return json.loads(raw.decode("utf-8"))
@@ -0,0 +1,234 @@
+# utils/publish_queue.py
+"""
+Durable HCS publish queue.
+
+Request handlers (audit log, alerts, onboarding, KYC, chat commands) only insert a
+row in hcs_publish_queue; a background worker drains it with bounded concurrency
+and exponential backoff, so Hedera latency never sits on the request path.
+With the HCS batcher on, each drained group goes out as one Merkle-rooted batch.
+
+Metrics (middleware.monitor): hcs_queue_depth{status}, hcs_publish_latency_seconds,
+hcs_queue_wait_seconds, hcs_publish_total{result}.
+"""
+import os
+import json
+import time
+import random
+import threading
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from middleware.monitor import metrics
+
+HCS_QUEUE_ENABLED = os.getenv("HCS_QUEUE_ENABLED", "true").lower() in ("1", "true", "yes")
+HCS_QUEUE_POLL_MS = int(os.getenv("HCS_QUEUE_POLL_MS", "1000"))
+HCS_QUEUE_BATCH = int(os.getenv("HCS_QUEUE_BATCH", "50"))              # rows claimed per cycle
+HCS_QUEUE_CONCURRENCY = int(os.getenv("HCS_QUEUE_CONCURRENCY", "4"))
+HCS_QUEUE_MAX_ATTEMPTS = int(os.getenv("HCS_QUEUE_MAX_ATTEMPTS", "8"))
+HCS_QUEUE_BACKOFF_S = float(os.getenv("HCS_QUEUE_BACKOFF_S", "2"))
+HCS_QUEUE_BACKOFF_MAX_S = float(os.getenv("HCS_QUEUE_BACKOFF_MAX_S", "600"))
+HCS_QUEUE_CLAIM_TTL_S = int(os.getenv("HCS_QUEUE_CLAIM_TTL_S", "300"))  # in_flight older than this is reclaimed
+
+metrics.describe("hcs_queue_depth", "Rows in hcs_publish_queue by status")
+metrics.describe("hcs_publish_latency_seconds", "Time spent in the HCS publish call")
+metrics.describe("hcs_queue_wait_seconds", "Enqueue to successful publish")
+metrics.describe("hcs_publish_total", "Publish attempts by result")
+
+
+def _backoff(attempts: int) -> float:
+    delay = min(HCS_QUEUE_BACKOFF_S * (2 ** max(attempts - 1, 0)), HCS_QUEUE_BACKOFF_MAX_S)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class PublishQueue:
+    def __init__(self):
+        self.app = None
+        self._wake = threading.Event()
+        self._thread = None
+        self._pool = None
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions["hcs_publish_queue"] = self
+
+    @property
+    def enabled(self) -> bool:
+        return HCS_QUEUE_ENABLED and self.app is not None
+
+    # ---- producer side ----
+    def enqueue(self, message, source: str = "event") -> dict:
+        """Insert the message and return immediately. Needs an app context."""
+        from extensions import db
+        from hedera_sdk.models import HCSPublishJob
+
+        payload = message if isinstance(message, str) else json.dumps(message, default=str, ensure_ascii=False)
+        job = HCSPublishJob(source=source, payload=payload, status="pending",
+                            next_attempt_at=datetime.utcnow())
+        db.session.add(job)
+        db.session.commit()
+        metrics.inc("hcs_enqueued_total", source=source)
+        self._ensure_thread()
+        if not self._batching():
+            self._wake.set()
+        return {"status": "queued", "queue_id": job.id}
+
+    # ---- worker side ----
+    def _batching(self) -> bool:
+        from utils.hcs_batcher import hcs_batcher
+        return hcs_batcher.enabled
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        if not self.app.config.get("BACKGROUND_JOBS", True):
+            return                  # web process in worker mode: rows wait for worker.py
+        self._pool = self._pool or ThreadPoolExecutor(max_workers=HCS_QUEUE_CONCURRENCY,
+                                                      thread_name_prefix="hcs-publish")
+        self._thread = threading.Thread(target=self._loop, name="hcs-publish-queue", daemon=True)
+        self._thread.start()
+
+    def start(self):
+        """Start draining (also picks up rows left over from a previous run)."""
+        if self.enabled:
+            self._ensure_thread()
+
+    def _loop(self):
+        if self._batching():
+            from utils.hcs_batcher import HCS_BATCH_WINDOW_MS
+            interval = max(HCS_QUEUE_POLL_MS, HCS_BATCH_WINDOW_MS) / 1000.0
+        else:
+            interval = HCS_QUEUE_POLL_MS / 1000.0
+        while True:
+            self._wake.wait(interval)
+            self._wake.clear()
+            try:
+                with self.app.app_context():
+                    while self.drain_once():
+                        pass
+                    self._update_depth()
+            except Exception:
+                traceback.print_exc()
+
+    def _claim(self) -> list:
+        from extensions import db
+        from sqlalchemy import update
+        from hedera_sdk.models import HCSPublishJob as J
+        now = datetime.utcnow()
+
+        # crashed worker ke in_flight rows wapas pending
+        stale = now - timedelta(seconds=HCS_QUEUE_CLAIM_TTL_S)
+        J.query.filter(J.status == "in_flight", J.claimed_at < stale) \
+            .update({"status": "pending"}, synchronize_session=False)
+
+        due = (J.status == "pending", J.next_attempt_at <= now)
+        ids = [i for (i,) in db.session.query(J.id).filter(*due).order_by(J.id)
+               .limit(HCS_QUEUE_BATCH).with_for_update(skip_locked=True).all()]
+        if not ids:
+            db.session.commit()
+            return []
+        # conditional UPDATE: SQLite has no SKIP LOCKED, so a row another drainer
+        # (gunicorn worker, second worker.py) just took no longer matches
+        token = f"{os.getpid()}-{uuid.uuid4().hex[:16]}"
+        db.session.execute(
+            update(J).where(J.id.in_(ids), *due)
+            .values(status="in_flight", claimed_at=now, claimed_by=token)
+            .execution_options(synchronize_session=False))
+        db.session.commit()
+        return J.query.filter(J.claimed_by == token, J.status == "in_flight").order_by(J.id).all()
+
+    def drain_once(self) -> int:
+        """Claim one group of due rows and publish them. Returns rows processed. Needs an app context."""
+        from extensions import db
+        rows = self._claim()
+        if not rows:
+            return 0
+        if self._batching():
+            self._publish_batch(rows)
+        else:
+            self._publish_each(rows)
+        db.session.commit()
+        return len(rows)
+
+    def _publish_batch(self, rows):
+        from utils.hcs_batcher import hcs_batcher
+        events = [_load(r.payload) for r in rows]
+        t0 = time.perf_counter()
+        try:
+            res = hcs_batcher.publish_events(events)
+        except Exception as e:
+            metrics.observe("hcs_publish_latency_seconds", time.perf_counter() - t0, mode="batch")
+            for r in rows:
+                self._mark_failed(r, str(e))
+            return
+        metrics.observe("hcs_publish_latency_seconds", time.perf_counter() - t0, mode="batch")
+        for r, h in zip(rows, res.get("event_hashes") or []):
+            r.event_hash = h
+            self._mark_done(r, (res.get("tx_ids") or [None])[0])
+
+    def _publish_each(self, rows):
+        from utils.consensus_helper import publish_now
+
+        def _send(payload):
+            t0 = time.perf_counter()
+            try:
+                res = publish_now(_load(payload))
+            except Exception as e:
+                res = {"status": "error", "error": str(e)}
+            return res, time.perf_counter() - t0
+
+        futures = [self._pool.submit(_send, r.payload) for r in rows]
+        for r, fut in zip(rows, futures):
+            res, took = fut.result()
+            metrics.observe("hcs_publish_latency_seconds", took, mode="single")
+            if res.get("status") == "error":
+                self._mark_failed(r, res.get("error"))
+            else:
+                self._mark_done(r, res.get("tx_id"))
+
+    def _mark_done(self, row, tx_id):
+        row.status = "done"
+        row.tx_id = tx_id
+        row.attempts = (row.attempts or 0) + 1
+        row.last_error = None
+        row.published_at = datetime.utcnow()
+        metrics.inc("hcs_publish_total", result="ok")
+        if row.created_at:
+            metrics.observe("hcs_queue_wait_seconds", (row.published_at - row.created_at).total_seconds())
+
+    def _mark_failed(self, row, error):
+        row.attempts = (row.attempts or 0) + 1
+        row.last_error = str(error)[:2000] if error else "unknown error"
+        if row.attempts >= HCS_QUEUE_MAX_ATTEMPTS:
+            row.status = "failed"
+            metrics.inc("hcs_publish_total", result="gave_up")
+            print(f"❌ HCS publish gave up on queue row {row.id}: {row.last_error}")
+        else:
+            row.status = "pending"
+            row.next_attempt_at = datetime.utcnow() + timedelta(seconds=_backoff(row.attempts))
+            metrics.inc("hcs_publish_total", result="retry")
+
+    def _update_depth(self):
+        for status, n in self.depth().items():
+            metrics.set_gauge("hcs_queue_depth", n, status=status)
+
+    def depth(self) -> dict:
+        """{status: count}. Needs an app context."""
+        from extensions import db
+        from hedera_sdk.models import HCSPublishJob
+        rows = db.session.query(HCSPublishJob.status, db.func.count(HCSPublishJob.id)) \
+            .group_by(HCSPublishJob.status).all()
+        out = {"pending": 0, "in_flight": 0, "done": 0, "failed": 0}
+        out.update({s: n for s, n in rows})
+        return out
+
+
+def _load(payload: str):
+    try:
+        return json.loads(payload)
+    except Exception:
+        return payload
+
+
+publish_queue = PublishQueue()
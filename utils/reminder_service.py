@@ -1,53 +1,198 @@
 # utils/reminder_service.py
+"""
+Repayment reminders, set-based instead of one loan at a time.
+
+plan_reminders()          one anti-join finds every upcoming installment (and legacy
+                          finance loan) that has no reminder_schedules row yet and
+                          bulk-inserts them; the unique index is the dedupe
+submit_schedules()        pending rows -> Hedera ScheduleCreate, HEDERA_SCHEDULE_WORKERS
+                          at a time (only with HEDERA_SCHEDULE_ENABLED)
+fan_out_notifications()   rows whose remind_at has passed -> one bulk INSERT into
+                          notification + one UPDATE of reminder_schedules per batch
+send_repayment_reminders() runs the three (APScheduler job when REMINDERS_ENABLED)
+"""
+import os
+import json
 from datetime import datetime, timedelta
+
+from sqlalchemy import and_, insert, update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
 from finance.models import Loan
+from cooperative.models import Loan as CoopLoan, RepaymentSchedule
 from notifications.models import Notification
-from extensions import db
+from hedera_sdk.models import ReminderSchedule
+from hedera_sdk import schedule_service
 
-# Hedera Schedule Service import
-try:
-    from hedera_sdk.schedule_service import schedule_reminder_job
-except ImportError:
-    def schedule_reminder_job(job_name, run_at_iso, payload):
-        print(f"[Hedera Dummy] Job: {job_name}, Run At: {run_at_iso}, Payload: {payload}")
-        return {"status": "scheduled", "job": job_name, "run_at": run_at_iso}
+REMINDER_LEAD_DAYS = int(os.getenv("REMINDER_LEAD_DAYS", "3"))          # notify this long before due
+REMINDER_HORIZON_DAYS = int(os.getenv("REMINDER_HORIZON_DAYS", "30"))   # plan / schedule on-chain this far ahead
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "500"))
+REMINDER_SCHEDULE_MAX_ATTEMPTS = int(os.getenv("REMINDER_SCHEDULE_MAX_ATTEMPTS", "3"))
 
-def send_repayment_reminders():
+
+def _message(loan_id: int, due_date: datetime) -> str:
+    return f"Reminder: Your EMI for Loan ID {loan_id} is due on {due_date.strftime('%Y-%m-%d')}."
+
+
+# ---------------- 1) plan ----------------
+def _candidates(now: datetime, horizon: datetime) -> list[dict]:
+    R = ReminderSchedule
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    lead = timedelta(days=REMINDER_LEAD_DAYS)
+
+    installments = (
+        db.session.query(RepaymentSchedule.id, RepaymentSchedule.loan_id, RepaymentSchedule.installment_no,
+                         RepaymentSchedule.due_date, RepaymentSchedule.due_amount, CoopLoan.user_id)
+        .join(CoopLoan, RepaymentSchedule.loan_id == CoopLoan.id)
+        .outerjoin(R, and_(R.source == "installment", R.source_id == RepaymentSchedule.id,
+                           R.due_date == RepaymentSchedule.due_date))
+        .filter(RepaymentSchedule.status == "due",
+                CoopLoan.status == "active",
+                RepaymentSchedule.due_date >= today,
+                RepaymentSchedule.due_date <= horizon,
+                R.id.is_(None))
+        .all()
+    )
+    legacy = (
+        db.session.query(Loan.id, Loan.user_id, Loan.next_due_date, Loan.amount)
+        .outerjoin(R, and_(R.source == "loan", R.source_id == Loan.id, R.due_date == Loan.next_due_date))
+        .filter(Loan.status == "approved",
+                Loan.next_due_date.isnot(None),
+                Loan.next_due_date >= today,
+                Loan.next_due_date <= horizon,
+                R.id.is_(None))
+        .all()
+    )
+
+    rows = []
+    for rs_id, loan_id, n, due, amount, user_id in installments:
+        rows.append({"source": "installment", "source_id": rs_id, "loan_id": loan_id, "user_id": user_id,
+                     "due_date": due, "remind_at": max(now, due - lead), "amount": amount,
+                     "job_name": f"loan_reminder_{loan_id}_{n}"})
+    for loan_id, user_id, due, amount in legacy:
+        rows.append({"source": "loan", "source_id": loan_id, "loan_id": loan_id, "user_id": user_id,
+                     "due_date": due, "remind_at": max(now, due - lead), "amount": amount,
+                     "job_name": f"loan_reminder_{loan_id}_{due.strftime('%Y%m%d')}"})
+    return rows
+
+
+def plan_reminders(now: datetime | None = None) -> int:
+    """Insert reminder rows for every upcoming due date not planned yet. Returns rows added."""
+    now = now or datetime.utcnow()
+    rows = _candidates(now, now + timedelta(days=REMINDER_HORIZON_DAYS))
+    if not rows:
+        return 0
+    chain = "pending" if schedule_service.HEDERA_SCHEDULE_ENABLED else "none"
+    for r in rows:
+        r.update(status="pending", schedule_status=chain, schedule_attempts=0, created_at=now, updated_at=now)
+    try:
+        for i in range(0, len(rows), REMINDER_BATCH_SIZE):
+            db.session.execute(insert(ReminderSchedule), rows[i:i + REMINDER_BATCH_SIZE])
+        db.session.commit()
+    except IntegrityError:
+        # another runner planned some of these in between; its rows win, ours come next pass
+        db.session.rollback()
+        print("⚠️ Reminder planning raced with another run; retrying next cycle")
+        return 0
+    return len(rows)
+
+
+# ---------------- 2) on-chain schedules ----------------
+def submit_schedules(now: datetime | None = None) -> dict:
     """
-    Find loans due in next 3 days, send DB notifications,
-    and also schedule them on Hedera for immutable tracking.
+    Up to REMINDER_BATCH_SIZE pending rows per cycle -> ScheduleCreate (expiry = due date),
+    so failures are retried on the next cycle, not in a tight loop. Rows due beyond
+    HEDERA_SCHEDULE_MAX_DAYS wait until they come in range. No-op unless
+    HEDERA_SCHEDULE_ENABLED.
     """
-    today = datetime.utcnow()
-    upcoming_loans = Loan.query.filter(
-        Loan.status == 'approved',
-        Loan.next_due_date <= today + timedelta(days=3)
-    ).all()
-
-    reminders_sent = []
-
-    for loan in upcoming_loans:
-        due_date_str = loan.next_due_date.strftime('%Y-%m-%d')
-        message = f"Reminder: Your EMI for Loan ID {loan.id} is due on {due_date_str}."
-        
-        # ---- 1) Save to Notification table ----
-        notif = Notification(user_id=loan.user_id, message=message)
-        db.session.add(notif)
-        reminders_sent.append(message)
-
-        # ---- 2) Schedule on Hedera ----
-        try:
-            schedule_reminder_job(
-                job_name=f"loan_reminder_{loan.id}",
-                run_at_iso=loan.next_due_date.isoformat(),
-                payload={
-                    "loan_id": loan.id,
-                    "user_id": loan.user_id,
-                    "due_date": due_date_str,
-                    "message": message
-                }
-            )
-        except Exception as e:
-            print(f"[Reminder Service] Failed to schedule reminder on Hedera: {e}")
+    if not schedule_service.HEDERA_SCHEDULE_ENABLED:
+        return {"submitted": 0, "scheduled": 0, "failed": 0}
+    now = now or datetime.utcnow()
+    R = ReminderSchedule
+    pending = (R.query
+               .filter(R.schedule_status == "pending",
+                       R.due_date > now + timedelta(minutes=1),
+                       R.due_date <= now + timedelta(days=schedule_service.HEDERA_SCHEDULE_MAX_DAYS),
+                       R.schedule_attempts < REMINDER_SCHEDULE_MAX_ATTEMPTS)
+               .order_by(R.due_date.asc())
+               .limit(REMINDER_BATCH_SIZE)
+               .all())
+    if not pending:
+        return {"submitted": 0, "scheduled": 0, "failed": 0}
 
+    jobs = [{"job_name": r.job_name, "run_at": r.due_date,
+             "payload": {"loan_id": r.loan_id, "user_id": r.user_id, "due_date": r.due_date.strftime("%Y-%m-%d"),
+                         "message": _message(r.loan_id, r.due_date)}}
+            for r in pending]
+    results = schedule_service.create_schedules(jobs)
+
+    changes, ok = [], 0
+    for r, res in zip(pending, results):
+        attempts = r.schedule_attempts + 1
+        if res["error"] is None and res["status"] == "SUCCESS":
+            ok += 1
+            changes.append({"id": r.id, "schedule_status": "scheduled", "schedule_id": res["schedule_id"],
+                            "schedule_attempts": attempts, "last_error": None, "updated_at": now})
+        else:
+            state = "failed" if attempts >= REMINDER_SCHEDULE_MAX_ATTEMPTS else "pending"
+            changes.append({"id": r.id, "schedule_status": state, "schedule_attempts": attempts,
+                            "last_error": (res["error"] or res["status"])[:2000], "updated_at": now})
+    db.session.execute(update(ReminderSchedule), changes)
     db.session.commit()
-    return reminders_sent
+    return {"submitted": len(pending), "scheduled": ok, "failed": len(pending) - ok}
+
+
+# ---------------- 3) notifications ----------------
+def fan_out_notifications(now: datetime | None = None) -> list[str]:
+    """Due reminders -> notification rows, in bulk. Returns the messages sent."""
+    now = now or datetime.utcnow()
+    R = ReminderSchedule
+    sent: list[str] = []
+    while True:
+        due = (db.session.query(R.id, R.user_id, R.loan_id, R.due_date, R.amount, R.schedule_id)
+               .filter(R.status == "pending", R.remind_at <= now)
+               .order_by(R.remind_at.asc())
+               .limit(REMINDER_BATCH_SIZE)
+               .all())
+        if not due:
+            break
+        ids = [row.id for row in due]
+        # claim first: a concurrent runner that got here earlier makes the rowcount short
+        claimed = db.session.execute(
+            update(R).where(R.id.in_(ids), R.status == "pending")
+            .values(status="notified", notified_at=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if claimed != len(ids):
+            db.session.rollback()
+            print("⚠️ Reminder fan-out raced with another run; leaving this batch to it")
+            break
+
+        notes = []
+        for row in due:
+            msg = _message(row.loan_id, row.due_date)
+            meta = {"reminder_id": row.id, "loan_id": row.loan_id, "due_date": row.due_date.strftime("%Y-%m-%d"),
+                    "amount": float(row.amount) if row.amount is not None else None,
+                    "schedule_id": row.schedule_id}
+            notes.append({"user_id": row.user_id, "message": msg, "type": "info", "meta": json.dumps(meta),
+                          "is_read": False, "created_at": now})
+            sent.append(msg)
+        db.session.execute(insert(Notification), notes)
+        db.session.commit()
+        if len(due) < REMINDER_BATCH_SIZE:
+            break
+    return sent
+
+
+def send_repayment_reminders():
+    """
+    Plan reminders for upcoming installments, schedule them on Hedera (if enabled)
+    and send the in-app notifications that are due. Returns the messages sent.
+    """
+    now = datetime.utcnow()
+    planned = plan_reminders(now)
+    chain = submit_schedules(now)
+    sent = fan_out_notifications(now)
+    print(f"🔔 Reminders: planned={planned} on-chain={chain} notified={len(sent)}")
+    return sent
@@ -0,0 +1,149 @@
+# utils/upload_pipeline.py
+"""
+Single-pass upload receiving.
+
+Werkzeug normally spools each multipart file into a temp file, the view then
+saves it, stats it and hashes it again. With @hashing_uploads the multipart
+parser writes straight into a HashingSink: the size limit is enforced as bytes
+arrive, SHA-256 is updated over UPLOAD_BUFFER_BYTES blocks, and the data lands
+in its final path under upload_dir. The view reads sink.path / size / sha256
+from `file.stream` and never touches the bytes again.
+
+Sink files are deleted when the view returns, so views keep no cleanup code for
+the happy or the error path.
+"""
+import os
+import uuid
+import hashlib
+from functools import wraps
+
+from flask import request, jsonify
+from werkzeug.utils import secure_filename
+
+UPLOAD_BUFFER_BYTES = int(os.getenv("UPLOAD_BUFFER_BYTES", str(1024 * 1024)))
+UPLOAD_FORM_SLACK_BYTES = 64 * 1024      # multipart headers + small form fields
+
+
+class HashingSink:
+    """Writable/readable file-like the multipart parser streams one file part into."""
+
+    def __init__(self, upload_dir: str, filename: str | None, max_bytes: int):
+        os.makedirs(upload_dir, exist_ok=True)
+        name = secure_filename(filename or "") or "upload"
+        self.path = os.path.join(upload_dir, f"{uuid.uuid4().hex}_{name}")
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.too_large = False
+        self._sha = hashlib.sha256()
+        self._buf = bytearray()
+        self._f = open(self.path, "w+b")
+
+    # ---- parser side ----
+    def write(self, data: bytes) -> int:
+        if self.too_large:
+            return len(data)                 # keep draining the body, store nothing
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.too_large = True
+            self._buf.clear()
+            self._f.truncate(0)
+            return len(data)
+        self._buf += data
+        if len(self._buf) >= UPLOAD_BUFFER_BYTES:
+            self._flush()
+        return len(data)
+
+    def _flush(self):
+        if self._buf:
+            self._sha.update(self._buf)
+            self._f.write(self._buf)
+            self._buf.clear()
+
+    def seek(self, offset: int, whence: int = 0):
+        self._flush()
+        return self._f.seek(offset, whence)
+
+    # ---- FileStorage side ----
+    def read(self, n: int = -1) -> bytes:
+        self._flush()
+        return self._f.read(n)
+
+    def readline(self, n: int = -1) -> bytes:
+        self._flush()
+        return self._f.readline(n)
+
+    def tell(self) -> int:
+        return self._f.tell() + len(self._buf)
+
+    def flush(self):
+        self._flush()
+        self._f.flush()
+
+    def close(self):
+        if not self._f.closed:
+            self.flush()
+            self._f.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._f.closed
+
+    @property
+    def sha256(self) -> str:
+        self._flush()
+        return self._sha.hexdigest()
+
+    def finish(self) -> dict:
+        """Close the handle (bytes are on disk) and return what the uploader needs."""
+        digest = self.sha256
+        self.close()
+        return {"path": self.path, "size": self.size, "sha256": digest}
+
+    def discard(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def hashing_uploads(upload_dir: str | None = None, max_bytes: int = 5 * 1024 * 1024, too_large=None):
+    """
+    View decorator: multipart files in this request go through HashingSink.
+    Requests whose Content-Length already exceeds max_bytes (+ form slack) get a
+    413 before the body is read; too_large() can supply the response.
+    """
+    def _too_large():
+        if too_large:
+            return too_large()
+        return jsonify({"error": f"File too large (max {max_bytes} bytes)."}), 413
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.content_length and request.content_length > max_bytes + UPLOAD_FORM_SLACK_BYTES:
+                return _too_large()
+
+            sinks = []
+            target_dir = upload_dir or os.getenv("KYC_UPLOAD_FOLDER", "uploads")
+
+            def _factory(total_content_length, content_type, filename=None, content_length=None):
+                sink = HashingSink(target_dir, filename, max_bytes)
+                sinks.append(sink)
+                return sink
+
+            # instance attr wins over Request._get_file_stream for this request only
+            request._get_file_stream = _factory
+            try:
+                return view(*args, **kwargs)
+            finally:
+                for sink in sinks:
+                    sink.discard()
+        return wrapper
+    return decorator
+
+
+def received(file_storage) -> HashingSink | None:
+    """The HashingSink behind a request.files entry (None if the view isn't decorated)."""
+    stream = getattr(file_storage, "stream", None)
+    return stream if isinstance(stream, HashingSink) else None
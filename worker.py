@@ -0,0 +1,116 @@
+# worker.py
+"""
+Background worker: owns every periodic job, so web processes (gunicorn) do none.
+
+    python worker.py            # Procfile: worker
+
+Run with SCHEDULER_MODE=worker on the web side. Any number of worker processes
+may run: they compete for a lease row in worker_leases and only the holder
+runs the scheduler (jobs.registry.JOBS, WORKER_THREADS at a time); the others
+wait as hot standbys and take over when the lease expires (WORKER_LEASE_TTL_S).
+Job history is in job_runs (/api/super-admin/jobs).
+"""
+import os
+import signal
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+WORKER_LEASE_TTL_S = int(os.getenv("WORKER_LEASE_TTL_S", "60"))
+WORKER_LEASE_NAME = os.getenv("WORKER_LEASE_NAME", "scheduler")
+_PRUNE_EVERY = timedelta(hours=1)
+
+
+class LeaderLease:
+    def __init__(self, app, holder: str, name: str = WORKER_LEASE_NAME, ttl_s: int = WORKER_LEASE_TTL_S):
+        self.app = app
+        self.holder = holder
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_s)
+
+    def acquire_or_renew(self) -> bool:
+        from extensions import db
+        from jobs.models import WorkerLease as L
+
+        with self.app.app_context():
+            now = datetime.utcnow()
+            # renew our own lease, or take over an expired one
+            n = L.query.filter(L.name == self.name, or_(L.holder == self.holder, L.expires_at < now)) \
+                .update({"holder": self.holder, "expires_at": now + self.ttl}, synchronize_session=False)
+            db.session.commit()
+            if n:
+                return True
+            try:
+                db.session.add(L(name=self.name, holder=self.holder, expires_at=now + self.ttl, acquired_at=now))
+                db.session.commit()
+                return True
+            except IntegrityError:
+                db.session.rollback()          # someone else holds it
+                return False
+
+    def release(self):
+        from extensions import db
+        from jobs.models import WorkerLease as L
+        with self.app.app_context():
+            L.query.filter(L.name == self.name, L.holder == self.holder).delete(synchronize_session=False)
+            db.session.commit()
+
+
+def main():
+    from app import app
+    from jobs import registry
+    from middleware.monitor import metrics
+    from utils.publish_queue import publish_queue
+    from utils.account_pool import account_pool
+
+    app.config["BACKGROUND_JOBS"] = True            # this process is the one that does background work
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    scheduler = registry.build_scheduler(app)
+    scheduler.start(paused=True)
+    lease = LeaderLease(app, registry.WORKER_ID)
+    leader, last_prune = False, datetime.min
+    print(f"🛠️ Worker {registry.WORKER_ID} up; jobs: {', '.join(registry.enabled_jobs())}")
+
+    # queue drains are claim-based, so every worker process can help
+    publish_queue.start()
+
+    while not stop.is_set():
+        try:
+            is_leader = lease.acquire_or_renew()
+        except Exception:
+            traceback.print_exc()
+            is_leader = False
+        if is_leader and not leader:
+            print("👑 Worker is leader, scheduler running")
+            scheduler.resume()
+            account_pool.start()
+        elif leader and not is_leader:
+            print("⏸️ Worker lost the lease, scheduler paused")
+            scheduler.pause()
+            account_pool.stop()
+        leader = is_leader
+        metrics.set_gauge("worker_leader", 1 if leader else 0, worker=registry.WORKER_ID)
+
+        if leader and datetime.utcnow() - last_prune > _PRUNE_EVERY:
+            try:
+                registry.prune_job_runs(app)
+            except Exception:
+                traceback.print_exc()
+            last_prune = datetime.utcnow()
+        stop.wait(max(1, WORKER_LEASE_TTL_S // 3))
+
+    print("👋 Worker stopping...")
+    scheduler.shutdown(wait=True)
+    account_pool.stop()
+    if leader:
+        lease.release()
+
+
+if __name__ == "__main__":
+    main()